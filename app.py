@@ -1,34 +1,172 @@
-from flask import Flask, render_template, jsonify, request
-from db_module.score import get_ranking_by_difficulty
+import os
+import time
+
+from flask import Blueprint, Flask, Response, current_app, render_template, jsonify, request
+from db_module.breaker import DatabaseUnavailable, end_deadline, start_deadline
+from db_module.cache import ranking_cache
+from db_module.db_connection import close_pool, db_breaker, db_pool, warm_pool
+from db_module.instrument import db_metrics
 from db_module.quiz import add_quiz, list_quiz_titles, update_quiz, delete_quiz
+from llm_module.metrics import llm_metrics
+from stats_module.web_metrics import DEFAULT_PROFILE_DIR, RequestMetrics
+
+bp = Blueprint("web", __name__)
+
+# 요청 하나가 DB에 쓸 수 있는 최대 시간 (초) — 이 안에서 여는 연결의 타임아웃을 남은 시간으로 줄임
+DB_REQUEST_DEADLINE = float(os.getenv("DB_REQUEST_DEADLINE", "3"))
+
+def create_app():
+    """
+    앱 팩토리 — 개발 서버(python app.py)와 serve.py(gunicorn 워커 / waitress)가 각자 하나씩 만듦
+    """
+    app = Flask(__name__, static_folder='templates', static_url_path='/templates')
+    app.config["DRAINING"] = False  # serve.py가 종료 신호를 받으면 True
+
+    # 라우트별 지연 / 상태 코드 / 처리 중 요청 / 크기 (/metrics) + ?profile=1 (WEB_ADMIN_TOKEN) 또는 N번째 요청 cProfile
+    request_metrics = RequestMetrics(
+        admin_token=os.getenv("WEB_ADMIN_TOKEN", ""),
+        profile_every=int(os.getenv("WEB_PROFILE_EVERY", "0")),
+        profile_dir=os.getenv("WEB_PROFILE_DIR", DEFAULT_PROFILE_DIR),
+    )
+    request_metrics.init_app(app)
+    app.extensions["request_metrics"] = request_metrics
+
+    app.before_request(_reject_while_draining)
+    app.before_request(_start_db_deadline)
+    app.teardown_request(_end_db_deadline)
+    app.register_blueprint(bp)
+    return app
+
+def warm_up(app):
+    """
+    워커가 요청을 받기 전에 한 번: DB 연결 풀 채우기, 리더보드 스냅샷, 템플릿 컴파일
+    DB가 죽어 있어도 시작은 함 (리더보드는 빈 degraded 스냅샷, 브레이커가 빠르게 503)
+    """
+    started = time.perf_counter()
+    connections = warm_pool()
+    snapshot = ranking_cache.refresh()
+    for name in ("index.html", "quiz.html"):
+        app.jinja_env.get_template(name)
+    print(f"[web] worker {os.getpid()} warmed up in {(time.perf_counter() - started) * 1000:.0f} ms: "
+          f"{connections}/{db_pool.max_idle} pooled connections, leaderboard v{snapshot.version}"
+          f"{' (degraded)' if ranking_cache.degraded else ''}")
+
+def shutdown():
+    # 서버 종료 시 (serve.py / gunicorn worker_exit) 풀에 남은 연결 정리
+    closed = close_pool()
+    if closed:
+        print(f"[web] worker {os.getpid()} closed {closed} pooled connections")
+
+def _reject_while_draining():
+    # 종료 중에는 새 요청을 503으로 돌려보냄 (처리 중인 요청만 마무리)
+    if current_app.config["DRAINING"]:
+        response = jsonify({"error": "server shutting down"})
+        response.headers["Retry-After"] = "1"
+        return response, 503
+
+def _start_db_deadline():
+    request.environ["db_deadline_token"] = start_deadline(DB_REQUEST_DEADLINE)
+
+def _end_db_deadline(_exc):
+    token = request.environ.pop("db_deadline_token", None)
+    if token is not None:
+        end_deadline(token)
 
-app = Flask(__name__, static_folder='templates', static_url_path='/templates')
+def _admin_only():
+    # /metrics, /api/metrics/db, /api/metrics/llm은 SQL 모양 / 실행 계획 / 모델 구성까지 보여줌
+    # WEB_ADMIN_TOKEN(헤더)이 있어야 함 — 토큰을 설정하지 않으면 모두 거부
+    # (127.0.0.1만 허용하면 같은 서버의 리버스 프록시를 거친 외부 요청도 통과함)
+    metrics = current_app.extensions["request_metrics"]
+    if not metrics.admin_token:
+        return jsonify({"error": "forbidden", "detail": "set WEB_ADMIN_TOKEN to enable metrics"}), 403
+    if not metrics.is_admin(request):
+        return jsonify({"error": "forbidden"}), 403
+    return None
 
-@app.route("/")
+def _db_error(e):
+    # 브레이커가 열려 있으면 503 + Retry-After (클라이언트가 바로 재시도하지 않게)
+    if isinstance(e, DatabaseUnavailable):
+        response = jsonify({"error": "database unavailable", "retry_after": round(db_breaker.retry_after(), 1)})
+        response.headers["Retry-After"] = str(max(1, int(db_breaker.retry_after())))
+        return response, 503
+    return jsonify({"error": str(e)}), 500
+
+@bp.route("/")
 def index():
     # 템플릿은 JS로 10초마다 /api/leaderboard를 호출하여 테이블을 갱신합니다.
     return render_template("index.html")
 
-@app.get("/api/leaderboard")
+@bp.get("/api/leaderboard")
 def api_leaderboard():
-    # 난이도: 1=쉬움, 2=노말, 3=하드
+    # 난이도: 1=쉬움, 2=노말, 3=하드 (스냅샷 캐시, LEADERBOARD_CACHE_TTL초마다 갱신)
+    # DB 장애 중에는 마지막 스냅샷을 그대로 내보내고 X-Data-Stale 헤더로 표시
+    try:
+        snapshot = ranking_cache.get()
+        response = jsonify(snapshot.as_api())
+        if ranking_cache.degraded:
+            response.headers["X-Data-Stale"] = "1"
+        return response
+    except Exception as e:
+        return _db_error(e)
+
+@bp.get("/api/metrics/llm")
+def api_llm_metrics():
+    # 모델별 TTFT / 지연 / 토큰 처리량 분포 + 헤지 통계 (게임·봇이 남긴 logs/llm_metrics.jsonl을 이어 읽음)
+    denied = _admin_only()
+    if denied:
+        return denied
     try:
-        easy = get_ranking_by_difficulty(1, limit=10)
-        normal = get_ranking_by_difficulty(2, limit=10)
-        hard = get_ranking_by_difficulty(3, limit=10)
-        return jsonify({
-            "easy": easy,
-            "normal": normal,
-            "hard": hard
-        })
+        llm_metrics.load_log()
+        return jsonify(llm_metrics.snapshot())
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
-@app.route("/quiz")
+@bp.get("/api/metrics/db")
+def api_db_metrics():
+    # 이 웹 프로세스의 db_module 함수별 쿼리 지연 / 행 수 / 연결 시간, SQL 모양별 누적, 최근 슬로 쿼리
+    denied = _admin_only()
+    if denied:
+        return denied
+    snapshot = db_metrics.snapshot()
+    snapshot["breaker"] = db_breaker.stats()
+    snapshot["pool"] = db_pool.stats()
+    snapshot["leaderboard_cache"] = ranking_cache.stats()
+    return jsonify(snapshot)
+
+@bp.get("/metrics")
+def prometheus_metrics():
+    # Prometheus 텍스트 형식 (웹 요청 + 이 프로세스의 DB 쿼리 + 서킷 브레이커)
+    denied = _admin_only()
+    if denied:
+        return denied
+    lines = current_app.extensions["request_metrics"].prometheus_lines() + db_metrics.prometheus_lines()
+    lines += [
+        "# HELP bcd_db_circuit_open 1 while the DB circuit breaker is failing fast.",
+        "# TYPE bcd_db_circuit_open gauge",
+        f"bcd_db_circuit_open {int(db_breaker.state != db_breaker.CLOSED)}",
+        "# HELP bcd_db_pool_idle_connections Idle pooled DB connections in this worker.",
+        "# TYPE bcd_db_pool_idle_connections gauge",
+        f"bcd_db_pool_idle_connections {db_pool.stats()['idle']}",
+    ]
+    return Response("\n".join(lines) + "\n", mimetype="text/plain; version=0.0.4")
+
+@bp.get("/healthz")
+def healthz():
+    # 로드밸런서 / 배포 스크립트용: 살아 있으면 200 (종료 중이면 _reject_while_draining이 503)
+    # DB 장애 중에도 리더보드는 마지막 스냅샷을 내보낼 수 있으므로 200, 상태는 본문에
+    return jsonify({
+        "status": "ok",
+        "pid": os.getpid(),
+        "breaker": db_breaker.state,
+        "leaderboard_degraded": ranking_cache.degraded,
+        "in_flight": current_app.extensions["request_metrics"].in_flight,
+    })
+
+@bp.route("/quiz")
 def quiz_manager():
     return render_template("quiz.html")
 
-@app.get("/api/quizzes")
+@bp.get("/api/quizzes")
 def api_list_quizzes():
     try:
         category = request.args.get("category")
@@ -36,9 +174,9 @@ def api_list_quizzes():
         quizzes = list_quiz_titles(category=category, difficulty=difficulty, include_correct=True)
         return jsonify(quizzes)
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return _db_error(e)
 
-@app.post("/api/quizzes")
+@bp.post("/api/quizzes")
 def api_add_quiz():
     try:
         data = request.json
@@ -54,9 +192,9 @@ def api_add_quiz():
         )
         return jsonify({"id": quiz_id, "message": "Quiz added successfully"})
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return _db_error(e)
 
-@app.put("/api/quizzes/<int:quiz_id>")
+@bp.put("/api/quizzes/<int:quiz_id>")
 def api_update_quiz(quiz_id):
     try:
         data = request.json
@@ -76,9 +214,9 @@ def api_update_quiz(quiz_id):
         else:
             return jsonify({"error": "Quiz not found or no changes made"}), 404
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return _db_error(e)
 
-@app.delete("/api/quizzes/<int:quiz_id>")
+@bp.delete("/api/quizzes/<int:quiz_id>")
 def api_delete_quiz(quiz_id):
     try:
         success = delete_quiz(quiz_id)
@@ -87,8 +225,9 @@ def api_delete_quiz(quiz_id):
         else:
             return jsonify({"error": "Quiz not found"}), 404
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return _db_error(e)
 
 if __name__ == "__main__":
-    # 개발용 실행. 실제 서비스에서는 WSGI 서버 사용 권장
-    app.run(debug=True, host='0.0.0.0', port=55000)
\ No newline at end of file
+    # 개발용 실행 (리로더 + 단일 프로세스). 실제 서비스는 python serve.py
+    # (모듈 수준에서 만들지 않음 → serve.py / gunicorn이 import해도 워커마다 앱 하나)
+    create_app().run(debug=True, host='0.0.0.0', port=55000)
\ No newline at end of file
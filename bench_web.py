@@ -0,0 +1,163 @@
+"""
+웹 처리량 벤치마크 (/api/leaderboard, /api/quizzes)
+- 동시 클라이언트 --clients개(스레드, keep-alive)가 경로마다 --duration초 동안 요청 → req/s, p50 / p95 / p99, 오류
+- --url이 없으면 별도 프로세스에서 serve.py의 waitress 경로로 앱을 띄워서 잼 (warm_up 포함, 클라이언트와 GIL 분리)
+- --fake-db MS: MySQL 대신 MS 밀리초 걸리는 메모리 데이터 (DB 없이 웹 계층만 재기, 자체 서버에서만)
+
+실행: python bench_web.py [--url http://127.0.0.1:55000] [--clients 16] [--duration 10] [--fake-db 2]
+     gunicorn 측정은 python serve.py를 띄운 뒤 --url로
+"""
+import argparse
+import http.client
+import logging
+import os
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+from typing import List, Tuple
+from urllib.parse import urlsplit
+
+from stats_module.histogram import _nearest_rank
+
+PATHS = ("/api/leaderboard", "/api/quizzes")
+
+
+def install_fake_db(ms: float) -> None:
+    # 리더보드 캐시가 부르는 score.fetch_ranking_by_difficulty, /api/quizzes의 list_quiz_titles를 대체
+    import app as app_module
+    import db_module.score as score
+
+    ranking = [{"class_id": 10000 + i, "score": 1000 - i, "client": "bench", "best_score": 100,
+                "attempts": 10, "win_rate": 0.5} for i in range(10)]
+    quizzes = [{"id": i, "title": f"문제 {i}", "category": "bench", "difficulty": 1 + i % 3, "correct": "정답"}
+               for i in range(100)]
+
+    def fetch_ranking_by_difficulty(difficulty, limit=10):
+        time.sleep(ms / 1000)
+        return ranking[:limit]
+
+    def list_quiz_titles(**kwargs):
+        time.sleep(ms / 1000)
+        return quizzes
+
+    score.fetch_ranking_by_difficulty = fetch_ranking_by_difficulty
+    app_module.list_quiz_titles = list_quiz_titles
+
+
+def run_server(port: int, threads: int, fake_db) -> None:
+    if fake_db is not None:
+        os.environ["DB_POOL_SIZE"] = "0"
+        install_fake_db(fake_db)
+    # 클라이언트 수 > 스레드 수면 큐 대기 경고가 계속 찍힘 (벤치마크에서는 정상)
+    logging.getLogger("waitress.queue").setLevel(logging.ERROR)
+    from serve import serve_waitress
+    serve_waitress("127.0.0.1", port, threads, drain_timeout=5)
+
+
+def _client(host: str, port: int, path: str, stop_at: float) -> Tuple[List[float], Counter, int]:
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    errors = 0
+    conn = http.client.HTTPConnection(host, port, timeout=10)
+    while time.perf_counter() < stop_at:
+        started = time.perf_counter()
+        try:
+            conn.request("GET", path)
+            response = conn.getresponse()
+            response.read()
+            statuses[response.status] += 1
+            if response.will_close:
+                conn.close()
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            conn.close()
+            conn = http.client.HTTPConnection(host, port, timeout=10)
+            continue
+        latencies.append((time.perf_counter() - started) * 1000)
+    conn.close()
+    return latencies, statuses, errors
+
+
+def bench_path(host: str, port: int, path: str, clients: int, duration: float) -> dict:
+    results = []
+    stop_at = time.perf_counter() + duration
+    workers = [threading.Thread(target=lambda: results.append(_client(host, port, path, stop_at)))
+               for _ in range(clients)]
+    started = time.perf_counter()
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    elapsed = time.perf_counter() - started
+    latencies = sorted(ms for r in results for ms in r[0])
+    statuses = sum((r[1] for r in results), Counter())
+    return {
+        "path": path,
+        "requests": len(latencies),
+        "rps": len(latencies) / elapsed,
+        "p50": _nearest_rank(latencies, 50),
+        "p95": _nearest_rank(latencies, 95),
+        "p99": _nearest_rank(latencies, 99),
+        "errors": sum(r[2] for r in results),
+        "statuses": dict(statuses),
+    }
+
+
+def _wait_ready(host: str, port: int, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection(host, port, timeout=1)
+            conn.request("GET", "/healthz")
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("server did not become ready")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="BCD2025 web capacity benchmark")
+    parser.add_argument("--url", default=None, help="already running server (default: start waitress here)")
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--threads", type=int, default=8, help="waitress threads for the self-hosted server")
+    parser.add_argument("--fake-db", type=float, default=None, metavar="MS")
+    parser.add_argument("--port", type=int, default=55099)
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        run_server(args.port, args.threads, args.fake_db)
+        return
+
+    server = None
+    if args.url:
+        parts = urlsplit(args.url)
+        host, port = parts.hostname, parts.port or 80
+    else:
+        host, port = "127.0.0.1", args.port
+        cmd = [sys.executable, os.path.abspath(__file__), "--serve", "--port", str(port), "--threads", str(args.threads)]
+        if args.fake_db is not None:
+            cmd += ["--fake-db", str(args.fake_db)]
+        server = subprocess.Popen(cmd, stdout=subprocess.DEVNULL)
+    try:
+        _wait_ready(host, port)
+        target = args.url or f"waitress x{args.threads} threads" + (
+            f", fake DB {args.fake_db:g} ms" if args.fake_db is not None else "")
+        print(f"{target} / {args.clients} clients / {args.duration:g}s per path / cpus={os.cpu_count()}")
+        print(f"{'path':<18} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}  statuses")
+        for path in PATHS:
+            r = bench_path(host, port, path, args.clients, args.duration)
+            print(f"{r['path']:<18} {r['rps']:>9.1f} {r['p50'] or 0:>8.2f} {r['p95'] or 0:>8.2f} "
+                  f"{r['p99'] or 0:>8.2f} {r['errors']:>7}  {r['statuses']}")
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+
+
+if __name__ == "__main__":
+    main()
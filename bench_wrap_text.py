@@ -0,0 +1,119 @@
+"""
+wrap_text 마이크로벤치마크
+- ui_module.line_break.wrap_text (advance 누적합 + 이분 탐색)
+- 기존 test_ui.wrap_text / ai_vs_human.wrap_text (아래에 그대로 보존)
+
+실행: python bench_wrap_text.py [반복 횟수]
+한글 글리프가 있는 폰트로 재려면 FONT_PATH 환경변수를 지정하세요.
+"""
+import os
+import sys
+import timeit
+from typing import List
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from test_ui import load_korean_font
+from ui_module.line_break import wrap_text
+
+
+def legacy_test_ui_wrap_text(text: str, font: pygame.font.Font, max_width: int) -> List[str]:
+    # test_ui.wrap_text 기존 구현
+    lines: List[str] = []
+    if not text:
+        return [""]
+    paragraphs = text.split("\n")
+    for para in paragraphs:
+        if " " in para:
+            words = para.split(" ")
+            current = ""
+            for w in words:
+                test = (current + (" " if current else "") + w) if current else w
+                if font.size(test)[0] <= max_width:
+                    current = test
+                else:
+                    if current:
+                        lines.append(current)
+                    if font.size(w)[0] > max_width:
+                        fragment = ""
+                        for ch in w:
+                            if font.size(fragment + ch)[0] <= max_width:
+                                fragment += ch
+                            else:
+                                if fragment:
+                                    lines.append(fragment)
+                                fragment = ch
+                        current = fragment
+                    else:
+                        current = w
+            if current:
+                lines.append(current)
+        else:
+            current = ""
+            for ch in para:
+                if font.size(current + ch)[0] <= max_width:
+                    current += ch
+                else:
+                    lines.append(current)
+                    current = ch
+            if current:
+                lines.append(current)
+    return lines
+
+
+def legacy_ai_vs_human_wrap_text(text: str, font: pygame.font.Font, max_width: int) -> List[str]:
+    # ai_vs_human.wrap_text 기존 구현
+    lines = []
+    if not text: return [""]
+    for para in text.split("\n"):
+        words = para.split(" ")
+        current = ""
+        for w in words:
+            test = (current + " " + w).strip() if current else w
+            if font.size(test)[0] <= max_width:
+                current = test
+            else:
+                if current: lines.append(current)
+                current = w
+        if current: lines.append(current)
+    return lines
+
+
+SAMPLES = {
+    "korean_spaces": "파이썬에서 리스트와 튜플의 차이는 무엇일까요? 리스트는 변경 가능하고 튜플은 변경 불가능합니다. " * 20,
+    "korean_no_space": "가나다라마바사아자차카타파하" * 80,
+    "ascii_stream": "Let me think about this step by step before answering the question. " * 30,
+}
+
+
+def main():
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    pygame.init()
+    font = load_korean_font(24)
+    width = 600
+
+    impls = {
+        "line_break": wrap_text,
+        "legacy_test_ui": legacy_test_ui_wrap_text,
+        "legacy_ai_vs_human": legacy_ai_vs_human_wrap_text,
+    }
+    print(f"{'sample':<18} {'chars':>6} " + " ".join(f"{name:>20}" for name in impls))
+    for name, text in SAMPLES.items():
+        row = []
+        for fn in impls.values():
+            sec = timeit.timeit(lambda: fn(text, font, width), number=number)
+            row.append(f"{sec / number * 1000:>17.3f} ms")
+        print(f"{name:<18} {len(text):>6} " + " ".join(row))
+
+        # 결과 폭 검증: 새 구현의 모든 줄이 max_width 안에 들어가는지
+        overflow = [line for line in wrap_text(text, font, width) if font.size(line)[0] > width]
+        if overflow:
+            print(f"  ! {len(overflow)} line(s) wider than {width}px (kerning drift)")
+
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
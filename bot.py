@@ -2,31 +2,70 @@ import discord
 from discord.ext import commands
 import os
 import aiohttp
-import json
+import asyncio
+from typing import Optional
 
-bot = commands.Bot(command_prefix='!')
+from bot_module.limiter import GenerationLimiter
+from bot_module.sessions import ContextStore
+from bot_module.stream_editor import StreamEditor
+from llm_module.ollama import OLLAMA_URL, TokenEvent, DoneEvent, astream_generate
+
+# 로컬 Ollama 동시 생성 제한 (전체 / 사용자별)
+OLLAMA_MAX_CONCURRENT = int(os.getenv("OLLAMA_MAX_CONCURRENT", "2"))
+OLLAMA_PER_USER = int(os.getenv("OLLAMA_PER_USER", "1"))
+
+# 스트리밍 출력 edit 주기 (Discord 메시지 수정 rate limit 대응)
+STREAM_EDIT_INTERVAL = float(os.getenv("STREAM_EDIT_INTERVAL", "1.0"))
+STREAM_BURST_CHARS = int(os.getenv("STREAM_BURST_CHARS", "200"))
+
+limiter = GenerationLimiter(max_concurrent=OLLAMA_MAX_CONCURRENT, per_user=OLLAMA_PER_USER)
+
+# (채널, 사용자)별 Ollama context — 후속 질문에서 이전 대화를 다시 prefill 하지 않음
+sessions = ContextStore(
+    max_sessions=int(os.getenv("CHAT_SESSION_MAX", "500")),
+    ttl=float(os.getenv("CHAT_SESSION_TTL", "1800")),
+    max_bytes=int(os.getenv("CHAT_SESSION_MAX_BYTES", str(64 * 1024 * 1024))),
+)
+
+# 모든 요청이 같이 쓰는 HTTP 세션 (연결 재사용)
+_http_session: Optional[aiohttp.ClientSession] = None
+
+
+def get_http_session() -> aiohttp.ClientSession:
+    global _http_session
+    if _http_session is None or _http_session.closed:
+        _http_session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=OLLAMA_MAX_CONCURRENT + 2),
+            timeout=aiohttp.ClientTimeout(total=None, sock_connect=10),
+        )
+    return _http_session
+
+
+class ChatBot(commands.Bot):
+    async def close(self):
+        if _http_session is not None and not _http_session.closed:
+            await _http_session.close()
+        await super().close()
+
+
+bot = ChatBot(command_prefix='!')
 @bot.event
 async def on_ready():
     print('Bot is ready')
     await bot.sync_commands()
 
-async def run_ollama_stream(model: str, prompt: str):
-    url = "http://localhost:11434/api/generate"
-    payload = {"model": model, "prompt": prompt}
-
-    async with aiohttp.ClientSession() as session:
-        async with session.post(url, json=payload) as resp:
-            async for line in resp.content:
-                if not line.strip():
-                    continue
-                try:
-                    data = json.loads(line.decode('utf-8'))
-                    if "response" in data:
-                        yield data["response"]
-                    if data.get("done"):
-                        break
-                except json.JSONDecodeError:
-                    continue
+async def run_ollama_stream(model: str, prompt: str, context=None, on_done=None):
+    """
+    :param context: 이전 응답의 context (있으면 이어서 대화)
+    :param on_done: DoneEvent(통계, context)를 받는 콜백
+    """
+    async for event in astream_generate(
+        model, prompt, url=OLLAMA_URL, session=get_http_session(), context=context, source="bot"
+    ):
+        if isinstance(event, TokenEvent):
+            yield event.text
+        elif isinstance(event, DoneEvent) and on_done is not None:
+            on_done(event)
 
 
 @bot.event
@@ -44,16 +83,54 @@ async def _ping(ctx):
 async def _chat(ctx, message: str):
     await ctx.defer()
 
+    # 같은 사용자의 이전 /chat 요청은 취소
+    limiter.claim(ctx.author.id)
+    session_key = (ctx.channel_id, ctx.author.id)
     sent = await ctx.followup.send("생성 중...")
 
-    output = ""
-    async for token in run_ollama_stream("gemma3:4b", message):
-        output += token
-        if len(output) % 15 == 0:
-            await sent.edit(content=f"```{output}```")
+    async def show_position(pos: int):
+        await sent.edit(content=f"대기 중... {pos}번째 순서입니다.")
+
+    try:
+        async with limiter.slot(ctx.author.id, on_position=show_position):
+            await sent.edit(content="생성 중...")
+            # 토큰은 버퍼에 모으고 일정 간격으로 최신 내용만 edit (2000자 넘으면 다음 메시지로)
+            editor = StreamEditor(
+                sent,
+                send_page=ctx.followup.send,
+                interval=STREAM_EDIT_INTERVAL,
+                burst_chars=STREAM_BURST_CHARS,
+            ).start()
+            try:
+                def save_context(done):
+                    if done.context:
+                        sessions.put(session_key, done.context)
+
+                context = sessions.get(session_key)
+                async for token in run_ollama_stream("gemma3:4b", message, context=context, on_done=save_context):
+                    editor.append(token)
+            finally:
+                await editor.close()
+    except asyncio.CancelledError:
+        await sent.edit(content="새 요청이 들어와 이전 요청을 취소했습니다.")
+        raise
 
+@bot.slash_command(name='reset', description='Forget the /chat conversation in this channel')
+async def _reset(ctx):
+    cleared = sessions.clear((ctx.channel_id, ctx.author.id))
+    await ctx.respond("대화 기록을 초기화했습니다." if cleared else "초기화할 대화가 없습니다.", ephemeral=True)
 
-    await sent.edit(content=f"```{output}```")
+@bot.slash_command(name='chat_stats', description='Ollama queue / generation stats')
+async def _chat_stats(ctx):
+    s = limiter.stats()
+    ss = sessions.stats()
+    wait, gen = s["queue_wait_ms"], s["generation_ms"]
+    await ctx.respond(
+        f"진행 중 {s['active']}/{s['max_concurrent']} · 대기 {s['queued']} · 취소 {s['cancelled']}\n"
+        f"대기 시간 p50 {wait['p50']}ms / p95 {wait['p95']}ms\n"
+        f"생성 시간 p50 {gen['p50']}ms / p95 {gen['p95']}ms (n={gen['count']})\n"
+        f"대화 세션 {ss['sessions']}개 · 재사용 {ss['hits']}회"
+    )
 
 if __name__ == '__main__':
     bot.run(os.getenv('DISCORD_BOT_SCB'))
\ No newline at end of file
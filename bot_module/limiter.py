@@ -0,0 +1,136 @@
+"""
+Ollama 동시 생성 제한기
+- 전체 동시 생성 수(max_concurrent)와 사용자별 동시 생성 수(per_user) 제한
+- 대기열은 FIFO, 대기 중에는 주기적으로 현재 순번을 콜백으로 알려줌
+- 같은 사용자가 다시 요청하면 이전 요청(대기/생성 중 모두)을 취소
+- 대기 시간 / 생성 시간 분포 기록
+"""
+import asyncio
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+
+from stats_module.histogram import RollingHistogram
+
+# 대기/생성 시간 버킷 (ms)
+LLM_WAIT_BUCKETS_MS = (10, 100, 500, 1000, 2500, 5000, 10000, 30000, 60000, 120000)
+
+
+class _Waiter:
+    __slots__ = ("user_id", "future")
+
+    def __init__(self, user_id: Hashable, future: asyncio.Future):
+        self.user_id = user_id
+        self.future = future
+
+
+class GenerationLimiter:
+    def __init__(self, max_concurrent: int = 2, per_user: int = 1, position_interval: float = 1.0):
+        """
+        :param max_concurrent: Ollama에 동시에 보낼 최대 생성 수
+        :param per_user: 사용자 한 명이 동시에 점유할 수 있는 슬롯 수
+        :param position_interval: 대기 순번 콜백 확인 주기 (초)
+        """
+        self.max_concurrent = max_concurrent
+        self.per_user = per_user
+        self.position_interval = position_interval
+
+        self._active = 0
+        self._active_by_user: Counter = Counter()
+        self._waiters: List[_Waiter] = []
+        self._user_tasks: Dict[Hashable, asyncio.Task] = {}
+
+        self.queue_wait = RollingHistogram(buckets=LLM_WAIT_BUCKETS_MS)
+        self.generation = RollingHistogram(buckets=LLM_WAIT_BUCKETS_MS)
+        self.cancelled = 0
+
+    def claim(self, user_id: Hashable) -> None:
+        """
+        현재 태스크를 user_id의 최신 요청으로 등록하고, 이전 요청이 살아 있으면 취소
+        """
+        current = asyncio.current_task()
+        previous = self._user_tasks.get(user_id)
+        if previous is not None and previous is not current and not previous.done():
+            previous.cancel()
+            self.cancelled += 1
+        self._user_tasks[user_id] = current
+        current.add_done_callback(lambda t: self._forget(user_id, t))
+
+    def _forget(self, user_id: Hashable, task: asyncio.Task) -> None:
+        if self._user_tasks.get(user_id) is task:
+            del self._user_tasks[user_id]
+
+    def position(self, future: asyncio.Future) -> int:
+        for i, w in enumerate(self._waiters):
+            if w.future is future:
+                return i + 1
+        return 0
+
+    def _dispatch(self) -> None:
+        # 앞에서부터, 전체/사용자 한도를 넘지 않는 대기자에게 슬롯 배정
+        for w in list(self._waiters):
+            if self._active >= self.max_concurrent:
+                break
+            if self._active_by_user[w.user_id] >= self.per_user or w.future.done():
+                continue
+            self._waiters.remove(w)
+            self._active += 1
+            self._active_by_user[w.user_id] += 1
+            w.future.set_result(None)
+
+    def _release(self, user_id: Hashable) -> None:
+        self._active -= 1
+        self._active_by_user[user_id] -= 1
+        if self._active_by_user[user_id] <= 0:
+            del self._active_by_user[user_id]
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, user_id: Hashable, on_position: Optional[Callable[[int], Awaitable[Any]]] = None):
+        """
+        생성 슬롯 하나를 잡고 블록이 끝나면 반납
+        :param on_position: 대기 순번(1부터)이 바뀔 때마다 호출되는 코루틴 함수
+        """
+        loop = asyncio.get_running_loop()
+        waiter = _Waiter(user_id, loop.create_future())
+        self._waiters.append(waiter)
+        queued_at = time.monotonic()
+        self._dispatch()
+
+        last_pos = 0
+        try:
+            while not waiter.future.done():
+                pos = self.position(waiter.future)
+                if on_position is not None and pos != last_pos:
+                    last_pos = pos
+                    await on_position(pos)
+                try:
+                    await asyncio.wait_for(asyncio.shield(waiter.future), self.position_interval)
+                except asyncio.TimeoutError:
+                    pass
+        except BaseException:
+            # 대기 중 취소: 대기열에서 빼거나, 이미 배정된 슬롯이면 반납
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+            elif waiter.future.done():
+                self._release(user_id)
+            raise
+
+        self.queue_wait.observe((time.monotonic() - queued_at) * 1000)
+        started_at = time.monotonic()
+        try:
+            yield
+        finally:
+            self.generation.observe((time.monotonic() - started_at) * 1000)
+            self._release(user_id)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "active": self._active,
+            "queued": len(self._waiters),
+            "max_concurrent": self.max_concurrent,
+            "cancelled": self.cancelled,
+            "queue_wait_ms": self.queue_wait.summary(),
+            "generation_ms": self.generation.summary(),
+        }
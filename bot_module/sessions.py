@@ -0,0 +1,94 @@
+"""
+/chat 대화 세션 저장소
+- Ollama가 done 프레임에 돌려주는 context(토큰 id 배열)를 (채널, 사용자)별로 보관
+- 다음 요청에 context를 넘기면 이전 대화를 다시 prefill 하지 않음
+- TTL 만료 + LRU 제거 + 전체 메모리 상한(바이트)
+"""
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from typing import Hashable, Iterable, List, Optional, Tuple
+
+
+class ContextStore:
+    def __init__(self, max_sessions: int = 500, ttl: float = 1800.0, max_bytes: int = 64 * 1024 * 1024):
+        """
+        :param max_sessions: 보관할 최대 세션 수
+        :param ttl: 마지막 사용 후 이 시간(초)이 지나면 만료
+        :param max_bytes: 모든 context 합계 메모리 상한
+        """
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._items: "OrderedDict[Hashable, Tuple[float, array]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _size(ctx: array) -> int:
+        return ctx.itemsize * len(ctx)
+
+    def _drop(self, key: Hashable) -> None:
+        _, ctx = self._items.pop(key)
+        self._bytes -= self._size(ctx)
+
+    def _evict(self, now: float) -> None:
+        # 오래 안 쓴 것부터: 만료 → 개수 상한 → 메모리 상한
+        while self._items:
+            key, (used_at, _) = next(iter(self._items.items()))
+            expired = now - used_at > self.ttl
+            if not (expired or len(self._items) > self.max_sessions or self._bytes > self.max_bytes):
+                break
+            self._drop(key)
+            self.evictions += 1
+
+    def get(self, key: Hashable) -> Optional[List[int]]:
+        """
+        :return: 저장된 context 또는 None (없거나 만료)
+        """
+        now = time.monotonic()
+        with self._lock:
+            item = self._items.get(key)
+            if item is None or now - item[0] > self.ttl:
+                if item is not None:
+                    self._drop(key)
+                    self.evictions += 1
+                self.misses += 1
+                return None
+            self._items[key] = (now, item[1])
+            self._items.move_to_end(key)
+            self.hits += 1
+            return item[1].tolist()
+
+    def put(self, key: Hashable, context: Iterable[int]) -> None:
+        ctx = array("i", context)
+        now = time.monotonic()
+        with self._lock:
+            if key in self._items:
+                self._drop(key)
+            if self._size(ctx) > self.max_bytes:
+                return
+            self._items[key] = (now, ctx)
+            self._bytes += self._size(ctx)
+            self._evict(now)
+
+    def clear(self, key: Hashable) -> bool:
+        with self._lock:
+            if key in self._items:
+                self._drop(key)
+                return True
+            return False
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "sessions": len(self._items),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
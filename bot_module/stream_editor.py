@@ -0,0 +1,165 @@
+"""
+스트리밍 응답용 메시지 편집기
+- 토큰은 버퍼에만 쌓고, 시간 예산(interval) 또는 글자 수(burst_chars)가 차면 최신 버퍼로 한 번만 edit
+- 중간 상태는 건너뜀(항상 마지막 버퍼만 전송), 429면 뒤로 물러났다가 재시도
+- 2000자 제한을 넘으면 페이지를 고정하고 다음 메시지로 이어서 출력
+"""
+import asyncio
+import time
+from typing import Awaitable, Callable, List, Optional
+
+DISCORD_MESSAGE_LIMIT = 2000
+
+
+def code_block(text: str) -> str:
+    return f"```{text}```"
+
+
+class StreamEditor:
+    def __init__(
+        self,
+        message,
+        send_page: Callable[[str], Awaitable],
+        interval: float = 1.0,
+        min_interval: float = 0.35,
+        burst_chars: int = 200,
+        limit: int = DISCORD_MESSAGE_LIMIT,
+        render: Callable[[str], str] = code_block,
+    ):
+        """
+        :param message: 첫 페이지로 쓸 이미 보낸 메시지 (edit(content=...) 지원)
+        :param send_page: 다음 페이지 메시지를 보내는 코루틴 함수 (예: ctx.followup.send)
+        :param interval: 평소 edit 간격 (초)
+        :param min_interval: burst_chars가 찼을 때도 지킬 최소 간격 (초)
+        :param burst_chars: 마지막 edit 이후 이만큼 쌓이면 interval 전에 edit
+        :param limit: 메시지 최대 길이 (render 결과 기준)
+        :param render: 페이지 본문 → 메시지 내용 (기본 코드 블록)
+        """
+        self.messages = [message]
+        self.send_page = send_page
+        self.interval = interval
+        self.min_interval = min_interval
+        self.burst_chars = burst_chars
+        self.render = render
+        # render가 덧붙이는 글자 수만큼 본문 용량에서 뺌
+        self.page_size = limit - len(render(""))
+
+        self._parts: List[str] = []
+        self._length = 0
+        self._page_starts = [0]      # 각 페이지의 시작 offset
+        self._sent: List[Optional[str]] = [None]  # 페이지별 마지막으로 보낸 내용
+        self._pending = 0            # 마지막 flush 이후 추가된 글자 수
+        self._last_flush = 0.0
+        self._cooldown_until = 0.0
+        self._backoff = 1.0
+        self._closed = False
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+        self.stats = {"appends": 0, "edits": 0, "pages": 1, "rate_limited": 0, "errors": 0}
+
+    @property
+    def text(self) -> str:
+        if len(self._parts) > 1:
+            self._parts = ["".join(self._parts)]
+        return self._parts[0] if self._parts else ""
+
+    def start(self) -> "StreamEditor":
+        self._task = asyncio.ensure_future(self._run())
+        return self
+
+    def append(self, token: str) -> None:
+        if not token:
+            return
+        self._parts.append(token)
+        self._length += len(token)
+        self._pending += len(token)
+        self.stats["appends"] += 1
+        self._wake.set()
+
+    async def close(self) -> None:
+        """
+        남은 버퍼를 모두 보내고 종료
+        """
+        self._closed = True
+        self._wake.set()
+        if self._task is not None:
+            await self._task
+
+    async def _run(self) -> None:
+        while True:
+            await self._wake.wait()
+            self._wake.clear()
+
+            while True:
+                now = time.monotonic()
+                if self._closed:
+                    due_at = self._cooldown_until
+                elif self._pending >= self.burst_chars:
+                    due_at = max(self._last_flush + self.min_interval, self._cooldown_until)
+                else:
+                    due_at = max(self._last_flush + self.interval, self._cooldown_until)
+                if now >= due_at:
+                    break
+                # 기다리는 동안 들어온 토큰은 버퍼에만 쌓임 (중간 상태 edit 생략)
+                try:
+                    await asyncio.wait_for(self._wake.wait(), due_at - now)
+                    self._wake.clear()
+                except asyncio.TimeoutError:
+                    pass
+
+            await self._flush()
+            if self._closed and self._all_sent():
+                return
+
+    def _paginate(self) -> None:
+        # 현재 페이지가 넘치면 줄바꿈(없으면 용량) 기준으로 고정하고 새 페이지 시작
+        text = self.text
+        while len(text) - self._page_starts[-1] > self.page_size:
+            start = self._page_starts[-1]
+            cut = text.rfind("\n", start + self.page_size // 2, start + self.page_size)
+            cut = cut + 1 if cut != -1 else start + self.page_size
+            self._page_starts.append(cut)
+            self._sent.append(None)
+
+    def _page(self, i: int) -> str:
+        end = self._page_starts[i + 1] if i + 1 < len(self._page_starts) else self._length
+        return self.text[self._page_starts[i]:end]
+
+    def _all_sent(self) -> bool:
+        self._paginate()
+        return all(self._sent[i] == self.render(self._page(i)) for i in range(len(self._page_starts)))
+
+    async def _flush(self) -> None:
+        self._pending = 0
+        self._last_flush = time.monotonic()
+        self._paginate()
+        for i in range(len(self._page_starts)):
+            content = self.render(self._page(i))
+            if self._sent[i] == content:
+                continue
+            try:
+                if i < len(self.messages):
+                    await self.messages[i].edit(content=content)
+                    self.stats["edits"] += 1
+                else:
+                    self.messages.append(await self.send_page(content))
+                    self.stats["pages"] += 1
+                self._sent[i] = content
+                self._backoff = 1.0
+            except Exception as e:
+                if getattr(e, "status", None) == 429:
+                    self.stats["rate_limited"] += 1
+                    retry_after = getattr(e, "retry_after", None) or self._backoff
+                    self._cooldown_until = time.monotonic() + retry_after
+                    self._backoff = min(self._backoff * 2, 10.0)
+                else:
+                    self.stats["errors"] += 1
+                    print(f"[stream] edit failed: {e}")
+                    if self._closed:
+                        # 종료 중 복구 불가한 오류면 더 시도하지 않음
+                        self._sent[i] = content
+                        continue
+                # 나머지 페이지는 다음 flush에서 다시 시도
+                self._wake.set()
+                return
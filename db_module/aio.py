@@ -0,0 +1,76 @@
+"""
+db_module 비동기 래퍼 (discord 봇 등 asyncio 코드용)
+- pymysql 호출은 동기(blocking)라서 이벤트 루프에서 직접 부르면 하트비트까지 멈춤
+- 크기가 정해진 전용 스레드 풀에서 실행하고 await로 결과만 받음
+"""
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+import db_module.quiz as quiz_db
+import db_module.score as score_db
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """
+    DB 전용 스레드 풀 (DB_MAX_WORKERS, 기본 4) — 동시에 열리는 MySQL 연결 수의 상한이기도 함
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                workers = int(os.getenv("DB_MAX_WORKERS", "4"))
+                _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="db")
+    return _executor
+
+
+async def run_in_db_pool(fn: Callable, *args, **kwargs) -> Any:
+    """
+    동기 DB 함수를 DB 스레드 풀에서 실행
+    :param fn: db_module 함수
+    :return: fn의 반환값
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), functools.partial(fn, *args, **kwargs))
+
+
+def shutdown(wait: bool = True) -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=wait)
+            _executor = None
+
+
+# --- score ---
+
+async def get_ranking_by_difficulty(difficulty, limit=10) -> List[Dict[str, Any]]:
+    return await run_in_db_pool(score_db.get_ranking_by_difficulty, difficulty, limit=limit)
+
+
+async def get_ai_data(class_id):
+    return await run_in_db_pool(score_db.get_ai_data, class_id)
+
+
+async def insert_ai_data(difficulty, class_id, score, client=None):
+    return await run_in_db_pool(score_db.insert_ai_data, difficulty, class_id, score, client)
+
+
+async def get_player_stats(class_id) -> List[Dict[str, Any]]:
+    return await run_in_db_pool(score_db.get_player_stats, class_id)
+
+
+# --- quiz ---
+
+async def list_quiz_titles(**filters) -> List[Dict[str, Any]]:
+    return await run_in_db_pool(quiz_db.list_quiz_titles, **filters)
+
+
+async def get_random_quiz_by_category(category: str) -> Optional[Dict[str, Any]]:
+    return await run_in_db_pool(quiz_db.get_random_quiz_by_category, category)
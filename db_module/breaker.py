@@ -0,0 +1,143 @@
+"""
+DB 서킷 브레이커 + 요청별 마감 시간
+- 연결/쿼리가 연속으로 failure_threshold번 실패(연결 불가, 타임아웃, 끊김)하면 cooldown초 동안 열림(open)
+  → 그동안 get_connection은 MySQL에 붙지 않고 바로 DatabaseUnavailable (스레드가 드라이버 타임아웃만큼 묶이지 않음)
+- cooldown이 지나면 한 요청만 시험 삼아 통과(half-open) → 성공하면 닫힘, 실패하면 다시 cooldown
+  (시험 요청이 결과를 알리지 않고 끝나도 cooldown이 지나면 다음 요청이 다시 시험)
+- db_deadline(초): 이 안에서 여는 연결은 connect/read/write 타임아웃을 남은 시간으로 줄임 (Flask 요청마다 사용)
+"""
+import contextlib
+import contextvars
+import threading
+import time
+from typing import Any, Dict, Iterator, Optional
+
+import pymysql
+
+# 연결이 안 되거나 끊긴 경우 (쿼리 문법 오류 / 권한 오류 등은 서버가 살아 있는 것이므로 제외)
+#   2003 연결 불가, 2006 서버 사라짐, 2013 쿼리 중 연결 끊김(읽기 타임아웃 포함), 2055 소켓 오류
+UNAVAILABLE_CODES = {2003, 2006, 2013, 2055}
+
+
+class DatabaseUnavailable(pymysql.err.OperationalError):
+    """
+    브레이커가 열려 있거나 마감 시간이 지나 DB에 요청하지 않음
+    (OperationalError라서 기존 except / 저널 재시도 경로가 그대로 동작)
+    """
+
+
+def is_unavailable(error: BaseException) -> bool:
+    if isinstance(error, DatabaseUnavailable):
+        return False  # 브레이커가 만든 오류는 실패로 다시 세지 않음
+    if isinstance(error, (pymysql.err.OperationalError, pymysql.err.InterfaceError)):
+        code = error.args[0] if error.args else None
+        return code in UNAVAILABLE_CODES or isinstance(error, pymysql.err.InterfaceError)
+    return isinstance(error, (OSError, TimeoutError))
+
+
+class CircuitBreaker:
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold: int = 5, cooldown: float = 15.0, name: str = "db"):
+        """
+        :param failure_threshold: 연속 실패 몇 번에 열지
+        :param cooldown: 열린 뒤 시험 요청을 보내기까지 기다릴 초
+        """
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown = cooldown
+        self.name = name
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.opens = 0
+        self.rejected = 0
+        self.last_error: Optional[str] = None
+        self._probing = False
+        self._probe_started = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> None:
+        """
+        요청 전에 호출 — 막혀 있으면 DatabaseUnavailable
+        """
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.cooldown:
+                self.state = self.HALF_OPEN
+                self._probing = False
+            if self.state == self.HALF_OPEN and (
+                    not self._probing or time.monotonic() - self._probe_started >= self.cooldown):
+                self._probing = True  # 이 요청 하나만 시험 삼아 통과
+                self._probe_started = time.monotonic()
+                return
+            self.rejected += 1
+            retry_in = max(0.0, self.cooldown - (time.monotonic() - self.opened_at))
+        raise DatabaseUnavailable(2003, f"{self.name} circuit open (retry in {retry_in:.1f}s): {self.last_error}")
+
+    def retry_after(self) -> float:
+        if self.state == self.CLOSED:
+            return 0.0
+        return max(0.0, self.cooldown - (time.monotonic() - self.opened_at))
+
+    def success(self) -> None:
+        if self.state == self.CLOSED and not self.failures:
+            return
+        with self._lock:
+            if self.state != self.CLOSED:
+                print(f"[{self.name}] circuit closed")
+            self.state = self.CLOSED
+            self.failures = 0
+            self._probing = False
+
+    def failure(self, error: BaseException) -> None:
+        with self._lock:
+            self.failures += 1
+            self.last_error = f"{type(error).__name__}: {error}"
+            if self.state == self.HALF_OPEN or (self.state == self.CLOSED and self.failures >= self.failure_threshold):
+                if self.state == self.CLOSED:
+                    print(f"❌ [{self.name}] circuit open after {self.failures} failures: {self.last_error}")
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+                self.opens += 1
+                self._probing = False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "opens": self.opens,
+            "rejected": self.rejected,
+            "retry_in_s": round(self.retry_after(), 1),
+            "last_error": self.last_error,
+        }
+
+
+# --- 요청별 마감 시간 ---
+
+_deadline: contextvars.ContextVar = contextvars.ContextVar("db_deadline", default=None)
+
+
+def remaining() -> Optional[float]:
+    """
+    현재 마감까지 남은 초 (마감이 없으면 None)
+    """
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def start_deadline(seconds: Optional[float]) -> contextvars.Token:
+    return _deadline.set(time.monotonic() + seconds if seconds else None)
+
+
+def end_deadline(token: contextvars.Token) -> None:
+    _deadline.reset(token)
+
+
+@contextlib.contextmanager
+def db_deadline(seconds: Optional[float]) -> Iterator[None]:
+    token = start_deadline(seconds)
+    try:
+        yield
+    finally:
+        end_deadline(token)
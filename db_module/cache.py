@@ -0,0 +1,127 @@
+"""
+리더보드 랭킹 스냅샷 캐시 (웹 /api/leaderboard, 디스코드 /leaderboard 공용)
+- 난이도 1~3 랭킹을 한 번에 읽어 스냅샷으로 보관
+- ttl이 지나면 다음 요청에서 갱신 (갱신 중에는 다른 요청이 이전 스냅샷을 그대로 사용)
+- 같은 프로세스에서 점수를 쓰면 score 쓰기 리스너로 즉시 무효화
+- DB가 죽었거나 서킷 브레이커가 열려 있으면 마지막 스냅샷을 그대로 반환 (degraded)
+"""
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import db_module.score as score
+
+# 난이도 번호 → API 키
+DIFFICULTIES = {1: "easy", 2: "normal", 3: "hard"}
+
+
+class RankingSnapshot:
+    __slots__ = ("version", "updated_at", "rankings")
+
+    def __init__(self, version: int, updated_at: Optional[float], rankings: Dict[int, List[Dict[str, Any]]]):
+        self.version = version
+        self.updated_at = updated_at        # time.time() 기준 (None: 아직 한 번도 읽지 못함)
+        self.rankings = rankings            # {난이도: [{class_id, score, client}, ...]}
+
+    def as_api(self) -> Dict[str, List[Dict[str, Any]]]:
+        return {name: self.rankings.get(d, []) for d, name in DIFFICULTIES.items()}
+
+
+class RankingCache:
+    def __init__(self, ttl: float = 5.0, limit: int = 10):
+        """
+        :param ttl: 스냅샷 유효 시간 (초)
+        :param limit: 난이도별 상위 몇 명
+        """
+        self.ttl = ttl
+        self.limit = limit
+        self._snapshot: Optional[RankingSnapshot] = None
+        self._fetched_at = 0.0              # time.monotonic() 기준
+        self._stale = True
+        self._refresh_lock = threading.Lock()
+        self.refreshes = 0
+        self.hits = 0
+        self.failures = 0
+        self.degraded = False               # 마지막 갱신이 실패해서 이전 스냅샷을 쓰는 중
+        self.last_error: Optional[str] = None
+
+    def peek(self) -> Optional[RankingSnapshot]:
+        """
+        DB를 건드리지 않고 현재 스냅샷만 반환 (없으면 None)
+        """
+        return self._snapshot
+
+    def is_fresh(self) -> bool:
+        return (
+            self._snapshot is not None
+            and not self._stale
+            and time.monotonic() - self._fetched_at < self.ttl
+        )
+
+    def get(self) -> RankingSnapshot:
+        """
+        신선하면 캐시, 아니면 갱신 후 반환
+        - 다른 스레드가 이미 갱신 중이면 기다리지 않고 이전 스냅샷 반환
+        """
+        if self.is_fresh():
+            self.hits += 1
+            return self._snapshot
+        # 스냅샷이 아직 없을 때만 갱신을 기다림 (_snapshot은 한 번만 읽어서 판단)
+        snapshot = self._snapshot
+        if not self._refresh_lock.acquire(blocking=snapshot is None):
+            self.hits += 1
+            return snapshot
+        try:
+            if self.is_fresh():
+                return self._snapshot
+            return self._refresh_locked()
+        finally:
+            self._refresh_lock.release()
+
+    def refresh(self) -> RankingSnapshot:
+        """
+        무조건 DB에서 다시 읽기 (주기적 갱신 작업용)
+        """
+        with self._refresh_lock:
+            return self._refresh_locked()
+
+    def _refresh_locked(self) -> RankingSnapshot:
+        self._stale = False
+        try:
+            rankings = {d: score.fetch_ranking_by_difficulty(d, limit=self.limit) or [] for d in DIFFICULTIES}
+        except Exception as e:
+            # DB 장애 / 브레이커 열림 → 마지막 스냅샷을 그대로 내보내고 ttl 뒤에 다시 시도
+            self.failures += 1
+            self.last_error = f"{type(e).__name__}: {e}"
+            self._fetched_at = time.monotonic()
+            if self._snapshot is None:
+                self._snapshot = RankingSnapshot(0, None, {})
+            self.degraded = True
+            return self._snapshot
+        version = self._snapshot.version + 1 if self._snapshot else 1
+        self._snapshot = RankingSnapshot(version, time.time(), rankings)
+        self._fetched_at = time.monotonic()
+        self.refreshes += 1
+        self.degraded = False
+        return self._snapshot
+
+    def invalidate(self) -> None:
+        self._stale = True
+
+    def stats(self) -> Dict[str, Any]:
+        snap = self._snapshot
+        return {
+            "version": snap.version if snap else 0,
+            "updated_at": snap.updated_at if snap else None,
+            "refreshes": self.refreshes,
+            "hits": self.hits,
+            "failures": self.failures,
+            "degraded": self.degraded,
+            "last_error": self.last_error,
+        }
+
+
+# 프로세스 공용 인스턴스
+ranking_cache = RankingCache(ttl=float(os.getenv("LEADERBOARD_CACHE_TTL", "5")))
+score.add_write_listener(ranking_cache.invalidate)
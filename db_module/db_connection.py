@@ -1,16 +1,227 @@
-import pymysql
-from pymysql.cursors import DictCursor
+from pymysql.connections import Connection
+from pymysql.constants import SERVER_STATUS
 from dotenv import load_dotenv
 import os
+import threading
+import time
+
+from db_module.breaker import CircuitBreaker, DatabaseUnavailable, is_unavailable, remaining
+from db_module.instrument import InstrumentedCursor, caller_name, db_metrics
 load_dotenv()
 
+# 타임아웃 (초) — 드라이버 기본값(연결 10초, 읽기/쓰기 무제한) 대신
+DB_CONNECT_TIMEOUT = float(os.getenv('DB_CONNECT_TIMEOUT', '3'))
+DB_READ_TIMEOUT = float(os.getenv('DB_READ_TIMEOUT', '10'))
+DB_WRITE_TIMEOUT = float(os.getenv('DB_WRITE_TIMEOUT', '10'))
+
+# 연속 실패 DB_BREAKER_FAILURES번이면 DB_BREAKER_COOLDOWN초 동안 바로 실패 처리
+db_breaker = CircuitBreaker(
+    failure_threshold=int(os.getenv('DB_BREAKER_FAILURES', '5')),
+    cooldown=float(os.getenv('DB_BREAKER_COOLDOWN', '15')),
+)
+
+# 프로세스별 연결 풀: 쉬는 연결을 최대 DB_POOL_SIZE개 보관 (0이면 매번 새로 연결 — 게임 / 봇 기본값)
+# 웹 서버(serve.py / gunicorn.conf.py)는 워커 스레드 수만큼 켬
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '0'))
+# 이만큼(초) 쉬던 연결은 꺼내기 전에 ping (MySQL wait_timeout으로 끊긴 연결 걸러내기)
+DB_POOL_PING_AFTER = float(os.getenv('DB_POOL_PING_AFTER', '30'))
+
+
+class ConnectionPool:
+    """
+    get_connection이 꺼내 쓰고 conn.close()가 돌려놓는 쉬는 연결 보관함 (LIFO)
+    - 포크된 자식 프로세스에서는 부모가 만든 연결을 쓰지 않고 빈 풀로 시작
+    """
+
+    def __init__(self, max_idle: int = 0, ping_after: float = 30.0):
+        """
+        :param max_idle: 보관할 최대 연결 수 (0이면 풀 꺼짐)
+        :param ping_after: 이 시간(초) 이상 쉬던 연결은 꺼낼 때 ping
+        """
+        self.max_idle = max_idle
+        self.ping_after = ping_after
+        self.created = 0
+        self.reused = 0
+        self.discarded = 0
+        self._idle = []                     # [(연결, 돌려놓은 time.monotonic())]
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+
+    def _check_pid(self):
+        # _lock 안에서 호출. 부모 소켓에 QUIT을 보내면 부모 쪽 연결이 끊기므로 닫지 않고 버림
+        if self._pid != os.getpid():
+            self._idle = []
+            self._pid = os.getpid()
+
+    def take(self, read_timeout, write_timeout):
+        """
+        쉬는 연결 하나 (없으면 None) — 이번 요청의 타임아웃으로 바꿔서 반환
+        """
+        while True:
+            with self._lock:
+                self._check_pid()
+                if not self._idle:
+                    return None
+                conn, since = self._idle.pop()
+            conn._read_timeout = read_timeout
+            conn._write_timeout = write_timeout
+            if time.monotonic() - since < self.ping_after:
+                break
+            try:
+                conn.ping()
+                break
+            except Exception:
+                self.discarded += 1
+                conn._force_close()
+        self.reused += 1
+        return conn
+
+    def give(self, conn) -> bool:
+        """
+        :return: 보관했으면 True, 아니면 False (호출자가 닫음)
+        """
+        if not conn.open or len(self._idle) >= self.max_idle:
+            return False
+        try:
+            # 커밋하지 않은 SELECT의 트랜잭션(REPEATABLE READ 스냅샷)을 다음 사용자에게 넘기지 않음
+            if conn.server_status is None or conn.server_status & SERVER_STATUS.SERVER_STATUS_IN_TRANS:
+                conn.rollback()
+        except Exception:
+            return False
+        with self._lock:
+            self._check_pid()
+            if len(self._idle) >= self.max_idle:
+                return False
+            self._idle.append((conn, time.monotonic()))
+        return True
+
+    def clear(self) -> int:
+        with self._lock:
+            self._check_pid()
+            idle, self._idle = self._idle, []
+        for conn, _ in idle:
+            try:
+                Connection.close(conn)
+            except Exception:
+                pass
+        return len(idle)
+
+    def stats(self):
+        return {
+            "max_idle": self.max_idle,
+            "idle": len(self._idle),
+            "created": self.created,
+            "reused": self.reused,
+            "discarded": self.discarded,
+        }
+
+
+db_pool = ConnectionPool(max_idle=DB_POOL_SIZE, ping_after=DB_POOL_PING_AFTER)
+
+
+class _GuardedConnection(Connection):
+    def connect(self, sock=None):
+        # 핸드셰이크(서버 인사 / 인증) 읽기도 connect_timeout 안에서 끝나야 함
+        # (드라이버는 TCP 연결에만 connect_timeout, 나머지는 read_timeout을 씀)
+        read_timeout = self._read_timeout
+        if self.connect_timeout:
+            self._read_timeout = min(read_timeout or self.connect_timeout, self.connect_timeout)
+        try:
+            super().connect(sock)
+        finally:
+            self._read_timeout = read_timeout
+            if self._sock is not None:
+                self._sock.settimeout(read_timeout)
+                self._current_timeout = read_timeout
+
+    # 쿼리 중 타임아웃 / 연결 끊김도 브레이커 실패로 셈
+    # 서버가 오류로 답한 경우(중복 키, 문법, 데드락 등)는 DB가 살아 있는 것이므로 성공
+    def query(self, sql, unbuffered=False):
+        try:
+            result = super().query(sql, unbuffered)
+        except Exception as e:
+            if is_unavailable(e):
+                db_breaker.failure(e)
+            else:
+                db_breaker.success()
+            raise
+        db_breaker.success()
+        return result
+
+    # 풀이 켜져 있으면 닫지 않고 풀에 돌려놓음 (기존 try / finally: conn.close() 코드 그대로)
+    def close(self):
+        if not self._closed and db_pool.max_idle and db_pool.give(self):
+            return
+        super().close()
+
+
+def _timeout(configured):
+    # 요청 마감(db_deadline)이 있으면 남은 시간으로 줄임
+    left = remaining()
+    if left is None:
+        return configured
+    if left <= 0:
+        raise DatabaseUnavailable(2003, "db deadline exceeded")
+    return min(configured, left)
+
+
 def get_connection():
-    return pymysql.connect(
-        host=os.getenv('DB_HOST'),          # 🔹 DB 주소
-        user=os.getenv('DB_USER'),               # 🔹 DB 사용자명
-        port=int(os.getenv('DB_PORT')),
-        password=os.getenv('DB_PASSWORD'),         # 🔹 DB 비밀번호
-        database=os.getenv('DB_NAME'),        # 🔹 DB 이름
-        charset='utf8mb4',
-        cursorclass=DictCursor
-    )
\ No newline at end of file
+    connect_timeout = _timeout(DB_CONNECT_TIMEOUT)
+    read_timeout = _timeout(DB_READ_TIMEOUT)
+    write_timeout = _timeout(DB_WRITE_TIMEOUT)
+    db_breaker.allow()
+    started = time.perf_counter()
+    if db_pool.max_idle:
+        conn = db_pool.take(read_timeout, write_timeout)
+        if conn is not None:
+            db_metrics.observe_acquire(caller_name(), (time.perf_counter() - started) * 1000)
+            return conn
+    try:
+        conn = _GuardedConnection(
+            host=os.getenv('DB_HOST'),          # 🔹 DB 주소
+            user=os.getenv('DB_USER'),               # 🔹 DB 사용자명
+            port=int(os.getenv('DB_PORT')),
+            password=os.getenv('DB_PASSWORD'),         # 🔹 DB 비밀번호
+            database=os.getenv('DB_NAME'),        # 🔹 DB 이름
+            charset='utf8mb4',
+            cursorclass=InstrumentedCursor,     # 쿼리 계측 (db_module.instrument)
+            connect_timeout=connect_timeout,
+            read_timeout=read_timeout,
+            write_timeout=write_timeout,
+        )
+    except Exception as e:
+        db_metrics.observe_acquire(caller_name(), (time.perf_counter() - started) * 1000, error=True)
+        if is_unavailable(e):
+            db_breaker.failure(e)
+        else:
+            db_breaker.success()  # 서버는 응답함 (인증 오류 등)
+        raise
+    db_metrics.observe_acquire(caller_name(), (time.perf_counter() - started) * 1000)
+    db_breaker.success()
+    db_pool.created += 1
+    return conn
+
+
+def warm_pool(count=None) -> int:
+    """
+    트래픽을 받기 전에 풀을 미리 채움 (웹 워커 시작 시)
+    :param count: 열 연결 수 (기본: 풀 크기)
+    :return: 실제로 연 연결 수 (DB가 죽어 있으면 그 전까지)
+    """
+    count = db_pool.max_idle if count is None else min(count, db_pool.max_idle)
+    conns = []
+    try:
+        for _ in range(count):
+            conns.append(get_connection())
+    except Exception as e:
+        print(f"❌ [db] pool warm-up stopped after {len(conns)} connections: {e}")
+    for conn in conns:
+        conn.close()
+    return len(conns)
+
+
+def close_pool() -> int:
+    """
+    풀에 남은 연결을 모두 닫음 (서버 종료 시)
+    """
+    return db_pool.clear()
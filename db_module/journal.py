@@ -0,0 +1,394 @@
+"""
+점수 쓰기 로컬 저널 (write-behind)
+- 쓰기는 먼저 JSONL 파일에 append + fsync → 그 시점에 결과가 보존됨 (MySQL이 느리거나 죽어 있어도 게임은 그대로 진행)
+- 백그라운드 스레드가 저널을 앞에서부터 읽어 묶음으로 MySQL에 반영하고, 반영한 위치를 <저널>.offset에 기록
+- 라운드마다 op_id(중복 방지 키)를 붙여서 전송 도중 죽었다 다시 보내도 BCD2025_ROUND / 집계가 두 번 들어가지 않음
+- 연결 오류면 지수 백오프로 재시도, 데이터 오류(잘못된 행)면 <저널>.rejected로 옮기고 다음으로 넘어감
+- 저널을 모두 반영하면 파일을 비움 / 다음 실행 때 남아 있던 기록부터 다시 반영
+
+한 프로세스가 저널 파일 하나를 씁니다 (키오스크 여러 대는 각자 자기 로컬 파일).
+"""
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Tuple
+
+import pymysql
+
+import db_module.score as score_db
+from db_module.score import (
+    ADD_AI_SCORE_SQL,
+    INSERT_AI_DATA_SQL,
+    INSERT_ROUND_SQL,
+    UPSERT_PLAYER_STATS_SQL,
+    ScoreWriteBatcher,
+    round_params,
+)
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_JOURNAL = os.path.join(ROOT_DIR, "logs", "score_journal.jsonl")
+
+RETRY_MIN_S = 0.5
+RETRY_MAX_S = 30.0
+
+# 다시 시도해도 되는 오류 (연결 끊김 / 타임아웃 / 서버 다운)
+RETRYABLE_ERRORS = (pymysql.err.OperationalError, pymysql.err.InterfaceError, OSError)
+
+Entry = Tuple[int, Dict[str, Any]]  # (이 줄이 끝나는 바이트 위치, 기록)
+
+
+class ScoreJournal:
+    def __init__(self, path: str = DEFAULT_JOURNAL):
+        self.path = path
+        self.offset_path = path + ".offset"
+        self.rejected_path = path + ".rejected"
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.committed = self._read_offset()
+        if self.committed > self.size():
+            # 저널은 비웠는데 offset을 쓰기 전에 꺼진 경우 → 처음부터 (op_id로 중복 반영은 막힘)
+            self.committed = 0
+            self._write_offset(0)
+
+    def _read_offset(self) -> int:
+        try:
+            with open(self.offset_path, encoding="utf-8") as f:
+                return int(f.read().strip() or 0)
+        except (OSError, ValueError):
+            return 0
+
+    def _write_offset(self, offset: int) -> None:
+        tmp = self.offset_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(str(offset))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.offset_path)
+
+    def size(self) -> int:
+        try:
+            return os.path.getsize(self.path)
+        except OSError:
+            return 0
+
+    def pending_bytes(self) -> int:
+        return max(0, self.size() - self.committed)
+
+    def append(self, record: Dict[str, Any]) -> None:
+        """
+        한 줄 추가 후 fsync (반환되면 디스크에 기록된 것)
+        """
+        line = (json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+        with self._lock:
+            with open(self.path, "ab") as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def read(self, max_entries: int) -> List[Entry]:
+        """
+        아직 반영하지 않은 기록을 앞에서부터 최대 max_entries개
+        - 줄바꿈이 없는 마지막 줄(쓰는 도중 꺼진 경우)은 건너뜀
+        """
+        out: List[Entry] = []
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(self.committed)
+                pos = self.committed
+                while len(out) < max_entries:
+                    line = f.readline()
+                    if not line.endswith(b"\n"):
+                        break
+                    pos += len(line)
+                    try:
+                        out.append((pos, json.loads(line)))
+                    except ValueError:
+                        out.append((pos, {"kind": "corrupt", "raw": line.decode("utf-8", "replace")}))
+        except FileNotFoundError:
+            pass
+        return out
+
+    def commit(self, offset: int) -> None:
+        """
+        offset까지 반영 완료 기록 / 전부 반영됐으면 저널을 비움
+        """
+        with self._lock:
+            if offset >= self.size():
+                # offset을 먼저 0으로 → 비우기 전에 꺼져도 다시 읽을 뿐 (라운드는 op_id로 한 번만 반영)
+                self._write_offset(0)
+                self.committed = 0
+                with open(self.path, "wb"):
+                    pass
+                return
+            self._write_offset(offset)
+            self.committed = offset
+
+    def reject(self, record: Dict[str, Any], error: Exception) -> None:
+        with open(self.rejected_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"error": f"{type(error).__name__}: {error}", "record": record}, ensure_ascii=False) + "\n")
+
+
+def _apply(cursor, records: List[Dict[str, Any]]) -> None:
+    """
+    기록 묶음을 MySQL에 반영 (같은 트랜잭션 안에서 호출)
+    - 라운드는 op_id가 이미 있으면 건너뜀 → 라운드 로그 / 집계 / 누적 점수(add_score) 모두 정확히 한 번
+    - ai_data(예전 저널의 절댓값 upsert)는 다시 보내도 결과가 같음
+    """
+    round_ops = [r["op"] for r in records if r["kind"] == "round"]
+    done = set()
+    if round_ops:
+        cursor.execute(
+            "SELECT op_id FROM BCD2025_ROUND WHERE op_id IN (%s)" % ", ".join(["%s"] * len(round_ops)),
+            round_ops,
+        )
+        done = {row["op_id"] for row in cursor.fetchall()}
+
+    rounds, stats, deltas, ai_rows = [], [], [], []
+    for r in records:
+        if r["kind"] == "round":
+            if r["op"] in done:
+                continue
+            done.add(r["op"])
+            args = dict(r["args"])
+            add_score = args.pop("add_score", False)
+            round_row, stats_row = round_params(**args, op_id=r["op"])
+            rounds.append(round_row)
+            stats.append(stats_row)
+            if add_score:
+                deltas.append((args["difficulty"], args["class_id"], args["round_score"], args["client"]))
+        elif r["kind"] == "ai_data":
+            ai_rows.append(tuple(r["args"]))
+        else:
+            raise ValueError(f"unknown journal record: {r.get('kind')}")
+    if rounds:
+        cursor.executemany(INSERT_ROUND_SQL, rounds)
+        cursor.executemany(UPSERT_PLAYER_STATS_SQL, stats)
+    if deltas:
+        cursor.executemany(ADD_AI_SCORE_SQL, deltas)
+    if ai_rows:
+        cursor.executemany(INSERT_AI_DATA_SQL, ai_rows)
+
+
+class JournaledScoreWriter(ScoreWriteBatcher):
+    """
+    ScoreWriteBatcher와 같은 submit_round / submit_ai_data / flush / close / stats
+    - submit은 저널에 fsync한 뒤 바로 반환 (MySQL을 기다리지 않음)
+    - Future 결과: True = MySQL 반영, False = 저널에만 있음 (나중에 자동 반영)
+    """
+
+    def __init__(self, path: str = DEFAULT_JOURNAL, **kwargs):
+        super().__init__(**kwargs)
+        self.journal = ScoreJournal(path)
+        self._wake = threading.Event()
+        self._idle = threading.Event()
+        self._futures: Dict[str, Future] = {}
+        self.replayed = 0
+        self.rejected = 0
+        self.retry_in = 0.0
+        self.last_error: Optional[str] = None
+        if self.journal.pending_bytes():
+            self._ensure_thread()  # 지난 실행에서 남은 기록부터 반영
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="score-journal", daemon=True)
+            self._thread.start()
+
+    # --- 호출 쪽 ---
+
+    def _append(self, kind: str, args) -> Future:
+        op = uuid.uuid4().hex
+        fut = Future()
+        record = {"op": op, "kind": kind, "ts": round(time.time(), 3), "args": args}
+        try:
+            self.journal.append(record)
+        except OSError as e:
+            # 저널을 못 쓰면 (디스크 꽉 참 등) 바로 MySQL에 쓰는 쪽으로
+            print("❌ Error writing score journal:", e)
+            if kind == "round":
+                score_db.record_round(**args)
+            else:
+                score_db.insert_ai_data(*args)
+            fut.set_result(True)
+            return fut
+        with self._lock:
+            self._futures[op] = fut
+            if not self._closed:
+                self._ensure_thread()
+        self._idle.clear()
+        self._wake.set()
+        return fut
+
+    def submit_round(self, class_id, quiz_id, difficulty, winner, reason, elapsed_ms, round_score,
+                     human_correct=None, ai_correct=None, ai_model=None, client=None, add_score=False) -> Future:
+        return self._append("round", {
+            "class_id": class_id, "quiz_id": quiz_id, "difficulty": difficulty, "winner": winner,
+            "reason": reason, "elapsed_ms": elapsed_ms, "round_score": round_score,
+            "human_correct": human_correct, "ai_correct": ai_correct, "ai_model": ai_model, "client": client,
+            "add_score": bool(add_score),
+        })
+
+    def submit_ai_data(self, difficulty, class_id, score, client=None) -> Future:
+        return self._append("ai_data", [difficulty, class_id, score, client])
+
+    def flush(self, timeout=None) -> bool:
+        """
+        저널이 모두 MySQL에 반영될 때까지 대기 (DB가 죽어 있으면 timeout까지)
+        """
+        if not self.journal.pending_bytes():
+            return True
+        self._ensure_thread()
+        self._idle.clear()
+        self._wake.set()
+        return self._idle.wait(timeout) and not self.journal.pending_bytes()
+
+    def close(self, timeout: float = 5.0) -> None:
+        """
+        timeout 동안 남은 기록 반영을 시도하고 종료 (못 보낸 것은 저널에 남아 다음 실행 때 반영)
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            thread = self._thread
+        self._wake.set()
+        if thread is not None:
+            thread.join(timeout)
+            if thread.is_alive():
+                print(f"❌ score journal replay did not finish within {timeout}s")
+                return
+        pending = self.journal.pending_bytes()
+        if pending:
+            print(f"[score] {pending} bytes left in {self.journal.path} — replayed on next start")
+        if self.batches:
+            summary = self.batch_sizes.summary()
+            print(f"[score] {self.rows} journal records in {self.batches} batches "
+                  f"(mean {summary['mean']}, max {summary['max']}, rejected {self.rejected})")
+        self._close_conn()
+
+    # --- 반영 스레드 ---
+
+    def _run(self):
+        while True:
+            if not self._closed:
+                self._wake.wait(self.retry_in or None)
+                self._wake.clear()
+                if self.max_delay and not self._closed:
+                    time.sleep(self.max_delay)  # 잠깐 모아서 한 번에
+            self._drain()
+            self._idle.set()
+            if self._closed:
+                return  # close() 뒤에는 한 번만 시도 (못 보낸 것은 저널에 남음)
+
+    def _drain(self) -> None:
+        while True:
+            entries = self.journal.read(self.max_rows)
+            if not entries:
+                self.retry_in = 0.0
+                return
+            if not self._replay(entries):
+                # 연결 오류 → 기다리는 호출자에게는 '저널에만 있음'으로 알려주고 백오프 후 재시도
+                self._resolve([r for _, r in entries], False)
+                self.retry_in = min(RETRY_MAX_S, max(RETRY_MIN_S, self.retry_in * 2))
+                return
+
+    def _replay(self, entries: List[Entry]) -> bool:
+        """
+        :return: False면 연결 오류 (저널 그대로, 나중에 재시도)
+        """
+        records = [r for _, r in entries]
+        started = time.perf_counter()
+        try:
+            conn = self._connection()
+            try:
+                with conn.cursor() as cursor:
+                    _apply(cursor, records)
+                conn.commit()
+            except Exception:
+                try:
+                    conn.rollback()
+                except Exception:
+                    self._close_conn()
+                raise
+        except RETRYABLE_ERRORS as e:
+            self._close_conn()
+            if self._poison(entries, e):
+                return True
+            self.last_error = f"{type(e).__name__}: {e}"
+            if not self.retry_in:
+                print("❌ MySQL unavailable, keeping scores in journal:", e)
+            return False
+        except Exception as e:
+            # 잘못된 행이 섞임 → 한 건씩 반영해서 그 행만 빼냄
+            if len(entries) > 1:
+                for entry in entries:
+                    if not self._replay([entry]):
+                        return False
+                return True
+            self._reject(entries[0], e)
+            return True
+
+        self.journal.commit(entries[-1][0])
+        if self.retry_in:
+            print(f"[score] MySQL back, replayed journal ({len(records)} records)")
+        self.retry_in = 0.0
+        self.last_error = None
+        self.batches += 1
+        self.rows += len(records)
+        self.replayed += len(records)
+        self.batch_sizes.observe(len(records))
+        self.flush_ms.observe((time.perf_counter() - started) * 1000)
+        notify = getattr(score_db, "_notify_write", None)  # 리더보드 캐시 무효화 (있으면)
+        if notify is not None:
+            notify()
+        self._resolve(records, True)
+        return True
+
+    def _poison(self, entries: List[Entry], error: Exception) -> bool:
+        # OperationalError 중 데이터 문제(예: 1366 잘못된 값)는 재시도해도 같음 → 한 건이면 거부
+        code = error.args[0] if isinstance(error, pymysql.err.OperationalError) and error.args else None
+        if len(entries) == 1 and code in (1048, 1264, 1366, 1406):
+            self._reject(entries[0], error)
+            return True
+        return False
+
+    def _reject(self, entry: Entry, error: Exception) -> None:
+        offset, record = entry
+        print("❌ Rejected score journal record:", error)
+        self.journal.reject(record, error)
+        self.journal.commit(offset)
+        self.rejected += 1
+        self.failed += 1
+        fut = self._futures.pop(record.get("op"), None)
+        if fut is not None:
+            fut.set_exception(error)
+
+    def _resolve(self, records: List[Dict[str, Any]], committed: bool) -> None:
+        with self._lock:
+            for r in records:
+                fut = self._futures.pop(r.get("op"), None) if committed else self._futures.get(r.get("op"))
+                if fut is not None and not fut.done():
+                    fut.set_result(committed)
+
+    def stats(self) -> Dict[str, Any]:
+        out = super().stats()
+        out.update({
+            "journal": self.journal.path,
+            "pending_bytes": self.journal.pending_bytes(),
+            "replayed": self.replayed,
+            "rejected": self.rejected,
+            "retry_in_s": self.retry_in,
+            "last_error": self.last_error,
+        })
+        return out
+
+
+def make_score_writer(path: Optional[str] = None) -> ScoreWriteBatcher:
+    """
+    SCORE_JOURNAL 환경 변수 기준 writer (빈 값이면 저널 없이 db_module.score.score_writer)
+    """
+    path = os.getenv("SCORE_JOURNAL", DEFAULT_JOURNAL) if path is None else path
+    return JournaledScoreWriter(path) if path else score_db.score_writer
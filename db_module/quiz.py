@@ -1,6 +1,10 @@
 from typing import List, Optional, Dict, Any
+from pymysql.err import InterfaceError, OperationalError
 from db_module.db_connection import get_connection
 
+# 연결 끊김 / 타임아웃 / 브레이커(DatabaseUnavailable)는 빈 결과로 삼키지 않고 호출자에게 (웹은 503)
+_OUTAGE_ERRORS = (OperationalError, InterfaceError)
+
 
 def add_quiz(
     difficulty: Optional[int],
@@ -123,6 +127,8 @@ def list_quiz_titles(
             return rows or []
     except Exception as e:
         print("❌ Error listing quiz titles:", e)
+        if isinstance(e, _OUTAGE_ERRORS):
+            raise
         return []
     finally:
         conn.close()
@@ -170,6 +176,8 @@ def update_quiz(
             return cursor.rowcount > 0
     except Exception as e:
         print("❌ Error updating quiz:", e)
+        if isinstance(e, _OUTAGE_ERRORS):
+            raise
         return False
     finally:
         conn.close()
@@ -188,6 +196,8 @@ def delete_quiz(quiz_id: int) -> bool:
             return cursor.rowcount > 0
     except Exception as e:
         print("❌ Error deleting quiz:", e)
+        if isinstance(e, _OUTAGE_ERRORS):
+            raise
         return False
     finally:
         conn.close()
@@ -0,0 +1,89 @@
+"""
+라운드 기록 / 플레이어 집계 테이블
+- BCD2025_ROUND: 한 판에 한 줄 (append-only, 수정/삭제 없음)
+- BCD2025_PLAYER_STATS: (학번, 난이도)별 누적 점수 / 최고 점수 / 판 수 / 승 수
+  → record_round가 라운드를 넣는 같은 트랜잭션에서 증분 갱신, 리더보드는 이 테이블만 읽음
+
+실행 (처음 한 번, 여러 번 실행해도 안전):
+    python -m db_module.schema
+"""
+from db_module.db_connection import get_connection
+
+ROUND_TABLE = """
+CREATE TABLE IF NOT EXISTS BCD2025_ROUND (
+    id            BIGINT UNSIGNED NOT NULL AUTO_INCREMENT,
+    played_at     DATETIME(3)     NOT NULL DEFAULT CURRENT_TIMESTAMP(3),
+    class_id      VARCHAR(32)     NOT NULL,
+    quiz_id       INT             NULL,
+    difficulty    TINYINT         NOT NULL,
+    winner        VARCHAR(8)      NOT NULL,
+    reason        VARCHAR(16)     NOT NULL,
+    elapsed_ms    INT             NOT NULL,
+    round_score   INT             NOT NULL,
+    human_correct TINYINT         NULL,
+    ai_correct    TINYINT         NULL,
+    ai_model      VARCHAR(64)     NULL,
+    op_id         CHAR(32)        NULL,
+    PRIMARY KEY (id),
+    UNIQUE KEY uq_round_op (op_id),
+    KEY idx_round_player (class_id, played_at),
+    KEY idx_round_quiz (quiz_id, played_at),
+    KEY idx_round_difficulty (difficulty, played_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+"""
+
+PLAYER_STATS_TABLE = """
+CREATE TABLE IF NOT EXISTS BCD2025_PLAYER_STATS (
+    class_id       VARCHAR(32) NOT NULL,
+    difficulty     TINYINT     NOT NULL,
+    total_score    BIGINT      NOT NULL DEFAULT 0,
+    best_score     INT         NOT NULL DEFAULT 0,
+    attempts       INT         NOT NULL DEFAULT 0,
+    wins           INT         NOT NULL DEFAULT 0,
+    client         VARCHAR(64) NULL,
+    last_played_at DATETIME(3) NOT NULL DEFAULT CURRENT_TIMESTAMP(3),
+    PRIMARY KEY (class_id, difficulty),
+    KEY idx_stats_leaderboard (difficulty, total_score)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+"""
+
+# 저널 재전송 중복 방지 키 (db_module.journal) — 이전 버전으로 만든 테이블에 추가
+ROUND_OP_ID_COLUMN = """
+SELECT COUNT(*) AS n FROM information_schema.COLUMNS
+WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'BCD2025_ROUND' AND COLUMN_NAME = 'op_id'
+"""
+
+ADD_ROUND_OP_ID = """
+ALTER TABLE BCD2025_ROUND
+    ADD COLUMN op_id CHAR(32) NULL,
+    ADD UNIQUE KEY uq_round_op (op_id)
+"""
+
+# 기존 BCD2025_AI(학번당 한 줄, 누적 점수)를 집계 테이블의 시작값으로 복사 (이미 있으면 건너뜀)
+BACKFILL_PLAYER_STATS = """
+INSERT IGNORE INTO BCD2025_PLAYER_STATS (class_id, difficulty, total_score, best_score, attempts, wins, client)
+SELECT class_id, difficulty, score, 0, 0, 0, client
+FROM BCD2025_AI
+"""
+
+
+def ensure_schema(backfill: bool = True) -> None:
+    conn = get_connection()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(ROUND_TABLE)
+            cursor.execute(PLAYER_STATS_TABLE)
+            cursor.execute(ROUND_OP_ID_COLUMN)
+            if not cursor.fetchone()["n"]:
+                cursor.execute(ADD_ROUND_OP_ID)
+            if backfill:
+                cursor.execute(BACKFILL_PLAYER_STATS)
+                print(f"✅ backfilled {cursor.rowcount} player rows from BCD2025_AI")
+        conn.commit()
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    ensure_schema()
+    print("✅ BCD2025_ROUND / BCD2025_PLAYER_STATS ready")
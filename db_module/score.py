@@ -1,24 +1,144 @@
+import atexit
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
 from db_module.db_connection import get_connection
+from stats_module.histogram import RollingHistogram
+
+# 점수가 바뀔 때 호출할 콜백 (예: 리더보드 캐시 무효화)
+_write_listeners = []
+
+
+def add_write_listener(fn):
+    _write_listeners.append(fn)
+
+
+def _notify_write():
+    for fn in _write_listeners:
+        try:
+            fn()
+        except Exception as e:
+            print("❌ Error in score write listener:", e)
+
+INSERT_AI_DATA_SQL = """
+INSERT INTO BCD2025_AI (difficulty, class_id, score, client)
+VALUES (%s, %s, %s, %s)
+ON DUPLICATE KEY UPDATE
+difficulty = VALUES(difficulty),
+score = VALUES(score),
+client = VALUES(client)
+"""
+
+# 이긴 판의 점수를 누적 점수에 더함 (기존 값을 읽어서 절댓값으로 쓰지 않음)
+# → 다른 판이 저널에 남아 있거나 DB 장애로 기존 값을 못 읽어도 누적이 덮어써지지 않음
+ADD_AI_SCORE_SQL = """
+INSERT INTO BCD2025_AI (difficulty, class_id, score, client)
+VALUES (%s, %s, %s, %s)
+ON DUPLICATE KEY UPDATE
+difficulty = VALUES(difficulty),
+score = score + VALUES(score),
+client = VALUES(client)
+"""
 
 def insert_ai_data(difficulty, class_id, score, client=None):
     conn = get_connection()
     try:
         with conn.cursor() as cursor:
-            sql = """
-            INSERT INTO BCD2025_AI (difficulty, class_id, score, client)
-            VALUES (%s, %s, %s, %s)
-            ON DUPLICATE KEY UPDATE
-            difficulty = VALUES(difficulty),
-            score = VALUES(score),
-            client = VALUES(client)
-            """
-            cursor.execute(sql, (difficulty, class_id, score, client))
+            cursor.execute(INSERT_AI_DATA_SQL, (difficulty, class_id, score, client))
         conn.commit()
+        _notify_write()
     except Exception as e:
         print("❌ Error inserting/updating data:", e)
     finally:
         conn.close()
 
+# 라운드 한 판 기록 + (학번, 난이도) 집계 증분 갱신 (테이블: db_module.schema)
+INSERT_ROUND_SQL = """
+INSERT INTO BCD2025_ROUND
+    (class_id, quiz_id, difficulty, winner, reason, elapsed_ms, round_score, human_correct, ai_correct, ai_model, op_id)
+VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+"""
+
+UPSERT_PLAYER_STATS_SQL = """
+INSERT INTO BCD2025_PLAYER_STATS
+    (class_id, difficulty, total_score, best_score, attempts, wins, client)
+VALUES (%s, %s, %s, %s, %s, %s, %s)
+ON DUPLICATE KEY UPDATE
+total_score = total_score + VALUES(total_score),
+best_score = GREATEST(best_score, VALUES(best_score)),
+attempts = attempts + VALUES(attempts),
+wins = wins + VALUES(wins),
+client = COALESCE(VALUES(client), client),
+last_played_at = CURRENT_TIMESTAMP(3)
+"""
+
+
+def round_params(class_id, quiz_id, difficulty, winner, reason, elapsed_ms, round_score,
+                 human_correct=None, ai_correct=None, ai_model=None, client=None, op_id=None):
+    """
+    record_round 인자 → (라운드 INSERT 파라미터, 집계 UPSERT 파라미터)
+    - 점수는 사람이 이긴 판만 누적 (기존 insert_ai_data와 같은 규칙)
+    :param op_id: 중복 방지 키 (저널 재전송용, 없으면 NULL)
+    """
+    won = winner == 'HUMAN'
+    counted = round_score if won else 0
+    round_row = (class_id, quiz_id, difficulty, winner, reason, elapsed_ms, round_score,
+                 human_correct, ai_correct, ai_model, op_id)
+    stats_row = (class_id, difficulty, counted, counted, 1, int(won), client)
+    return round_row, stats_row
+
+
+def record_round(class_id, quiz_id, difficulty, winner, reason, elapsed_ms, round_score,
+                 human_correct=None, ai_correct=None, ai_model=None, client=None, add_score=False):
+    """
+    한 판 결과를 BCD2025_ROUND에 추가하고 BCD2025_PLAYER_STATS를 같은 트랜잭션에서 갱신
+    :param reason: Game.end_game의 reason (CORRECT, WRONG_ANSWER, TOO_SLOW, AI_WRONG)
+    :param human_correct / ai_correct: 1 / 0 / None(답을 내지 않음)
+    :param add_score: True면 round_score를 BCD2025_AI 누적 점수에도 같은 트랜잭션에서 더함
+    """
+    round_row, stats_row = round_params(class_id, quiz_id, difficulty, winner, reason, elapsed_ms, round_score,
+                                        human_correct, ai_correct, ai_model, client)
+    conn = get_connection()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(INSERT_ROUND_SQL, round_row)
+            cursor.execute(UPSERT_PLAYER_STATS_SQL, stats_row)
+            if add_score:
+                cursor.execute(ADD_AI_SCORE_SQL, (difficulty, class_id, round_score, client))
+        conn.commit()
+        _notify_write()
+    except Exception as e:
+        conn.rollback()
+        print("❌ Error recording round:", e)
+    finally:
+        conn.close()
+
+
+def get_player_stats(class_id):
+    """
+    :return: [{difficulty, total_score, best_score, attempts, wins, win_rate, client}, ...] (난이도순)
+    """
+    conn = get_connection()
+    try:
+        with conn.cursor() as cursor:
+            sql = """
+            SELECT difficulty, total_score, best_score, attempts, wins,
+                   IF(attempts > 0, wins / attempts, NULL) AS win_rate, client
+            FROM BCD2025_PLAYER_STATS
+            WHERE class_id = %s
+            ORDER BY difficulty
+            """
+            cursor.execute(sql, (class_id,))
+            return cursor.fetchall()
+    except Exception as e:
+        print("❌ Error fetching player stats:", e)
+        return []
+    finally:
+        conn.close()
+
 def exist(class_id):
     conn = get_connection()
     try:
@@ -55,6 +175,7 @@ def update_ai_score(class_id, new_score):
             sql = "UPDATE BCD2025_AI SET score = %s WHERE class_id = %s"
             cursor.execute(sql, (new_score, class_id))
         conn.commit()
+        _notify_write()
     except Exception as e:
         print("❌ Error updating score:", e)
     finally:
@@ -68,33 +189,297 @@ def delete_ai_data(class_id):
             sql = "DELETE FROM BCD2025_AI WHERE class_id = %s"
             cursor.execute(sql, (class_id,))
         conn.commit()
+        _notify_write()
     except Exception as e:
         print("❌ Error deleting data:", e)
     finally:
         conn.close()
 
-def get_ranking_by_difficulty(difficulty, limit=10):
+def fetch_ranking_by_difficulty(difficulty, limit=10):
     """
-    특정 난이도(difficulty)에 대한 점수 순위 가져오기
+    특정 난이도(difficulty)에 대한 점수 순위 가져오기 (BCD2025_PLAYER_STATS 집계, idx_stats_leaderboard)
+    - 실패하면 예외를 그대로 올림 (RankingCache가 이전 스냅샷을 유지하는 데 사용)
     :param difficulty: 난이도 (예: '1', '2', '3')
     :param limit: 상위 몇 명까지 가져올지 (기본값: 10)
-    :return: [(class_id, score, client), ...] 형태의 리스트
+    :return: [{class_id, score, client, best_score, attempts, win_rate}, ...] 형태의 리스트
     """
     conn = get_connection()
     try:
         with conn.cursor() as cursor:
             sql = """
-            SELECT class_id, score, client
-            FROM BCD2025_AI
+            SELECT class_id, total_score AS score, client, best_score, attempts,
+                   IF(attempts > 0, wins / attempts, NULL) AS win_rate
+            FROM BCD2025_PLAYER_STATS
             WHERE difficulty = %s
-            ORDER BY score DESC
+            ORDER BY total_score DESC
             LIMIT %s
             """
             cursor.execute(sql, (difficulty, limit))
-            result = cursor.fetchall()
-            return result
+            return cursor.fetchall()
+    finally:
+        conn.close()
+
+def get_ranking_by_difficulty(difficulty, limit=10):
+    """
+    fetch_ranking_by_difficulty와 같지만 실패하면 빈 리스트
+    """
+    try:
+        return fetch_ranking_by_difficulty(difficulty, limit)
     except Exception as e:
         print("❌ Error fetching ranking:", e)
         return []
-    finally:
-        conn.close()
\ No newline at end of file
+
+
+# --- 점수 쓰기 묶음 처리 (group commit) ---
+# 키오스크 여러 대가 동시에 라운드를 끝내면 판마다 연결 + commit을 하던 것을 몇 ms 모아서 한 트랜잭션으로 처리
+
+SCORE_BATCH_MAX_ROWS = int(os.getenv("SCORE_BATCH_MAX_ROWS", "50"))
+SCORE_BATCH_MAX_DELAY_MS = float(os.getenv("SCORE_BATCH_MAX_DELAY_MS", "5"))
+
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+
+_STOP = object()
+
+
+class _Pending:
+    __slots__ = ("statements", "future", "enqueued")
+
+    def __init__(self, statements):
+        self.statements = statements        # [(sql, params), ...]
+        self.future = Future()
+        self.enqueued = time.perf_counter()
+
+
+class ScoreWriteBatcher:
+    """
+    쓰기 요청을 백그라운드 스레드 하나가 모아서 flush
+    - 첫 요청 후 max_delay_ms가 지나거나 max_rows개가 모이면 같은 SQL끼리 executemany → commit 한 번
+    - 요청마다 Future 반환 (성공: True, 실패: 예외)
+    - 묶음이 실패하면 요청별 트랜잭션으로 다시 시도해서 문제 있는 한 건만 실패 처리
+    - 연결은 writer 스레드가 계속 재사용 (끊겼으면 ping으로 재연결)
+    """
+
+    def __init__(self, max_rows: int = SCORE_BATCH_MAX_ROWS, max_delay_ms: float = SCORE_BATCH_MAX_DELAY_MS,
+                 connect=get_connection):
+        self.max_rows = max(1, max_rows)
+        self.max_delay = max(0.0, max_delay_ms) / 1000
+        self._connect = connect
+        self._conn = None
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._closed = False
+
+        self.batch_sizes = RollingHistogram(buckets=BATCH_SIZE_BUCKETS)
+        self.flush_ms = RollingHistogram()
+        self.queue_wait_ms = RollingHistogram()
+        self.batches = 0
+        self.rows = 0
+        self.failed = 0
+        self.retried_batches = 0
+
+    # --- 호출 쪽 ---
+
+    def submit(self, statements) -> Future:
+        """
+        :param statements: 한 트랜잭션에 같이 들어갈 [(sql, params), ...]
+        :return: flush가 끝나면 완료되는 Future
+        """
+        item = _Pending(list(statements))
+        with self._lock:
+            if self._closed:
+                # 종료 중에 들어온 쓰기는 그 자리에서 바로 처리
+                self._flush([item])
+                return item.future
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="score-writer", daemon=True)
+                self._thread.start()
+                atexit.register(self.close)
+            self._queue.put(item)
+        return item.future
+
+    def submit_round(self, class_id, quiz_id, difficulty, winner, reason, elapsed_ms, round_score,
+                     human_correct=None, ai_correct=None, ai_model=None, client=None, add_score=False) -> Future:
+        """
+        record_round의 묶음 처리 버전
+        """
+        round_row, stats_row = round_params(class_id, quiz_id, difficulty, winner, reason, elapsed_ms, round_score,
+                                            human_correct, ai_correct, ai_model, client)
+        statements = [(INSERT_ROUND_SQL, round_row), (UPSERT_PLAYER_STATS_SQL, stats_row)]
+        if add_score:
+            statements.append((ADD_AI_SCORE_SQL, (difficulty, class_id, round_score, client)))
+        return self.submit(statements)
+
+    def submit_ai_data(self, difficulty, class_id, score, client=None) -> Future:
+        """
+        insert_ai_data의 묶음 처리 버전
+        """
+        return self.submit([(INSERT_AI_DATA_SQL, (difficulty, class_id, score, client))])
+
+    def flush(self, timeout=None) -> bool:
+        """
+        지금까지 들어온 요청이 모두 처리될 때까지 대기
+        :return: timeout 안에 끝났는지
+        """
+        with self._lock:
+            if self._thread is None or self._closed:
+                return True
+            marker = Future()
+            self._queue.put(marker)
+        try:
+            marker.result(timeout)
+            return True
+        except Exception:
+            return False
+
+    def close(self, timeout: float = 5.0) -> None:
+        """
+        남은 요청을 모두 flush하고 writer 스레드 종료 (atexit에도 등록됨)
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            thread = self._thread
+            if thread is not None:
+                self._queue.put(_STOP)
+        if thread is not None:
+            thread.join(timeout)
+            if thread.is_alive():
+                print(f"❌ score writer did not finish within {timeout}s ({self._queue.qsize()} queued)")
+        if self.batches:
+            summary = self.batch_sizes.summary()
+            print(f"[score] {self.rows} rows in {self.batches} batches "
+                  f"(mean {summary['mean']}, max {summary['max']}, failed {self.failed})")
+
+    # --- writer 스레드 ---
+
+    def _run(self):
+        stop = False
+        while not stop:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            if isinstance(item, Future):
+                item.set_result(None)
+                continue
+            batch = [item]
+            markers = []
+            deadline = time.perf_counter() + self.max_delay
+            while len(batch) < self.max_rows:
+                remaining = deadline - time.perf_counter()
+                try:
+                    nxt = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if nxt is _STOP:
+                    stop = True
+                    break
+                if isinstance(nxt, Future):
+                    markers.append(nxt)  # flush() 요청 → 모은 것까지만 바로 처리
+                    break
+                batch.append(nxt)
+            self._flush(batch)
+            for marker in markers:
+                marker.set_result(None)
+        self._drain()
+        self._close_conn()
+
+    def _drain(self):
+        # close() 이후 큐에 남은 요청 처리
+        rest = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if isinstance(item, Future):
+                item.set_result(None)
+            elif item is not _STOP:
+                rest.append(item)
+        for i in range(0, len(rest), self.max_rows):
+            self._flush(rest[i:i + self.max_rows])
+
+    def _connection(self):
+        if self._conn is None:
+            self._conn = self._connect()
+        else:
+            self._conn.ping(reconnect=True)
+        return self._conn
+
+    def _close_conn(self):
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+            self._conn = None
+
+    def _execute(self, batch) -> None:
+        # 같은 SQL끼리 모아서 executemany (SQL별 첫 등장 순서, 같은 SQL 안에서는 요청 순서 유지)
+        grouped = {}
+        for item in batch:
+            for sql, params in item.statements:
+                grouped.setdefault(sql, []).append(params)
+        conn = self._connection()
+        try:
+            with conn.cursor() as cursor:
+                for sql, rows in grouped.items():
+                    cursor.executemany(sql, rows)
+            conn.commit()
+        except Exception:
+            try:
+                conn.rollback()
+            except Exception:
+                self._close_conn()
+            raise
+
+    def _flush(self, batch, retry: bool = False) -> None:
+        started = time.perf_counter()
+        if not retry:
+            for item in batch:
+                self.queue_wait_ms.observe((started - item.enqueued) * 1000)
+        try:
+            self._execute(batch)
+        except Exception as e:
+            if len(batch) == 1:
+                self.failed += 1
+                print("❌ Error writing score batch:", e)
+                batch[0].future.set_exception(e)
+                return
+            # 묶음 전체가 실패 → 한 건씩 다시 (문제 있는 요청만 실패)
+            self.retried_batches += 1
+            for item in batch:
+                self._flush([item], retry=True)
+            return
+
+        self.batches += 1
+        self.rows += len(batch)
+        self.batch_sizes.observe(len(batch))
+        self.flush_ms.observe((time.perf_counter() - started) * 1000)
+        _notify_write()
+        for item in batch:
+            item.future.set_result(True)
+
+    def stats(self):
+        return {
+            "batches": self.batches,
+            "rows": self.rows,
+            "failed": self.failed,
+            "retried_batches": self.retried_batches,
+            "queued": self._queue.qsize(),
+            "batch_size": self.batch_sizes.summary(),
+            "flush_ms": self.flush_ms.summary(),
+            "queue_wait_ms": self.queue_wait_ms.summary(),
+        }
+
+
+score_writer = ScoreWriteBatcher()
+
+
+def submit_round(*args, **kwargs) -> Future:
+    return score_writer.submit_round(*args, **kwargs)
+
+
+def submit_ai_data(difficulty, class_id, score, client=None) -> Future:
+    return score_writer.submit_ai_data(difficulty, class_id, score, client)
@@ -0,0 +1,57 @@
+"""
+gunicorn 설정 (Linux / macOS) — python serve.py 또는
+    gunicorn -c gunicorn.conf.py "app:create_app()"
+- 워커 프로세스 WEB_WORKERS개 × 스레드 WEB_THREADS개 (gthread)
+- 워커마다 앱 / DB 연결 풀 / 리더보드 캐시를 따로 만들고 요청을 받기 전에 warm_up
+- SIGTERM: 새 연결은 받지 않고 처리 중인 요청을 WEB_DRAIN_TIMEOUT초까지 마무리한 뒤 종료
+"""
+import multiprocessing
+import os
+import signal
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+bind = f"{os.getenv('WEB_HOST', '0.0.0.0')}:{os.getenv('WEB_PORT', '55000')}"
+workers = int(os.getenv("WEB_WORKERS", str(max(2, multiprocessing.cpu_count()))))
+worker_class = "gthread"
+threads = int(os.getenv("WEB_THREADS", "8"))
+graceful_timeout = int(float(os.getenv("WEB_DRAIN_TIMEOUT", "20")))
+timeout = 30
+keepalive = 5
+# 포크 전에 앱을 올리지 않음 → DB 소켓 / 캐시 / 지표가 워커 사이에 공유되지 않음
+preload_app = False
+accesslog = os.getenv("WEB_ACCESS_LOG") or None
+errorlog = "-"
+
+# 워커 하나의 스레드가 각자 연결 하나씩 (MySQL max_connections ≥ workers × threads + 게임 / 봇)
+os.environ.setdefault("DB_POOL_SIZE", str(threads))
+
+
+def post_worker_init(worker):
+    # 앱을 불러온 직후, 요청을 받기 전
+    from app import warm_up
+    warm_up(worker.wsgi)
+
+    # SIGTERM(graceful 종료)에는 훅이 없으므로 워커의 핸들러를 감싸서 DRAINING 표시
+    # → 마무리하는 동안 keep-alive 연결로 들어온 요청 / /healthz가 503
+    handle_exit = worker.handle_exit
+
+    def drain_then_exit(sig, frame):
+        worker.wsgi.config["DRAINING"] = True
+        handle_exit(sig, frame)
+
+    signal.signal(signal.SIGTERM, drain_then_exit)
+
+
+def worker_int(worker):
+    # SIGINT / SIGQUIT (앱을 불러오기 전이면 표시할 곳이 없음)
+    app = getattr(worker, "wsgi", None)
+    if app is not None:
+        app.config["DRAINING"] = True
+
+
+def worker_exit(server, worker):
+    from app import shutdown
+    shutdown()
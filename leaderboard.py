@@ -1,30 +1,104 @@
-import db_module.score as score
+import db_module.aio as db_aio
+from db_module.cache import ranking_cache, DIFFICULTIES
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 import os
+from datetime import datetime, timezone
+
+DIFFICULTY_LABELS = {1: "쉬움", 2: "노말", 3: "하드"}
+
+# 랭킹 스냅샷 갱신 주기(초) — /leaderboard 호출 자체는 DB를 조회하지 않음
+LEADERBOARD_REFRESH_SEC = float(os.getenv("LEADERBOARD_REFRESH_SEC", "30"))
+
+# 스냅샷 버전별로 만들어 둔 임베드 {난이도: Embed}
+_embeds = {"version": 0}
 
 
 bot = commands.Bot(command_prefix="!")
 @bot.event
-async def on_ready(ctx):
+async def on_ready():
     print("run")
-    await bot.sync_command()
+    if not refresh_rankings.is_running():
+        refresh_rankings.start()
+    await bot.sync_commands()
 
-@bot.slash_command(name="leaderboard")
-async def leaderboard(ctx):
+
+@tasks.loop(seconds=LEADERBOARD_REFRESH_SEC)
+async def refresh_rankings():
+    # DB 조회는 별도 스레드 풀에서 (이벤트 루프/하트비트를 막지 않음)
+    await db_aio.run_in_db_pool(ranking_cache.refresh)
+
+
+def build_embed(difficulty, snapshot):
+    if snapshot.updated_at is None:
+        # 봇이 켜진 뒤 DB에서 한 번도 읽지 못함 (빈 스냅샷)
+        return discord.Embed(
+            title = f"리더보드 - {DIFFICULTY_LABELS[difficulty]}",
+            description = "아직 데이터가 없습니다. 잠시 후 다시 시도해 주세요.",
+            color=discord.Color.light_grey()
+        )
     embed = discord.Embed(
-        title = "리더보드",
+        title = f"리더보드 - {DIFFICULTY_LABELS[difficulty]}",
         description = "상위 10명의 값을 가져옵니다.",
         color=discord.Color.blue()
     )
-    for arr in score.get_ranking_by_difficulty(difficulty=1) :
+    for arr in snapshot.rankings.get(difficulty, []):
         embed.add_field(
             name = arr["class_id"],
             value = arr["score"],
             inline = False
         )
+    # 스냅샷 갱신 시각
+    embed.timestamp = datetime.fromtimestamp(snapshot.updated_at, tz=timezone.utc)
+    return embed
+
 
+def get_embed(difficulty, snapshot):
+    # 스냅샷이 바뀌었을 때만 임베드를 다시 만듦
+    if _embeds["version"] != snapshot.version:
+        _embeds.clear()
+        _embeds["version"] = snapshot.version
+    if difficulty not in _embeds:
+        _embeds[difficulty] = build_embed(difficulty, snapshot)
+    return _embeds[difficulty]
 
-    await ctx.respond(embed=embed)
 
-bot.run(os.environ["DISCORD_BOT_SCB"])
\ No newline at end of file
+class LeaderboardView(discord.ui.View):
+    def __init__(self, difficulty=1):
+        super().__init__(timeout=180)
+        self.difficulty = difficulty
+        for d in DIFFICULTIES:
+            button = discord.ui.Button(label=DIFFICULTY_LABELS[d], custom_id=f"leaderboard:{d}")
+            button.callback = self.make_callback(d)
+            self.add_item(button)
+        self.sync_buttons()
+
+    def sync_buttons(self):
+        for item in self.children:
+            selected = item.custom_id == f"leaderboard:{self.difficulty}"
+            item.style = discord.ButtonStyle.primary if selected else discord.ButtonStyle.secondary
+            item.disabled = selected
+
+    def make_callback(self, difficulty):
+        async def callback(interaction):
+            self.difficulty = difficulty
+            self.sync_buttons()
+            snapshot = await current_snapshot()
+            await interaction.response.edit_message(embed=get_embed(difficulty, snapshot), view=self)
+        return callback
+
+
+async def current_snapshot():
+    # 평소엔 메모리의 스냅샷만 사용, 봇 시작 직후처럼 아직 없을 때만 한 번 조회
+    snapshot = ranking_cache.peek()
+    if snapshot is None:
+        snapshot = await db_aio.run_in_db_pool(ranking_cache.get)
+    return snapshot
+
+
+@bot.slash_command(name="leaderboard")
+async def leaderboard(ctx):
+    snapshot = await current_snapshot()
+    await ctx.respond(embed=get_embed(1, snapshot), view=LeaderboardView(1))
+
+bot.run(os.environ["DISCORD_BOT_SCB"])
@@ -0,0 +1,26 @@
+"""
+AI 답변 파싱 / 채점 (게임과 llm_module.evaluate 공용)
+"""
+import re
+from typing import Optional
+
+# "Answer:" 뒤부터 줄 끝까지 (대소문자 무시, 첫 번째 것)
+ANSWER_RE = re.compile(r"Answer:\s*(.*)", re.IGNORECASE)
+
+
+def extract_answer(text: str) -> Optional[str]:
+    """
+    :return: 'Answer: X'의 X (끝에 LLM이 자주 붙이는 마침표/따옴표 제거), 형식이 없으면 None
+    """
+    match = ANSWER_RE.search(text)
+    if not match:
+        return None
+    return match.group(1).strip().rstrip(".'\"")
+
+
+def normalize_answer(s) -> str:
+    return str(s).strip().lower().replace(" ", "")
+
+
+def check_answer(answer, correct) -> bool:
+    return normalize_answer(answer) == normalize_answer(correct)
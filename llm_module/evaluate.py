@@ -0,0 +1,243 @@
+"""
+퀴즈 은행 오프라인 일괄 평가
+- db_module.quiz에서 전체 문제를 읽어 모델별로 게임과 같은 프롬프트/옵션(난이도 프로필)으로 생성
+- 답은 게임과 같은 규칙(llm_module.answers)으로 파싱 / 채점
+- 동시 요청 수는 --workers로 제한 (스레드 풀)
+- (quiz, 모델, 시도)마다 결과를 JSONL에 한 줄씩 바로 기록 → 중단 후 다시 실행하면 끝난 것은 건너뜀
+- 끝나면 문제×모델별 정답률 / TTFT / 전체 시간 요약 CSV 작성
+
+실행 예:
+    python -m llm_module.evaluate --models gemma3:1b,gemma3:4b --workers 2
+    python -m llm_module.evaluate --models gemma3:4b --trials 3 --out logs/eval/run1.jsonl
+"""
+import argparse
+import csv
+import json
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from llm_module.answers import check_answer, extract_answer
+from llm_module.ollama import DoneEvent, TokenEvent, stream_generate
+from llm_module.profiles import profile_for
+from stats_module.histogram import _nearest_rank
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_OUT = os.path.join(ROOT_DIR, "logs", "eval", "results.jsonl")
+
+Key = Tuple[Any, str, int]  # (quiz_id, model, trial)
+
+
+def load_bank(difficulty: Optional[int] = None, category: Optional[str] = None) -> List[Dict[str, Any]]:
+    from db_module.quiz import list_quiz_titles
+
+    return list_quiz_titles(category=category, difficulty=difficulty, limit=None, order_by="id ASC", include_correct=True)
+
+
+def question_text(quiz: Dict[str, Any]) -> str:
+    # 게임(start_ai_worker)과 같은 질문 문자열
+    return quiz.get("title", "") + " " + quiz.get("description", "")
+
+
+def evaluate_one(quiz: Dict[str, Any], model: str, trial: int = 0, url: Optional[str] = None,
+                 timeout: float = 120) -> Dict[str, Any]:
+    """
+    문제 하나를 모델 하나로 생성하고 채점
+    :return: 결과 레코드 (실패하면 error 포함)
+    """
+    profile = profile_for(quiz.get("difficulty"))
+    result: Dict[str, Any] = {
+        "quiz_id": quiz.get("id"),
+        "difficulty": quiz.get("difficulty"),
+        "model": model,
+        "trial": trial,
+        "ttft_ms": None,
+        "total_ms": None,
+        "eval_count": None,
+        "decode_tps": None,
+        "answer": None,
+        "correct": None,
+        "error": None,
+    }
+    parts: List[str] = []
+    started = time.perf_counter()
+    try:
+        for event in stream_generate(model, profile.prompt(question_text(quiz)), url=url, timeout=timeout,
+                                     source="eval", options=profile.options()):
+            if isinstance(event, TokenEvent):
+                if result["ttft_ms"] is None:
+                    result["ttft_ms"] = round((time.perf_counter() - started) * 1000, 1)
+                parts.append(event.text)
+            elif isinstance(event, DoneEvent):
+                result["eval_count"] = event.stats.eval_count
+                result["decode_tps"] = round(event.stats.decode_tokens_per_sec, 2)
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["total_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+    if result["error"] is None:
+        answer = extract_answer("".join(parts))
+        result["answer"] = answer
+        result["correct"] = answer is not None and check_answer(answer, quiz.get("correct", ""))
+    return result
+
+
+def read_results(path: str) -> List[Dict[str, Any]]:
+    if not os.path.exists(path):
+        return []
+    out = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                out.append(json.loads(line))
+            except ValueError:
+                continue  # 중단 시 잘린 마지막 줄
+    return out
+
+
+def finished_keys(results: Iterable[Dict[str, Any]], retry_errors: bool = True) -> Set[Key]:
+    return {
+        (r["quiz_id"], r["model"], r.get("trial", 0))
+        for r in results
+        if not (retry_errors and r.get("error"))
+    }
+
+
+def run(
+    bank: List[Dict[str, Any]],
+    models: List[str],
+    out_path: str = DEFAULT_OUT,
+    trials: int = 1,
+    workers: int = 2,
+    url: Optional[str] = None,
+    retry_errors: bool = True,
+    timeout: float = 120,
+) -> List[Dict[str, Any]]:
+    """
+    아직 결과가 없는 (문제, 모델, 시도)만 실행하고 결과 파일에 이어 씀
+    :param workers: 동시에 Ollama에 보낼 요청 수
+    :return: 결과 파일의 전체 레코드 (이전 실행분 포함)
+    """
+    done = finished_keys(read_results(out_path), retry_errors)
+    jobs = [
+        (quiz, model, trial)
+        for trial in range(trials)
+        for quiz in bank
+        for model in models
+        if (quiz.get("id"), model, trial) not in done
+    ]
+    total = len(jobs)
+    print(f"[eval] {len(bank)} quizzes × {len(models)} models × {trials} trials, {total} to run ({len(done)} done)")
+    os.makedirs(os.path.dirname(os.path.abspath(out_path)), exist_ok=True)
+
+    with open(out_path, "a", encoding="utf-8") as out, ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        it = iter(jobs)
+        finished = 0
+        try:
+            # 한 번에 workers*2개만 제출해서 Ctrl+C 때 버려지는 작업을 줄임
+            while True:
+                while len(pending) < workers * 2:
+                    job = next(it, None)
+                    if job is None:
+                        break
+                    pending.add(pool.submit(evaluate_one, *job, url=url, timeout=timeout))
+                if not pending:
+                    break
+                ready, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in ready:
+                    result = fut.result()
+                    out.write(json.dumps(result, ensure_ascii=False) + "\n")
+                    out.flush()
+                    finished += 1
+                    mark = "ERR" if result["error"] else ("O" if result["correct"] else "X")
+                    print(f"[eval] {finished}/{total} quiz {result['quiz_id']} {result['model']} "
+                          f"{mark} ttft={result['ttft_ms']}ms total={result['total_ms']}ms")
+        except KeyboardInterrupt:
+            for fut in pending:
+                fut.cancel()
+            print("[eval] interrupted — rerun the same command to resume")
+            raise
+    return read_results(out_path)
+
+
+def summarize(results: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    (문제, 모델)별 정답률 / TTFT·전체 시간 중앙값
+    - 재시도된 (문제, 모델, 시도)는 채점된 최신 결과 하나만 사용
+    """
+    latest: Dict[Key, Dict[str, Any]] = {}
+    for r in results:
+        key = (r["quiz_id"], r["model"], r.get("trial", 0))
+        prev = latest.get(key)
+        if prev is None or prev.get("error") or not r.get("error"):
+            latest[key] = r
+
+    groups: Dict[Tuple[Any, str], List[Dict[str, Any]]] = defaultdict(list)
+    for r in latest.values():
+        groups[(r["quiz_id"], r["model"])].append(r)
+
+    def p50(values):
+        return _nearest_rank(sorted(v for v in values if v is not None), 50)
+
+    rows = []
+    for (quiz_id, model), rs in sorted(groups.items(), key=lambda kv: (str(kv[0][0]), kv[0][1])):
+        graded = [r for r in rs if not r.get("error")]
+        rows.append({
+            "quiz_id": quiz_id,
+            "difficulty": rs[0].get("difficulty"),
+            "model": model,
+            "trials": len(rs),
+            "errors": len(rs) - len(graded),
+            "accuracy": round(sum(bool(r["correct"]) for r in graded) / len(graded), 3) if graded else None,
+            "ttft_ms_p50": p50(r["ttft_ms"] for r in graded),
+            "total_ms_p50": p50(r["total_ms"] for r in graded),
+            "eval_count_p50": p50(r["eval_count"] for r in graded),
+        })
+    return rows
+
+
+def write_summary(rows: List[Dict[str, Any]], path: str) -> None:
+    fields = ["quiz_id", "difficulty", "model", "trials", "errors", "accuracy", "ttft_ms_p50", "total_ms_p50", "eval_count_p50"]
+    with open(path, "w", newline="", encoding="utf-8-sig") as f:  # 엑셀에서 한글 깨짐 방지
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate the quiz bank against one or more Ollama models")
+    parser.add_argument("--models", default="gemma3:4b", help="comma separated model names")
+    parser.add_argument("--workers", type=int, default=2, help="concurrent Ollama requests")
+    parser.add_argument("--trials", type=int, default=1, help="runs per quiz and model (for per-quiz accuracy)")
+    parser.add_argument("--difficulty", type=int, default=None)
+    parser.add_argument("--category", default=None)
+    parser.add_argument("--url", default=None, help="Ollama URL (default OLLAMA_URL)")
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--out", default=DEFAULT_OUT, help="results JSONL (appended, used for resume)")
+    parser.add_argument("--keep-errors", action="store_true", help="do not retry failed jobs on resume")
+    args = parser.parse_args()
+
+    models = [m.strip() for m in args.models.split(",") if m.strip()]
+    bank = load_bank(args.difficulty, args.category)
+    if not bank:
+        print("[eval] no quizzes found")
+        return
+
+    results = run(bank, models, args.out, args.trials, args.workers, args.url, not args.keep_errors, args.timeout)
+    bank_ids = {q.get("id") for q in bank}
+    rows = summarize(r for r in results if r["quiz_id"] in bank_ids and r["model"] in models)
+    summary_path = os.path.splitext(args.out)[0] + "_summary.csv"
+    write_summary(rows, summary_path)
+
+    for model in models:
+        graded = [r for r in results if r["model"] == model and r["quiz_id"] in bank_ids and not r.get("error")]
+        acc = sum(bool(r["correct"]) for r in graded) / len(graded) if graded else 0.0
+        print(f"[eval] {model}: accuracy {acc:.1%} over {len(graded)} graded runs")
+    print(f"[eval] results: {args.out}\n[eval] summary: {summary_path}")
+
+
+if __name__ == "__main__":
+    main()
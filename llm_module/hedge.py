@@ -0,0 +1,256 @@
+"""
+여러 Ollama 엔드포인트에 대한 헤지(hedged) 스트리밍 요청 (동기, 게임 AI 스레드용)
+- 원래 요청(primary)의 첫 토큰이 hedge_after_ms 안에 안 오면 다음 엔드포인트로 백업 요청
+- 원래 요청이 첫 토큰 전에 실패하면 바로 백업으로 넘어감 (failover)
+- 먼저 토큰을 준 쪽 스트림을 그대로 넘기고, 진 쪽은 취소
+- 백업이 이긴 경우 원래 요청을 첫 토큰까지만(최대 loser_grace_ms) 살려 두어 실제로 아낀 시간 측정
+- 결과는 llm_metrics.record_hedge로 기록 (/api/metrics/llm의 hedge 항목)
+
+OLLAMA_URLS="http://host-a:11434,http://host-b:11434", OLLAMA_HEDGE_AFTER_MS=1500
+"""
+import itertools
+import os
+import queue
+import socket
+import threading
+import time
+from typing import Iterator, List, Optional
+
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from llm_module.metrics import llm_metrics
+from llm_module.ollama import OLLAMA_URL, DoneEvent, Event, TokenEvent, stream_generate
+
+OLLAMA_URLS: List[str] = [u.strip() for u in os.getenv("OLLAMA_URLS", "").split(",") if u.strip()] or [OLLAMA_URL]
+HEDGE_AFTER_MS = float(os.getenv("OLLAMA_HEDGE_AFTER_MS", "1500"))
+LOSER_GRACE_MS = float(os.getenv("OLLAMA_HEDGE_GRACE_MS", "5000"))
+
+_END = object()
+_primary_cycle = itertools.count()
+
+
+def _shutdown(sock) -> None:
+    try:
+        sock.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass
+
+
+def _tracking_pool(pool_cls, adapter: "_CancellableAdapter"):
+    # 연결을 열 때마다 소켓을 어댑터에 등록하는 커넥션 풀
+    class Connection(pool_cls.ConnectionCls):
+        def connect(self):
+            super().connect()
+            adapter.track(self.sock)
+
+    return type(pool_cls.__name__, (pool_cls,), {"ConnectionCls": Connection})
+
+
+class _CancellableAdapter(HTTPAdapter):
+    """
+    이 어댑터로 연 소켓을 기억했다가 cancel()에서 shutdown
+    - Session.close()는 풀에 돌아온 연결만 닫음 → 헤더 / 본문을 기다리는 recv는 그대로 막혀 있음
+    - shutdown하면 recv가 바로 끝나고, 서버(Ollama)도 연결이 끊긴 것을 보고 생성을 멈춤
+    """
+
+    def __init__(self):
+        self.cancelled = False
+        self._sockets = []
+        self._lock = threading.Lock()
+        super().__init__()
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _tracking_pool(HTTPConnectionPool, self),
+            "https": _tracking_pool(HTTPSConnectionPool, self),
+        }
+
+    def track(self, sock) -> None:
+        with self._lock:
+            self._sockets.append(sock)
+            cancelled = self.cancelled
+        if cancelled:
+            _shutdown(sock)  # cancel() 뒤에 연결이 열림
+
+    def cancel(self) -> None:
+        with self._lock:
+            self.cancelled = True
+            sockets, self._sockets = self._sockets, []
+        for sock in sockets:
+            _shutdown(sock)
+
+
+class _Attempt(threading.Thread):
+    """
+    엔드포인트 하나로 보내는 요청 — 이벤트를 (index, event) 로 공용 큐에 넣음
+    - cancel(): 소켓을 shutdown → 헤더나 토큰을 기다리던 중이어도 바로 끝나고 서버도 생성을 멈춤
+    - stop_at_first_token: 진 쪽을 첫 토큰 시각만 재고 끝내기
+    """
+
+    def __init__(self, index: int, url: str, out: queue.Queue, model: str, prompt: str, timeout, source: str, fields):
+        super().__init__(daemon=True)
+        import requests
+
+        self.index = index
+        self.url = url
+        self.out = out
+        self.args = (model, prompt, timeout, source, fields)
+        self.session = requests.Session()
+        self.adapter = _CancellableAdapter()
+        self.session.mount("http://", self.adapter)
+        self.session.mount("https://", self.adapter)
+        self.cancelled = threading.Event()
+        self.stop_at_first_token = threading.Event()
+        self.started_at = time.perf_counter()
+        self.first_token_at: Optional[float] = None
+        self.on_first_token = None  # 진 쪽이 첫 토큰을 받으면 호출
+
+    def run(self):
+        model, prompt, timeout, source, fields = self.args
+        try:
+            for event in stream_generate(model, prompt, url=self.url, session=self.session, timeout=timeout, source=source, **fields):
+                if self.cancelled.is_set():
+                    break
+                if self.first_token_at is None and isinstance(event, TokenEvent):
+                    self.first_token_at = time.perf_counter()
+                    if self.stop_at_first_token.is_set():
+                        if self.on_first_token is not None:
+                            self.on_first_token(self)
+                        break
+                self.out.put((self.index, event))
+        except Exception as e:
+            if not self.cancelled.is_set():
+                self.out.put((self.index, e))
+        finally:
+            self.out.put((self.index, _END))
+            self.session.close()
+
+    def cancel(self):
+        self.cancelled.set()
+        self.adapter.cancel()
+        self.session.close()
+
+
+def hedged_generate(
+    model: str,
+    prompt: str,
+    urls: Optional[List[str]] = None,
+    hedge_after_ms: Optional[float] = None,
+    loser_grace_ms: Optional[float] = None,
+    timeout: Optional[float] = 30,
+    source: str = "",
+    **payload_fields,
+) -> Iterator[Event]:
+    """
+    stream_generate와 같은 이벤트를 내지만 엔드포인트가 2개 이상이면 헤지
+    :param urls: 엔드포인트 목록 (기본 OLLAMA_URLS, 요청마다 원래 요청 엔드포인트를 돌아가며 선택)
+    :param hedge_after_ms: 이 시간 안에 첫 토큰이 없으면 백업 요청 (0 이하면 헤지 안 함, 실패 시 failover만)
+    :param loser_grace_ms: 백업이 이긴 뒤 원래 요청의 첫 토큰을 기다려 줄 최대 시간
+    """
+    urls = urls or OLLAMA_URLS
+    hedge_after_ms = HEDGE_AFTER_MS if hedge_after_ms is None else hedge_after_ms
+    loser_grace_ms = LOSER_GRACE_MS if loser_grace_ms is None else loser_grace_ms
+    if len(urls) < 2:
+        yield from stream_generate(model, prompt, url=urls[0], timeout=timeout, source=source, **payload_fields)
+        return
+
+    first = next(_primary_cycle) % len(urls)
+    order = [urls[first], urls[(first + 1) % len(urls)]]
+    out: queue.Queue = queue.Queue()
+    attempts: List[_Attempt] = []
+
+    def launch():
+        attempt = _Attempt(len(attempts), order[len(attempts)], out, model, prompt, timeout, source, payload_fields)
+        attempts.append(attempt)
+        attempt.start()
+
+    launch()
+    hedge_at = attempts[0].started_at + hedge_after_ms / 1000 if hedge_after_ms > 0 else None
+    failover = False
+    ended = set()
+    last_error: Optional[Exception] = None
+    winner: Optional[_Attempt] = None
+    item = None
+
+    try:
+        # 1) 먼저 첫 토큰(또는 done)을 준 요청 고르기
+        while winner is None:
+            timeout_s = None
+            if hedge_at is not None and len(attempts) == 1:
+                timeout_s = max(0.0, hedge_at - time.perf_counter())
+            try:
+                index, item = out.get(timeout=timeout_s)
+            except queue.Empty:
+                launch()
+                continue
+            if item is _END or isinstance(item, Exception):
+                if isinstance(item, Exception):
+                    last_error = item
+                ended.add(index)
+                if len(attempts) == 1:
+                    failover = True
+                    launch()
+                elif len(ended) == len(attempts):
+                    raise last_error or RuntimeError("Ollama stream ended without output")
+                continue
+            winner = attempts[index]
+
+        fired = len(attempts) > 1 and not failover
+        won_by = "backup" if winner.index == 1 else "primary"
+        loser = next((a for a in attempts if a is not winner and a.index not in ended), None)
+
+        def report(saved_ms=None, censored=False):
+            llm_metrics.record_hedge(
+                model, fired=fired, winner=won_by, winner_url=winner.url,
+                failover=failover, saved_ms=saved_ms, censored=censored,
+            )
+
+        if loser is not None and won_by == "backup" and loser_grace_ms > 0:
+            # 원래 요청이 언제 시작했을지 재서 아낀 시간 기록
+            won_at = winner.first_token_at or time.perf_counter()
+            once = threading.Lock()  # 첫 토큰 / 유예 만료 중 먼저 온 쪽만 기록
+
+            def resolved(attempt: _Attempt):
+                if once.acquire(blocking=False):
+                    report(saved_ms=(attempt.first_token_at - won_at) * 1000)
+                attempt.cancel()  # 첫 토큰만 재면 됨 (이미 받은 경우에도 나머지 생성을 멈춤)
+
+            def give_up():
+                if once.acquire(blocking=False):
+                    loser.cancel()
+                    report(saved_ms=(time.perf_counter() - won_at) * 1000, censored=True)
+
+            loser.on_first_token = resolved
+            loser.stop_at_first_token.set()
+            if loser.first_token_at is not None:
+                resolved(loser)
+            else:
+                timer = threading.Timer(loser_grace_ms / 1000, give_up)
+                timer.daemon = True
+                timer.start()
+        else:
+            if loser is not None:
+                loser.cancel()
+            report()
+
+        # 2) 이긴 요청의 스트림 그대로 전달
+        while True:
+            yield item
+            if isinstance(item, DoneEvent):
+                return
+            while True:
+                index, item = out.get()
+                if index == winner.index:
+                    break
+            if item is _END:
+                return
+            if isinstance(item, Exception):
+                raise item
+    finally:
+        for attempt in attempts:
+            # 첫 토큰을 기다리는 진 쪽만 남겨둠 (유예 타이머 / resolved가 끝냄)
+            if (attempt is winner or not attempt.stop_at_first_token.is_set()
+                    or attempt.first_token_at is not None):
+                attempt.cancel()
@@ -0,0 +1,263 @@
+"""
+LLM 요청 지표 저장소
+- 요청마다 클라이언트 측 TTFT / 전체 지연 + done 프레임의 load / prefill / decode 시간 기록
+- 모델별 RollingHistogram으로 보관 → 느린 원인이 로드인지, 프리필인지, 디코드인지 구분
+- 게임 / 봇 / 웹이 서로 다른 프로세스라서 기록은 JSONL 로그에도 한 줄씩 남기고,
+  웹(/api/metrics/llm)은 load_log()로 다른 프로세스의 기록을 이어 읽음
+- 헤지 요청(llm_module.hedge) 결과도 같은 로그에 kind="hedge" 레코드로 남김
+- 로그가 LLM_METRICS_MAX_MB를 넘으면 llm_metrics.jsonl.1로 넘기고 새 파일에 기록 (이전 .1은 덮어씀)
+"""
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from stats_module.histogram import RollingHistogram
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_LOG_PATH = os.path.join(ROOT_DIR, "logs", "llm_metrics.jsonl")
+
+# 처음 로그를 읽을 때 끝에서부터 이만큼만 읽음 (히스토그램은 어차피 최근 window 기준)
+INITIAL_TAIL_BYTES = 2 * 1024 * 1024
+
+# 로그 회전 크기 (0이면 회전 안 함)
+MAX_LOG_BYTES = int(float(os.getenv("LLM_METRICS_MAX_MB", "20")) * 1024 * 1024)
+
+# 지표별 버킷
+_MS_BUCKETS = (50, 100, 250, 500, 1000, 2000, 4000, 8000, 15000, 30000, 60000)
+_TPS_BUCKETS = (1, 2, 5, 10, 20, 40, 80, 160, 320, 1000)
+_COUNT_BUCKETS = (16, 32, 64, 128, 256, 512, 1024, 2048, 4096)
+FIELDS = {
+    "ttft_ms": _MS_BUCKETS,
+    "total_ms": _MS_BUCKETS,
+    "load_ms": _MS_BUCKETS,
+    "prefill_ms": _MS_BUCKETS,
+    "decode_ms": _MS_BUCKETS,
+    "prefill_tps": _TPS_BUCKETS,
+    "decode_tps": _TPS_BUCKETS,
+    "prompt_eval_count": _COUNT_BUCKETS,
+    "eval_count": _COUNT_BUCKETS,
+}
+
+
+def stats_record(model: str, ttft_ms: Optional[float], total_ms: float, stats=None, source: str = "") -> Dict[str, Any]:
+    """
+    요청 하나의 지표 레코드 생성
+    :param stats: llm_module.ollama.GenerationStats (없으면 클라이언트 측 값만)
+    """
+    rec: Dict[str, Any] = {
+        "ts": time.time(),
+        "pid": os.getpid(),
+        "source": source,
+        "model": model,
+        "ttft_ms": None if ttft_ms is None else round(ttft_ms, 2),
+        "total_ms": round(total_ms, 2),
+    }
+    if stats is not None:
+        rec.update({
+            "load_ms": stats.load_duration / 1e6,
+            "prefill_ms": stats.prompt_eval_duration / 1e6,
+            "decode_ms": stats.eval_duration / 1e6,
+            "prefill_tps": round(stats.prefill_tokens_per_sec, 2),
+            "decode_tps": round(stats.decode_tokens_per_sec, 2),
+            "prompt_eval_count": stats.prompt_eval_count,
+            "eval_count": stats.eval_count,
+        })
+    return rec
+
+
+class LLMMetrics:
+    def __init__(self, log_path: Optional[str] = DEFAULT_LOG_PATH, window: int = 512, max_bytes: int = MAX_LOG_BYTES):
+        """
+        :param log_path: JSONL 로그 경로 (None이면 메모리에만 기록)
+        :param window: 히스토그램 백분위 계산에 쓰는 최근 샘플 수
+        :param max_bytes: 로그가 이보다 커지면 log_path + ".1"로 넘김 (0이면 회전 안 함)
+        """
+        self.log_path = log_path
+        self.window = window
+        self.max_bytes = max_bytes
+        self._log_lock = threading.Lock()  # load_log의 _log_offset (웹 워커 스레드 여러 개가 동시에 호출)
+        self._models: Dict[str, Dict[str, Any]] = {}
+        self._hedge: Dict[str, Any] = {
+            "requests": 0,
+            "fired": 0,          # 첫 토큰이 늦어서 백업 요청을 보낸 횟수
+            "backup_wins": 0,    # 백업이 먼저 시작한 횟수
+            "wasted": 0,         # 백업을 보냈지만 원래 요청이 먼저 시작한 횟수
+            "failovers": 0,      # 원래 요청이 실패해서 백업으로 넘어간 횟수
+            "censored": 0,       # 원래 요청이 유예 시간 안에 시작하지 못함 (saved_ms는 하한)
+            "saved_ms": RollingHistogram(window=window, buckets=_MS_BUCKETS),
+            "wins_by_url": {},
+        }
+        self._lock = threading.Lock()
+        self._log_offset: Optional[int] = None
+        self._log_ino: Optional[int] = None  # load_log가 읽던 파일 (회전 감지)
+
+    def _model(self, model: str) -> Dict[str, Any]:
+        m = self._models.get(model)
+        if m is None:
+            m = self._models[model] = {
+                "requests": 0,
+                "errors": {},
+                "hists": {name: RollingHistogram(window=self.window, buckets=b) for name, b in FIELDS.items()},
+            }
+        return m
+
+    def observe(self, rec: Dict[str, Any]) -> None:
+        if rec.get("kind") == "hedge":
+            self._observe_hedge(rec)
+            return
+        with self._lock:
+            m = self._model(rec.get("model") or "unknown")
+            if rec.get("error"):
+                m["errors"][rec["error"]] = m["errors"].get(rec["error"], 0) + 1
+                return
+            m["requests"] += 1
+            for name, hist in m["hists"].items():
+                value = rec.get(name)
+                if value is not None:
+                    hist.observe(value)
+
+    def _observe_hedge(self, rec: Dict[str, Any]) -> None:
+        with self._lock:
+            h = self._hedge
+            h["requests"] += 1
+            h["fired"] += bool(rec.get("fired"))
+            h["failovers"] += bool(rec.get("failover"))
+            if rec.get("fired") and rec.get("winner") == "backup":
+                h["backup_wins"] += 1
+            elif rec.get("fired"):
+                h["wasted"] += 1
+            h["censored"] += bool(rec.get("censored"))
+            if rec.get("saved_ms") is not None:
+                h["saved_ms"].observe(rec["saved_ms"])
+            url = rec.get("winner_url")
+            if url:
+                h["wins_by_url"][url] = h["wins_by_url"].get(url, 0) + 1
+
+    def _append_log(self, rec: Dict[str, Any]) -> None:
+        if not self.log_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.log_path), exist_ok=True)
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+                f.flush()
+                st = os.fstat(f.fileno())
+        except OSError as e:
+            print(f"[metrics] failed to write {self.log_path}: {e}")
+            return
+        if self.max_bytes and st.st_size > self.max_bytes:
+            self._rotate(st.st_ino)
+
+    def _rotate(self, ino: int) -> None:
+        # 게임 / 봇 / 웹이 같은 파일에 쓰므로 방금 쓴 파일이 아직 그 경로에 있을 때만 넘김
+        # (다른 프로세스가 먼저 넘겼으면 새 파일을 다시 넘기지 않음)
+        try:
+            if os.stat(self.log_path).st_ino == ino:
+                os.replace(self.log_path, self.log_path + ".1")
+        except OSError:
+            pass  # Windows: 다른 프로세스가 여는 중 → 다음 기록 때 다시 시도
+
+    def record(self, model: str, ttft_ms: Optional[float], total_ms: float, stats=None, source: str = "") -> Dict[str, Any]:
+        rec = stats_record(model, ttft_ms, total_ms, stats, source)
+        self.observe(rec)
+        self._append_log(rec)
+        return rec
+
+    def record_error(self, model: str, kind: str, source: str = "") -> None:
+        rec = {"ts": time.time(), "pid": os.getpid(), "source": source, "model": model, "error": kind}
+        self.observe(rec)
+        self._append_log(rec)
+
+    def record_hedge(self, model: str, **fields) -> None:
+        """
+        :param fields: fired, winner("primary"|"backup"), winner_url, failover, saved_ms, censored
+        """
+        rec = {"ts": time.time(), "pid": os.getpid(), "kind": "hedge", "model": model, **fields}
+        self.observe(rec)
+        self._append_log(rec)
+
+    def load_log(self) -> int:
+        """
+        다른 프로세스가 남긴 로그 중 아직 안 읽은 부분을 반영 (자기 pid 기록은 이미 반영됐으므로 건너뜀)
+        :return: 새로 반영한 레코드 수
+        """
+        if not self.log_path:
+            return 0
+        with self._log_lock:
+            try:
+                f = open(self.log_path, "rb")
+            except FileNotFoundError:
+                return 0  # 아직 기록 없음 (또는 회전 직후)
+            with f:
+                added = 0
+                ino = os.fstat(f.fileno()).st_ino
+                if self._log_ino is not None and ino != self._log_ino:
+                    # 회전됨 → 이전 파일(.1)의 남은 부분을 마저 읽고 새 파일은 처음부터
+                    added += self._read_rotated()
+                    self._log_offset = 0
+                self._log_ino = ino
+                size = f.seek(0, os.SEEK_END)
+                if self._log_offset is None or self._log_offset > size:
+                    self._log_offset = max(0, size - INITIAL_TAIL_BYTES)
+                    f.seek(self._log_offset)
+                    if self._log_offset:
+                        f.readline()  # 잘린 첫 줄 버림
+                else:
+                    f.seek(self._log_offset)
+                return added + self._read_lines(f)
+
+    def _read_rotated(self) -> int:
+        if self._log_offset is None:
+            return 0
+        try:
+            with open(self.log_path + ".1", "rb") as f:
+                # 그 사이에 한 번 더 회전했으면 읽던 파일은 이미 없음
+                if os.fstat(f.fileno()).st_ino != self._log_ino:
+                    return 0
+                f.seek(self._log_offset)
+                return self._read_lines(f)
+        except OSError:
+            return 0
+
+    def _read_lines(self, f) -> int:
+        # 현재 위치부터 끝까지 반영하고 _log_offset 갱신
+        pid = os.getpid()
+        added = 0
+        for line in f:
+            if not line.endswith(b"\n"):
+                break  # 아직 쓰는 중인 줄
+            self._log_offset = f.tell()
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                continue
+            if rec.get("pid") != pid:
+                self.observe(rec)
+                added += 1
+        return added
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            hedge = self._hedge
+            return {
+                "models": {
+                    model: {
+                        "requests": m["requests"],
+                        "errors": dict(m["errors"]),
+                        **{name: h.summary() for name, h in m["hists"].items()},
+                    }
+                    for model, m in self._models.items()
+                },
+                "hedge": {
+                    **{k: v for k, v in hedge.items() if k not in ("saved_ms", "wins_by_url")},
+                    "fire_rate": round(hedge["fired"] / hedge["requests"], 4) if hedge["requests"] else None,
+                    "saved_ms": hedge["saved_ms"].summary(),
+                    "wins_by_url": dict(hedge["wins_by_url"]),
+                },
+            }
+
+
+# 프로세스 공용 인스턴스 (LLM_METRICS_LOG=""이면 파일 기록 끔)
+llm_metrics = LLMMetrics(log_path=os.getenv("LLM_METRICS_LOG", DEFAULT_LOG_PATH) or None)
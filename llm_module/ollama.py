@@ -0,0 +1,279 @@
+"""
+Ollama /api/generate 스트리밍 클라이언트 (동기 / 비동기 공용)
+- 응답 NDJSON을 bytearray 버퍼에서 줄 단위로 파싱 (문자열 누적/재분할 없음)
+- TokenEvent(텍스트 조각) ... DoneEvent(통계, context) 순서로 이벤트를 yield
+- requests / aiohttp는 해당 함수를 쓸 때만 import (모듈 import 시 부작용 없음)
+- 요청마다 TTFT / 전체 지연 / done 통계를 llm_module.metrics에 기록
+"""
+import json
+import os
+import time
+from typing import Any, AsyncIterator, Dict, Iterator, List, NamedTuple, Optional, Union
+
+from llm_module.metrics import llm_metrics
+
+OLLAMA_URL = os.getenv("OLLAMA_URL", "http://localhost:11434")
+
+
+class OllamaError(Exception):
+    """
+    Ollama가 200이 아닌 응답을 주거나 스트림 중 error 프레임을 보낸 경우
+    - status: HTTP 상태 코드 (스트림 중 오류면 None)
+    """
+
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+
+class GenerationStats(NamedTuple):
+    """
+    done 프레임의 서버 측 통계 (단위: ns, count는 토큰 수)
+    """
+    total_duration: int = 0
+    load_duration: int = 0
+    prompt_eval_count: int = 0
+    prompt_eval_duration: int = 0
+    eval_count: int = 0
+    eval_duration: int = 0
+
+    @classmethod
+    def from_frame(cls, frame: Dict[str, Any]) -> "GenerationStats":
+        return cls(**{name: int(frame.get(name) or 0) for name in cls._fields})
+
+    @property
+    def decode_tokens_per_sec(self) -> float:
+        return self.eval_count / (self.eval_duration / 1e9) if self.eval_duration else 0.0
+
+    @property
+    def prefill_tokens_per_sec(self) -> float:
+        return self.prompt_eval_count / (self.prompt_eval_duration / 1e9) if self.prompt_eval_duration else 0.0
+
+
+class TokenEvent(NamedTuple):
+    text: str
+
+
+class DoneEvent(NamedTuple):
+    stats: GenerationStats
+    context: Optional[List[int]]
+    done_reason: Optional[str]
+    model: Optional[str]
+
+
+Event = Union[TokenEvent, DoneEvent]
+
+
+class NDJSONDecoder:
+    """
+    바이트 청크를 받아 완성된 JSON 줄만 dict로 돌려주는 증분 디코더
+    - 청크마다 버퍼 앞부분을 한 번만 잘라냄 (줄마다 문자열 재생성 없음)
+    - 깨진 줄은 건너뛰고 errors에 개수만 기록
+    """
+
+    def __init__(self):
+        self._buf = bytearray()
+        self._scan = 0  # 여기까지는 줄바꿈이 없다고 확인된 위치
+        self.errors = 0
+
+    def _loads(self, line) -> Optional[Dict[str, Any]]:
+        try:
+            return json.loads(line)
+        except ValueError:
+            self.errors += 1
+            return None
+
+    def feed(self, chunk: bytes) -> List[Dict[str, Any]]:
+        buf = self._buf
+        buf += chunk
+        frames = []
+        start = 0
+        nl = buf.find(b"\n", self._scan)
+        while nl != -1:
+            if nl > start:
+                line = buf[start:nl]
+                frame = None if line.isspace() else self._loads(line)
+                if frame is not None:
+                    frames.append(frame)
+            start = nl + 1
+            nl = buf.find(b"\n", start)
+        if start:
+            del buf[:start]
+        self._scan = len(buf)
+        return frames
+
+    def flush(self) -> List[Dict[str, Any]]:
+        """
+        스트림 끝에서 줄바꿈 없이 남은 마지막 줄 처리
+        """
+        rest = bytes(self._buf).strip()
+        self._buf.clear()
+        self._scan = 0
+        if not rest:
+            return []
+        frame = self._loads(rest)
+        return [frame] if frame is not None else []
+
+
+def frame_events(frame: Dict[str, Any]) -> List[Event]:
+    """
+    NDJSON 프레임 하나 → 이벤트 리스트 (response 텍스트, done)
+    """
+    if "error" in frame:
+        raise OllamaError(str(frame["error"]))
+    events: List[Event] = []
+    text = frame.get("response")
+    if text:
+        events.append(TokenEvent(text))
+    if frame.get("done"):
+        events.append(DoneEvent(
+            stats=GenerationStats.from_frame(frame),
+            context=frame.get("context"),
+            done_reason=frame.get("done_reason"),
+            model=frame.get("model"),
+        ))
+    return events
+
+
+class _RequestTimer:
+    """
+    요청 하나의 클라이언트 측 시간 측정 → done 프레임에서 지표 기록
+    - 이벤트를 넘겨주고 호출자가 다음 이벤트를 요청하기까지(예: 게임의 토큰 표시 간격 sleep)는 빼고 잼
+      → 게임 / 봇의 total_ms를 같은 기준으로 비교
+    """
+    __slots__ = ("model", "source", "started", "ttft_ms", "paused", "_yielded_at")
+
+    def __init__(self, model: str, source: str):
+        self.model = model
+        self.source = source
+        self.started = time.perf_counter()
+        self.ttft_ms: Optional[float] = None
+        self.paused = 0.0
+        self._yielded_at: Optional[float] = None
+
+    def event(self, event: Event) -> None:
+        if isinstance(event, TokenEvent):
+            if self.ttft_ms is None:
+                self.ttft_ms = (time.perf_counter() - self.started - self.paused) * 1000
+            self._yielded_at = time.perf_counter()
+        else:
+            total_ms = (time.perf_counter() - self.started - self.paused) * 1000
+            llm_metrics.record(event.model or self.model, self.ttft_ms, total_ms, event.stats, self.source)
+
+    def resume(self) -> None:
+        # 호출자가 다음 이벤트를 요청함 (yield에서 돌아옴)
+        if self._yielded_at is not None:
+            self.paused += time.perf_counter() - self._yielded_at
+            self._yielded_at = None
+
+    def error(self, exc: Exception) -> None:
+        status = getattr(exc, "status", None)
+        llm_metrics.record_error(self.model, f"http_{status}" if status else type(exc).__name__, self.source)
+
+
+def build_payload(
+    model: str,
+    prompt: str,
+    stream: bool = True,
+    context: Optional[List[int]] = None,
+    options: Optional[Dict[str, Any]] = None,
+    **extra,
+) -> Dict[str, Any]:
+    payload: Dict[str, Any] = {"model": model, "prompt": prompt, "stream": stream}
+    if context:
+        payload["context"] = context
+    if options:
+        payload["options"] = options
+    payload.update({k: v for k, v in extra.items() if v is not None})
+    return payload
+
+
+def stream_generate(
+    model: str,
+    prompt: str,
+    url: Optional[str] = None,
+    session=None,
+    timeout: Optional[float] = 30,
+    source: str = "",
+    **payload_fields,
+) -> Iterator[Event]:
+    """
+    동기 스트리밍 생성 (requests)
+    :param url: Ollama 주소 (기본 OLLAMA_URL)
+    :param session: requests.Session (없으면 requests 모듈 그대로)
+    :param timeout: 연결/읽기 타임아웃 (초)
+    :param source: 지표에 남길 호출 위치 (game, bot, cli ...)
+    :param payload_fields: build_payload 인자 (stream, context, options, system, ...)
+    :return: TokenEvent ... DoneEvent 이터레이터 (실패 시 OllamaError / requests 예외)
+    """
+    import requests
+
+    http = session or requests
+    payload = build_payload(model, prompt, **payload_fields)
+    timer = _RequestTimer(model, source)
+    try:
+        with http.post(f"{url or OLLAMA_URL}/api/generate", json=payload, stream=True, timeout=timeout) as resp:
+            if resp.status_code != 200:
+                raise OllamaError(f"Ollama API Error: {resp.status_code} - {resp.text}", status=resp.status_code)
+            decoder = NDJSONDecoder()
+            for chunk in resp.iter_content(chunk_size=None):
+                for frame in decoder.feed(chunk):
+                    for event in frame_events(frame):
+                        timer.event(event)
+                        yield event
+                        timer.resume()
+                        if isinstance(event, DoneEvent):
+                            return
+            for frame in decoder.flush():
+                for event in frame_events(frame):
+                    timer.event(event)
+                    yield event
+                    timer.resume()
+    except Exception as e:
+        timer.error(e)
+        raise
+
+
+async def astream_generate(
+    model: str,
+    prompt: str,
+    url: Optional[str] = None,
+    session=None,
+    source: str = "",
+    **payload_fields,
+) -> AsyncIterator[Event]:
+    """
+    비동기 스트리밍 생성 (aiohttp) — 인자는 stream_generate와 동일
+    :param session: aiohttp.ClientSession (없으면 이번 요청만 쓰는 세션을 열고 닫음)
+    """
+    import aiohttp
+
+    own_session = session is None
+    if own_session:
+        session = aiohttp.ClientSession()
+    timer = _RequestTimer(model, source)
+    try:
+        payload = build_payload(model, prompt, **payload_fields)
+        async with session.post(f"{url or OLLAMA_URL}/api/generate", json=payload) as resp:
+            if resp.status != 200:
+                raise OllamaError(f"Ollama API Error: {resp.status} - {await resp.text()}", status=resp.status)
+            decoder = NDJSONDecoder()
+            async for chunk in resp.content.iter_any():
+                for frame in decoder.feed(chunk):
+                    for event in frame_events(frame):
+                        timer.event(event)
+                        yield event
+                        timer.resume()
+                        if isinstance(event, DoneEvent):
+                            return
+            for frame in decoder.flush():
+                for event in frame_events(frame):
+                    timer.event(event)
+                    yield event
+                    timer.resume()
+    except Exception as e:
+        timer.error(e)
+        raise
+    finally:
+        if own_session:
+            await session.close()
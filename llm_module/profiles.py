@@ -0,0 +1,101 @@
+"""
+난이도별 생성 프로필 (게임 AI 상대)
+- num_predict / stop / temperature / num_ctx → Ollama options
+- think_words → 프롬프트의 "생각 길이" 지시
+- max_transcript_chars → 게임이 화면용으로 들고 있는 AI 텍스트 상한
+- models / target_race_ms → llm_module.router가 고르는 후보 모델(선호 순)과 목표 대결 시간
+- 환경 변수로 덮어쓰기: LLM_PROFILE_<EASY|NORMAL|HARD>_<필드 대문자>
+  예) LLM_PROFILE_HARD_NUM_PREDICT=512, LLM_PROFILE_EASY_STOP="\\nQuestion:|###",
+      LLM_PROFILE_HARD_MODELS="gemma3:12b|gemma3:4b"
+"""
+import os
+from typing import Any, Dict, NamedTuple, Optional, Tuple, Union
+
+# 난이도 번호 → 프로필 이름 (db_module.cache.DIFFICULTIES와 같은 키)
+PROFILE_NAMES = {1: "easy", 2: "normal", 3: "hard"}
+
+PROMPT_TEMPLATE = (
+    "You are a quiz contestant. The question is: {question}\n"
+    "First, describe your thinking process in at most {think_words} words. Do NOT give the answer immediately.\n"
+    "At the very end, provide the final answer in this format: 'Answer: [Your Answer]'"
+)
+
+
+class GenerationProfile(NamedTuple):
+    num_predict: int = 256
+    temperature: float = 0.6
+    num_ctx: int = 2048
+    stop: Tuple[str, ...] = ("\nQuestion:",)
+    think_words: int = 80
+    max_transcript_chars: int = 4000
+    models: Tuple[str, ...] = ("gemma3:4b",)
+    target_race_ms: int = 25000
+
+    def options(self) -> Dict[str, Any]:
+        """
+        Ollama /api/generate options
+        """
+        opts: Dict[str, Any] = {
+            "num_predict": self.num_predict,
+            "temperature": self.temperature,
+            "num_ctx": self.num_ctx,
+        }
+        if self.stop:
+            opts["stop"] = list(self.stop)
+        return opts
+
+    def prompt(self, question: str) -> str:
+        return PROMPT_TEMPLATE.format(question=question, think_words=self.think_words)
+
+
+# 기본값: 토큰당 0.1초 표시 지연 기준으로 쉬움 ~16초, 노말 ~26초, 하드 ~38초 이내
+# 쉬운 문제는 작은 모델, 어려운 문제는 큰 모델 우선 (없으면 다음 모델로)
+DEFAULT_PROFILES = {
+    "easy": GenerationProfile(
+        num_predict=160, temperature=0.8, think_words=40, max_transcript_chars=2000,
+        models=("gemma3:1b", "gemma3:4b"), target_race_ms=15000,
+    ),
+    "normal": GenerationProfile(
+        num_predict=256, temperature=0.6, think_words=80, max_transcript_chars=3000,
+        models=("gemma3:4b", "gemma3:1b"), target_race_ms=25000,
+    ),
+    "hard": GenerationProfile(
+        num_predict=384, temperature=0.4, think_words=150, max_transcript_chars=4000,
+        models=("gemma3:12b", "gemma3:4b"), target_race_ms=38000,
+    ),
+}
+
+
+def _from_env(name: str, base: GenerationProfile) -> GenerationProfile:
+    changes: Dict[str, Any] = {}
+    for field, default in base._asdict().items():
+        raw = os.getenv(f"LLM_PROFILE_{name.upper()}_{field.upper()}")
+        if raw is None or raw == "":
+            continue
+        try:
+            if isinstance(default, tuple):
+                changes[field] = tuple(s.replace("\\n", "\n") for s in raw.split("|") if s)
+            else:
+                changes[field] = type(default)(raw)
+        except ValueError:
+            print(f"[profiles] ignoring invalid LLM_PROFILE_{name.upper()}_{field.upper()}={raw!r}")
+    return base._replace(**changes)
+
+
+def load_profiles() -> Dict[str, GenerationProfile]:
+    return {name: _from_env(name, base) for name, base in DEFAULT_PROFILES.items()}
+
+
+PROFILES = load_profiles()
+
+
+def profile_for(difficulty: Union[int, str, None], profiles: Optional[Dict[str, GenerationProfile]] = None) -> GenerationProfile:
+    """
+    :param difficulty: 1~3 (문자열도 허용), 모르는 값이면 normal
+    """
+    profiles = profiles or PROFILES
+    try:
+        name = PROFILE_NAMES.get(int(difficulty), "normal")
+    except (TypeError, ValueError):
+        name = "normal"
+    return profiles[name]
@@ -0,0 +1,219 @@
+"""
+게임 AI 모델 라우터
+- (모델, 난이도)별 최근 TTFT / 디코드 토큰 속도 / 생성 토큰 수 / 정답 여부를 기록
+- 예상 대결 시간 = TTFT + 토큰 수 × max(토큰 간격, 화면 표시 지연)
+- 목표 시간(profile.target_race_ms) 안에 들어오는 모델 중 정답률이 가장 높은 모델 선택
+  (동률이면 프로필의 선호 순서), 아무것도 안 들어오면 가장 빠른 모델
+- 샘플이 부족한 모델은 선호 순서대로 먼저 시도해서 측정
+- 404(모델 없음)가 나면 missing_ttl 동안 후보에서 빼고 다음 모델로
+- 상태는 JSON 파일로 저장해서 게임을 다시 켜도 이어서 사용
+"""
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+from stats_module.histogram import _nearest_rank
+from llm_module.profiles import PROFILE_NAMES, GenerationProfile
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_STATE_PATH = os.path.join(ROOT_DIR, "logs", "model_router.json")
+
+
+class _Lane:
+    """
+    (모델, 난이도) 하나의 최근 샘플
+    """
+    __slots__ = ("ttft_ms", "tps", "tokens", "correct")
+
+    def __init__(self, window: int):
+        self.ttft_ms: deque = deque(maxlen=window)
+        self.tps: deque = deque(maxlen=window)
+        self.tokens: deque = deque(maxlen=window)
+        self.correct: deque = deque(maxlen=window)
+
+    @staticmethod
+    def median(samples: deque) -> Optional[float]:
+        return _nearest_rank(sorted(samples), 50)
+
+    @property
+    def samples(self) -> int:
+        return len(self.ttft_ms)
+
+    def accuracy(self) -> float:
+        # 샘플이 적을 때 0/1로 튀지 않도록 (정답+1)/(시도+2)
+        return (sum(self.correct) + 1) / (len(self.correct) + 2)
+
+    def predict_ms(self, default_tokens: int, token_delay_ms: float) -> Optional[float]:
+        ttft = self.median(self.ttft_ms)
+        if ttft is None:
+            return None
+        tps = self.median(self.tps)
+        tokens = self.median(self.tokens) or default_tokens
+        per_token = max(1000.0 / tps if tps else token_delay_ms, token_delay_ms)
+        return ttft + tokens * per_token
+
+    def to_json(self) -> Dict[str, List]:
+        return {name: list(getattr(self, name)) for name in self.__slots__}
+
+    @classmethod
+    def from_json(cls, data: Dict[str, List], window: int) -> "_Lane":
+        lane = cls(window)
+        for name in cls.__slots__:
+            getattr(lane, name).extend(data.get(name, []))
+        return lane
+
+
+class ModelRouter:
+    def __init__(
+        self,
+        token_delay_ms: float = 100.0,
+        min_samples: int = 3,
+        explore: float = 0.05,
+        window: int = 50,
+        missing_ttl: float = 600.0,
+        state_path: Optional[str] = DEFAULT_STATE_PATH,
+        seed: Optional[int] = None,
+    ):
+        """
+        :param token_delay_ms: 게임이 토큰마다 두는 표시 지연 (run_ollama_worker의 sleep)
+        :param min_samples: 이 수보다 적게 측정된 모델은 먼저 시도
+        :param explore: 측정이 끝난 뒤에도 가끔 다른 후보를 시도할 확률
+        :param window: (모델, 난이도)별로 보관할 최근 샘플 수
+        :param missing_ttl: 404 난 모델을 후보에서 빼 두는 시간 (초)
+        :param state_path: 상태 저장 JSON 경로 (None이면 저장 안 함)
+        """
+        self.token_delay_ms = token_delay_ms
+        self.min_samples = min_samples
+        self.explore = explore
+        self.window = window
+        self.missing_ttl = missing_ttl
+        self.state_path = state_path
+        self._rnd = random.Random(seed)
+        self._lanes: Dict[Tuple[str, str], _Lane] = {}
+        self._missing: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self.load()
+
+    @staticmethod
+    def _difficulty_name(difficulty) -> str:
+        try:
+            return PROFILE_NAMES.get(int(difficulty), "normal")
+        except (TypeError, ValueError):
+            return "normal"
+
+    def _lane(self, model: str, difficulty) -> _Lane:
+        key = (model, self._difficulty_name(difficulty))
+        lane = self._lanes.get(key)
+        if lane is None:
+            lane = self._lanes[key] = _Lane(self.window)
+        return lane
+
+    def is_missing(self, model: str) -> bool:
+        until = self._missing.get(model)
+        return until is not None and time.monotonic() < until
+
+    def mark_missing(self, model: str) -> None:
+        with self._lock:
+            self._missing[model] = time.monotonic() + self.missing_ttl
+
+    def candidates(self, difficulty, profile: GenerationProfile) -> List[str]:
+        """
+        시도할 순서대로 정렬한 후보 모델 (첫 번째가 선택, 나머지는 404 대비 폴백)
+        """
+        with self._lock:
+            order = [m for m in profile.models if not self.is_missing(m)]
+            if not order:
+                return []
+            lanes = {m: self._lane(m, difficulty) for m in order}
+            cold = [m for m in order if lanes[m].samples < self.min_samples]
+            if cold:
+                return cold + [m for m in order if m not in cold]
+
+            predicted = {m: lanes[m].predict_ms(profile.num_predict, self.token_delay_ms) for m in order}
+            fits = [m for m in order if predicted[m] <= profile.target_race_ms]
+            fits.sort(key=lambda m: (-lanes[m].accuracy(), order.index(m)))
+            rest = sorted((m for m in order if m not in fits), key=lambda m: predicted[m])
+            ranked = fits + rest
+            if len(ranked) > 1 and self._rnd.random() < self.explore:
+                ranked.insert(0, ranked.pop(self._rnd.randrange(1, len(ranked))))
+            return ranked
+
+    def choose(self, difficulty, profile: GenerationProfile) -> Optional[str]:
+        ranked = self.candidates(difficulty, profile)
+        return ranked[0] if ranked else None
+
+    def observe(
+        self,
+        model: str,
+        difficulty,
+        ttft_ms: Optional[float],
+        tps: Optional[float] = None,
+        tokens: Optional[int] = None,
+        correct: Optional[bool] = None,
+    ) -> None:
+        """
+        한 판 결과 기록 (끝까지 생성 못 한 판은 tps / tokens / correct 없이 TTFT만)
+        """
+        if ttft_ms is None:
+            return
+        with self._lock:
+            lane = self._lane(model, difficulty)
+            lane.ttft_ms.append(round(ttft_ms, 1))
+            if tps:
+                lane.tps.append(round(tps, 2))
+            if tokens:
+                lane.tokens.append(tokens)
+            if correct is not None:
+                lane.correct.append(1 if correct else 0)
+        self.save()
+
+    def load(self) -> None:
+        if not self.state_path or not os.path.exists(self.state_path):
+            return
+        try:
+            with open(self.state_path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[router] ignoring {self.state_path}: {e}")
+            return
+        with self._lock:
+            for item in data.get("lanes", []):
+                key = (item["model"], item["difficulty"])
+                self._lanes[key] = _Lane.from_json(item, self.window)
+
+    def save(self) -> None:
+        if not self.state_path:
+            return
+        with self._lock:
+            data = {"lanes": [
+                {"model": model, "difficulty": difficulty, **lane.to_json()}
+                for (model, difficulty), lane in self._lanes.items()
+            ]}
+        tmp = self.state_path + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp, self.state_path)
+        except OSError as e:
+            print(f"[router] failed to save {self.state_path}: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "missing": sorted(m for m in self._missing if self.is_missing(m)),
+                "lanes": {
+                    f"{model}/{difficulty}": {
+                        "samples": lane.samples,
+                        "ttft_ms_p50": _Lane.median(lane.ttft_ms),
+                        "tps_p50": _Lane.median(lane.tps),
+                        "tokens_p50": _Lane.median(lane.tokens),
+                        "accuracy": round(lane.accuracy(), 3),
+                    }
+                    for (model, difficulty), lane in self._lanes.items()
+                },
+            }
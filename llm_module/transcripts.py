@@ -0,0 +1,182 @@
+"""
+AI 대결 스트림 녹화 / 재생
+- 라운드마다 AI가 화면에 낸 토큰과 시각(요청 시작 기준 ms)을 gzip JSON으로 저장
+- 경로: <root>/<quiz_id>/<model>/<녹화 시각 ms>.json.gz  (quiz id + 모델별 최근 keep개 유지)
+- replay(): 녹화된 간격 그대로 토큰을 다시 내보냄 → GPU 없는 데모, 렌더/파싱 회귀 벤치마크,
+  Ollama가 죽었을 때의 대체 진행에 사용
+"""
+import gzip
+import json
+import os
+import random
+import re
+import threading
+import time
+from typing import Any, Iterator, List, NamedTuple, Optional, Tuple
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_TRANSCRIPT_DIR = os.path.join(ROOT_DIR, "logs", "transcripts")
+
+
+def _slug(model: str) -> str:
+    # gemma3:4b → gemma3_4b (Windows 경로에 ':' 불가)
+    return re.sub(r"[^0-9A-Za-z._-]+", "_", model)
+
+
+class Transcript(NamedTuple):
+    quiz_id: Any
+    model: str
+    difficulty: str
+    recorded_at: float
+    offsets_ms: List[int]     # 요청 시작부터 각 토큰이 화면으로 나간 시각
+    tokens: List[str]
+    completed: bool           # 끝까지 생성됐는지 (중간에 멈춘 라운드는 False)
+
+    @property
+    def duration_ms(self) -> int:
+        return self.offsets_ms[-1] if self.offsets_ms else 0
+
+    @property
+    def text(self) -> str:
+        return "".join(self.tokens)
+
+    def to_json(self) -> dict:
+        # 시각은 차분으로 저장 (대부분 두 자리 수라 압축이 잘 됨)
+        deltas, prev = [], 0
+        for t in self.offsets_ms:
+            deltas.append(t - prev)
+            prev = t
+        return {
+            "quiz_id": self.quiz_id, "model": self.model, "difficulty": self.difficulty,
+            "recorded_at": self.recorded_at, "completed": self.completed,
+            "deltas_ms": deltas, "tokens": self.tokens,
+        }
+
+    @classmethod
+    def from_json(cls, data: dict) -> "Transcript":
+        offsets, t = [], 0
+        for d in data["deltas_ms"]:
+            t += d
+            offsets.append(t)
+        return cls(
+            data["quiz_id"], data["model"], str(data.get("difficulty", "")), data["recorded_at"],
+            offsets, list(data["tokens"]), bool(data.get("completed")),
+        )
+
+
+class TranscriptRecorder:
+    """
+    토큰을 화면으로 보내는 시점에 token()을 호출 → finish()로 Transcript 생성
+    """
+
+    def __init__(self, quiz_id: Any, model: str, difficulty: str = ""):
+        self.quiz_id = quiz_id
+        self.model = model
+        self.difficulty = str(difficulty)
+        self.started = time.perf_counter()
+        self.offsets_ms: List[int] = []
+        self.tokens: List[str] = []
+
+    def token(self, text: str) -> None:
+        self.offsets_ms.append(int((time.perf_counter() - self.started) * 1000))
+        self.tokens.append(text)
+
+    def finish(self, completed: bool) -> Transcript:
+        return Transcript(self.quiz_id, self.model, self.difficulty, time.time(), self.offsets_ms, self.tokens, completed)
+
+
+class TranscriptStore:
+    def __init__(self, root: str = DEFAULT_TRANSCRIPT_DIR, keep: int = 5):
+        """
+        :param root: 저장 디렉터리
+        :param keep: (quiz id, 모델)별로 남길 최근 녹화 수
+        """
+        self.root = root
+        self.keep = keep
+        self._lock = threading.Lock()
+
+    def _dir(self, quiz_id: Any, model: Optional[str] = None) -> str:
+        path = os.path.join(self.root, str(quiz_id))
+        return os.path.join(path, _slug(model)) if model else path
+
+    def save(self, transcript: Transcript) -> Optional[str]:
+        """
+        :return: 저장한 파일 경로 (토큰이 없거나 quiz id가 없으면 저장 안 함)
+        """
+        if transcript.quiz_id is None or not transcript.tokens:
+            return None
+        folder = self._dir(transcript.quiz_id, transcript.model)
+        path = os.path.join(folder, f"{int(transcript.recorded_at * 1000)}.json.gz")
+        data = json.dumps(transcript.to_json(), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        with self._lock:
+            os.makedirs(folder, exist_ok=True)
+            with gzip.open(path, "wb") as f:
+                f.write(data)
+            files = sorted(os.listdir(folder))
+            for old in files[:-self.keep] if self.keep > 0 else []:
+                os.remove(os.path.join(folder, old))
+        return path
+
+    @staticmethod
+    def load(path: str) -> Transcript:
+        with gzip.open(path, "rb") as f:
+            return Transcript.from_json(json.loads(f.read().decode("utf-8")))
+
+    def paths(self, quiz_id: Any = None, model: Optional[str] = None) -> List[str]:
+        """
+        녹화 파일 목록 (quiz_id가 없으면 전체)
+        """
+        base = self._dir(quiz_id, model) if quiz_id is not None else self.root
+        out = []
+        for folder, _, files in os.walk(base):
+            out.extend(os.path.join(folder, f) for f in files if f.endswith(".json.gz"))
+        if model and quiz_id is None:
+            out = [p for p in out if os.path.basename(os.path.dirname(p)) == _slug(model)]
+        return sorted(out)
+
+    def pick(self, quiz_id: Any, model: Optional[str] = None, completed_only: bool = True,
+             rnd: Optional[random.Random] = None) -> Optional[Transcript]:
+        """
+        해당 퀴즈의 녹화 하나 (여러 개면 무작위, 없으면 None)
+        """
+        if quiz_id is None:
+            return None
+        candidates = self.paths(quiz_id, model)
+        (rnd or random).shuffle(candidates)
+        for path in candidates:
+            try:
+                transcript = self.load(path)
+            except (OSError, ValueError, KeyError) as e:
+                print(f"[transcripts] skipping {path}: {e}")
+                continue
+            if transcript.completed or not completed_only:
+                return transcript
+        return None
+
+
+def replay(transcript: Transcript, speed: float = 1.0, stop_event: Optional[threading.Event] = None,
+           started: Optional[float] = None) -> Iterator[str]:
+    """
+    녹화 시각에 맞춰 토큰을 내보냄 (speed=2.0이면 두 배 빠르게)
+    :param stop_event: set되면 즉시 중단
+    :param started: 기준 시각 (time.perf_counter, 기본은 지금)
+    """
+    started = time.perf_counter() if started is None else started
+    for offset_ms, text in zip(transcript.offsets_ms, transcript.tokens):
+        wait = started + offset_ms / 1000 / speed - time.perf_counter()
+        if wait > 0:
+            if stop_event is not None:
+                if stop_event.wait(wait):
+                    return
+            else:
+                time.sleep(wait)
+        elif stop_event is not None and stop_event.is_set():
+            return
+        yield text
+
+
+def schedule(transcript: Transcript, start_ms: int, speed: float = 1.0) -> List[Tuple[int, str]]:
+    """
+    가상 시계용: [(재생 시각 ms, 토큰), ...] (headless_sim 등)
+    """
+    return [(start_ms + int(t / speed), text) for t, text in zip(transcript.offsets_ms, transcript.tokens)]
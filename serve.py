@@ -0,0 +1,111 @@
+"""
+웹 서비스 실행 (개발 서버 python app.py 대신)
+- Linux / macOS: gunicorn (gunicorn.conf.py) — 워커 프로세스 WEB_WORKERS개 × 스레드 WEB_THREADS개
+- Windows 또는 --server waitress: waitress 한 프로세스 × 스레드 WEB_THREADS개
+- 요청을 받기 전에 워커마다 warm_up (DB 연결 풀 + 리더보드 스냅샷 + 템플릿)
+- 종료 신호(SIGTERM / Ctrl+C): 새 요청은 503, 처리 중인 요청은 WEB_DRAIN_TIMEOUT초까지 마무리 후 종료
+  (waitress에서 한 번 더 누르면 바로 종료)
+
+실행: python serve.py [--server gunicorn|waitress] [--host 0.0.0.0] [--port 55000] [--workers N] [--threads N]
+"""
+import _thread
+import argparse
+import importlib.util
+import os
+import signal
+import sys
+import threading
+import time
+
+from dotenv import load_dotenv
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+GUNICORN_CONF = os.path.join(ROOT_DIR, "gunicorn.conf.py")
+
+
+class _Drainer:
+    """
+    waitress 종료 처리: 첫 신호에 DRAINING → 처리 중 요청이 0이 되거나 timeout이 지나면 메인 루프 종료
+    """
+
+    def __init__(self, app, timeout: float):
+        self.app = app
+        self.timeout = timeout
+        self.draining = False
+        self.drained = False
+
+    def handle(self, signum, frame):
+        if self.draining or self.drained:
+            raise KeyboardInterrupt  # 마무리 끝 (또는 두 번째 신호) → waitress가 작업 스레드 정리 후 run() 반환
+        self.draining = True
+        self.app.config["DRAINING"] = True
+        print(f"[web] signal {signum}: draining (up to {self.timeout:.0f}s)")
+        threading.Thread(target=self._wait, name="web-drain", daemon=True).start()
+
+    def _wait(self):
+        metrics = self.app.extensions["request_metrics"]
+        deadline = time.monotonic() + self.timeout
+        while metrics.in_flight > 0 and time.monotonic() < deadline:
+            time.sleep(0.05)
+        if metrics.in_flight > 0:
+            print(f"[web] drain timeout, {metrics.in_flight} requests still running")
+        time.sleep(0.2)  # 마지막 응답을 메인 루프가 소켓으로 보낼 시간
+        self.drained = True
+        _thread.interrupt_main()
+
+
+def serve_waitress(host: str, port: int, threads: int, drain_timeout: float) -> None:
+    # db_connection이 import될 때 풀 크기를 읽으므로 앱보다 먼저
+    os.environ.setdefault("DB_POOL_SIZE", str(threads))
+    from waitress import create_server
+    from app import create_app, shutdown, warm_up
+
+    app = create_app()
+    warm_up(app)
+    server = create_server(app, host=host, port=port, threads=threads, ident="bcd2025")
+    drainer = _Drainer(app, drain_timeout)
+    for name in ("SIGINT", "SIGTERM", "SIGBREAK"):
+        if hasattr(signal, name):
+            signal.signal(getattr(signal, name), drainer.handle)
+    print(f"[web] serving on http://{host}:{port} (waitress, {threads} threads, pid {os.getpid()})")
+    try:
+        server.run()
+    finally:
+        server.close()
+        shutdown()
+    print("[web] stopped")
+
+
+def serve_gunicorn() -> None:
+    # 설정은 환경변수 → gunicorn.conf.py (워커 / 스레드 / warm_up / graceful_timeout)
+    os.chdir(ROOT_DIR)
+    args = [sys.executable, "-m", "gunicorn", "-c", GUNICORN_CONF, "app:create_app()"]
+    os.execv(sys.executable, args)
+
+
+def main() -> None:
+    load_dotenv()
+    default_server = "gunicorn" if os.name != "nt" and importlib.util.find_spec("gunicorn") else "waitress"
+    parser = argparse.ArgumentParser(description="BCD2025 web server")
+    parser.add_argument("--server", choices=("gunicorn", "waitress"), default=default_server)
+    parser.add_argument("--host", default=os.getenv("WEB_HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("WEB_PORT", "55000")))
+    parser.add_argument("--workers", type=int, default=None, help="gunicorn worker processes (WEB_WORKERS)")
+    parser.add_argument("--threads", type=int, default=int(os.getenv("WEB_THREADS", "8")))
+    parser.add_argument("--drain-timeout", type=float, default=float(os.getenv("WEB_DRAIN_TIMEOUT", "20")))
+    args = parser.parse_args()
+
+    if args.server == "gunicorn":
+        os.environ["WEB_HOST"] = args.host
+        os.environ["WEB_PORT"] = str(args.port)
+        os.environ["WEB_THREADS"] = str(args.threads)
+        os.environ["WEB_DRAIN_TIMEOUT"] = str(args.drain_timeout)
+        if args.workers:
+            os.environ["WEB_WORKERS"] = str(args.workers)
+        serve_gunicorn()
+    else:
+        serve_waitress(args.host, args.port, args.threads, args.drain_timeout)
+
+
+if __name__ == "__main__":
+    main()
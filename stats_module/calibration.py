@@ -0,0 +1,278 @@
+"""
+라운드 로그로 문제별 실제 난이도 계산 + 난이도 재분류 제안 (NumPy 벡터 연산)
+- 문제별 집계는 np.unique(return_inverse) + np.bincount, 중앙값은 lexsort 한 번으로 계산
+  (행 단위 파이썬 루프 없음 → 수백만 판도 수 초)
+- 실제 난이도 점수 = 0.75 × (1 - 사람 승률, 전체 평균 쪽으로 보정) + 0.25 × 정답 소요 시간 백분위
+- 재분류: 판 수가 충분한 문제를 점수순으로 줄 세운 뒤 현재 쉬움/노말/하드 개수 비율대로 다시 자름
+- 입력: logs/rounds.csv(이 키오스크에서 한 판만) 또는 --source db(BCD2025_ROUND, 모든 키오스크)
+
+실행 예:
+    python -m stats_module.calibration                          # logs/rounds.csv → logs/calibration.csv
+    python -m stats_module.calibration --source db              # 모든 키오스크의 라운드 (BCD2025_ROUND)
+    python -m stats_module.calibration --min-rounds 30 --apply  # 제안대로 quiz.difficulty 수정
+    python -m stats_module.calibration --bench 2000000          # 가상 라운드로 속도 측정
+"""
+import argparse
+import csv
+import os
+import time
+from typing import Dict, Optional
+
+import numpy as np
+
+from stats_module.rounds import DEFAULT_ROUND_LOG
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_OUT = os.path.join(ROOT_DIR, "logs", "calibration.csv")
+
+NUMERIC_FIELDS = ("quiz_id", "difficulty", "human_ms", "human_correct", "ai_ms", "ai_correct")
+
+FAIL_WEIGHT = 0.75
+TIME_WEIGHT = 0.25
+
+
+def load_rounds(path: str = DEFAULT_ROUND_LOG) -> Dict[str, np.ndarray]:
+    """
+    라운드 로그 CSV → 열별 배열 (빈 칸은 NaN, winner는 사람 승리 여부 0/1)
+    - pandas가 있으면 read_csv(C 파서), 없으면 csv 모듈로 읽음
+    """
+    try:
+        import pandas as pd
+    except ImportError:
+        pd = None
+
+    if pd is not None:
+        df = pd.read_csv(path, usecols=list(NUMERIC_FIELDS) + ["winner"])
+        cols = {name: df[name].to_numpy(dtype=float) for name in NUMERIC_FIELDS}
+        cols["human_win"] = (df["winner"].to_numpy() == "HUMAN").astype(float)
+        return cols
+
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        index = [header.index(name) for name in NUMERIC_FIELDS + ("winner",)]
+        rows = [[row[i] for i in index] for row in reader]
+    if not rows:
+        return {name: np.empty(0) for name in NUMERIC_FIELDS + ("human_win",)}
+    table = np.array(rows, dtype=object)
+    cols = {}
+    for j, name in enumerate(NUMERIC_FIELDS):
+        raw = table[:, j].astype(str)
+        cols[name] = np.where(raw == "", "nan", raw).astype(float)
+    cols["human_win"] = (table[:, -1] == "HUMAN").astype(float)
+    return cols
+
+
+# 시간순 (재분류의 현재 난이도 = 문제별 마지막 판)
+ROUNDS_SQL = """
+SELECT quiz_id, difficulty, winner, elapsed_ms, human_correct, ai_correct
+FROM BCD2025_ROUND
+WHERE quiz_id IS NOT NULL
+ORDER BY id
+"""
+
+
+def load_rounds_db() -> Dict[str, np.ndarray]:
+    """
+    BCD2025_ROUND(모든 키오스크가 기록한 라운드) → load_rounds와 같은 열별 배열
+    - human_ms / ai_ms: 답을 낸 쪽(human_correct / ai_correct가 NULL이 아닌 쪽)의 elapsed_ms
+    """
+    from db_module.db_connection import get_connection
+
+    conn = get_connection()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(ROUNDS_SQL)
+            rows = cursor.fetchall()
+    finally:
+        conn.close()
+    if not rows:
+        return {name: np.empty(0) for name in NUMERIC_FIELDS + ("human_win",)}
+
+    # None → NaN
+    table = np.array([(r["quiz_id"], r["difficulty"], r["elapsed_ms"], r["human_correct"], r["ai_correct"],
+                       r["winner"] == "HUMAN") for r in rows], dtype=float)
+    quiz_id, difficulty, elapsed, human_correct, ai_correct, human_win = table.T
+    return {
+        "quiz_id": quiz_id,
+        "difficulty": difficulty,
+        "human_ms": np.where(np.isnan(human_correct), np.nan, elapsed),
+        "human_correct": human_correct,
+        "ai_ms": np.where(np.isnan(ai_correct), np.nan, elapsed),
+        "ai_correct": ai_correct,
+        "human_win": human_win,
+    }
+
+
+def group_median(values: np.ndarray, groups: np.ndarray, n_groups: int) -> np.ndarray:
+    """
+    그룹별 중앙값 (NaN 제외, 값이 없는 그룹은 NaN) — 정렬 한 번
+    """
+    mask = ~np.isnan(values)
+    v, g = values[mask], groups[mask]
+    out = np.full(n_groups, np.nan)
+    if v.size == 0:
+        return out
+    order = np.lexsort((v, g))
+    v, g = v[order], g[order]
+    counts = np.bincount(g, minlength=n_groups)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    has = counts > 0
+    lo = starts[has] + (counts[has] - 1) // 2
+    hi = starts[has] + counts[has] // 2
+    out[has] = (v[lo] + v[hi]) / 2
+    return out
+
+
+def percentile_rank(values: np.ndarray) -> np.ndarray:
+    """
+    0~1 백분위 (NaN은 0.5)
+    """
+    out = np.full(values.shape, 0.5)
+    mask = ~np.isnan(values)
+    if mask.sum() > 1:
+        ranks = np.argsort(np.argsort(values[mask], kind="stable"), kind="stable")
+        out[mask] = ranks / (mask.sum() - 1)
+    return out
+
+
+def calibrate(cols: Dict[str, np.ndarray], min_rounds: int = 20, prior: float = 10.0) -> Dict[str, np.ndarray]:
+    """
+    :param min_rounds: 이보다 판 수가 적은 문제는 재분류하지 않음 (suggested = current)
+    :param prior: 승률 보정 강도 (이만큼의 '평균적인 판'을 더한 것처럼 계산)
+    :return: 문제별 열 배열 {quiz_id, rounds, current, suggested, score, human_win_rate, ...}
+    """
+    quiz_ids, inv = np.unique(cols["quiz_id"], return_inverse=True)
+    k = quiz_ids.size
+    rounds = np.bincount(inv, minlength=k)
+
+    # 사람 승률 (전체 평균 쪽으로 보정해서 판 수가 적은 문제가 튀지 않게)
+    wins = np.bincount(inv, weights=cols["human_win"], minlength=k)
+    global_rate = wins.sum() / max(rounds.sum(), 1)
+    win_rate = (wins + prior * global_rate) / (rounds + prior)
+
+    # 사람이 맞힌 판의 소요 시간 중앙값
+    solved_ms = np.where(cols["human_correct"] == 1, cols["human_ms"], np.nan)
+    median_solve_ms = group_median(solved_ms, inv, k)
+
+    # AI 정답률 (AI가 끝까지 답한 판 기준)
+    ai_answered = np.bincount(inv, weights=~np.isnan(cols["ai_correct"]), minlength=k)
+    ai_right = np.bincount(inv, weights=cols["ai_correct"] == 1, minlength=k)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ai_accuracy = np.where(ai_answered > 0, ai_right / ai_answered, np.nan)
+
+    # 현재 난이도 = 문제별 가장 마지막 판의 값 (로그는 시간순 append)
+    last = np.zeros(k, dtype=np.int64)
+    np.maximum.at(last, inv, np.arange(inv.size))
+    current = np.clip(np.nan_to_num(cols["difficulty"][last], nan=2), 1, 3).astype(int)
+
+    score = FAIL_WEIGHT * (1 - win_rate) + TIME_WEIGHT * percentile_rank(median_solve_ms)
+
+    # 재분류: 판 수가 충분한 문제만, 현재 난이도 분포를 유지하면서 점수순으로 다시 자름
+    suggested = current.copy()
+    eligible = np.flatnonzero(rounds >= min_rounds)
+    if eligible.size:
+        order = eligible[np.argsort(score[eligible], kind="stable")]
+        sizes = np.bincount(current[eligible], minlength=4)[1:4]
+        suggested[order] = np.repeat(np.arange(1, 4), sizes)[: order.size]
+
+    return {
+        "quiz_id": quiz_ids.astype(int),
+        "rounds": rounds,
+        "current": current,
+        "suggested": suggested,
+        "score": np.round(score, 4),
+        "human_win_rate": np.round(win_rate, 4),
+        "median_solve_ms": median_solve_ms,
+        "ai_accuracy": np.round(ai_accuracy, 4),
+    }
+
+
+def write_report(result: Dict[str, np.ndarray], path: str) -> None:
+    fields = list(result)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(fields)
+        for row in zip(*(result[name].tolist() for name in fields)):
+            writer.writerow(["" if isinstance(v, float) and v != v else v for v in row])
+
+
+def synthetic_rounds(n: int, quizzes: int = 2000, seed: Optional[int] = 0) -> Dict[str, np.ndarray]:
+    """
+    벤치마크용 가상 라운드 (문제마다 숨은 난이도가 있고 사람 승률 / 시간이 그에 따라 달라짐)
+    """
+    rng = np.random.default_rng(seed)
+    hidden = rng.random(quizzes)
+    labelled = np.clip((hidden * 3).astype(int) + rng.integers(-1, 2, quizzes), 0, 2) + 1  # 사람이 붙인 난이도 (오차 있음)
+    q = rng.integers(0, quizzes, n)
+    human_answered = rng.random(n) < 0.8
+    human_correct = rng.random(n) > hidden[q] * 0.8
+    ai_correct = rng.random(n) < 0.7
+    human_win = np.where(human_answered, human_correct, ~ai_correct)
+    elapsed = rng.gamma(2.0, 3000 + hidden[q] * 12000)
+    return {
+        "quiz_id": q.astype(float),
+        "difficulty": labelled[q].astype(float),
+        "human_ms": np.where(human_answered, elapsed, np.nan),
+        "human_correct": np.where(human_answered, human_correct, np.nan).astype(float),
+        "ai_ms": np.where(human_answered, np.nan, elapsed),
+        "ai_correct": np.where(human_answered, np.nan, ai_correct).astype(float),
+        "human_win": human_win.astype(float),
+    }
+
+
+def apply_suggestions(result: Dict[str, np.ndarray]) -> int:
+    from db_module.quiz import update_quiz
+
+    changed = np.flatnonzero(result["suggested"] != result["current"])
+    for i in changed:
+        update_quiz(int(result["quiz_id"][i]), difficulty=int(result["suggested"][i]))
+    return changed.size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Calibrate quiz difficulty from round logs")
+    parser.add_argument("--source", choices=("csv", "db"), default="csv",
+                        help="csv: this kiosk's round log, db: every kiosk's rounds from BCD2025_ROUND")
+    parser.add_argument("--log", default=DEFAULT_ROUND_LOG, help="round log CSV written by the game")
+    parser.add_argument("--out", default=DEFAULT_OUT, help="per-quiz report CSV")
+    parser.add_argument("--min-rounds", type=int, default=20)
+    parser.add_argument("--prior", type=float, default=10.0)
+    parser.add_argument("--apply", action="store_true", help="write suggested difficulties to the quiz table")
+    parser.add_argument("--bench", type=int, metavar="N", help="time calibration on N synthetic rounds instead")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    if args.bench:
+        cols = synthetic_rounds(args.bench)
+    elif args.source == "db":
+        try:
+            cols = load_rounds_db()
+        except Exception as e:
+            print("❌ Error loading rounds from BCD2025_ROUND:", e)
+            return
+    else:
+        if not os.path.exists(args.log):
+            print(f"[calibration] no round log at {args.log}")
+            return
+        cols = load_rounds(args.log)
+    t1 = time.perf_counter()
+    result = calibrate(cols, min_rounds=args.min_rounds, prior=args.prior)
+    t2 = time.perf_counter()
+
+    moved = result["suggested"] != result["current"]
+    print(f"[calibration] {cols['quiz_id'].size} rounds, {result['quiz_id'].size} quizzes "
+          f"(load {t1 - t0:.2f}s, calibrate {t2 - t1:.2f}s)")
+    print(f"[calibration] {int(moved.sum())} quizzes would change difficulty")
+    if args.bench:
+        return
+
+    write_report(result, args.out)
+    print(f"[calibration] report: {args.out}")
+    if args.apply:
+        print(f"[calibration] updated {apply_suggestions(result)} quizzes")
+
+
+if __name__ == "__main__":
+    main()
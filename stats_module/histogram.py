@@ -0,0 +1,110 @@
+import math
+import threading
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# 기본 버킷 상한 (ms): 60fps 한 프레임(16ms) 전후와 DB/LLM 지연 구간을 함께 커버
+DEFAULT_BUCKETS_MS: Tuple[float, ...] = (
+    1, 2, 4, 8, 16, 33, 50, 100, 250, 500, 1000, 2500, 5000, 10000,
+)
+
+
+def _nearest_rank(data: List[float], p: float) -> Optional[float]:
+    # data는 정렬된 상태여야 함
+    if not data:
+        return None
+    rank = math.ceil(p / 100 * len(data)) - 1
+    return data[min(len(data) - 1, max(0, rank))]
+
+
+class RollingHistogram:
+    """
+    지연 시간 분포 기록기 (스레드 안전)
+    - 최근 window개 샘플로 p50/p95/p99 계산
+    - 전체 기간 누적 버킷 카운트 / 합계 / 최댓값 유지
+    """
+
+    def __init__(self, window: int = 1024, buckets: Iterable[float] = DEFAULT_BUCKETS_MS):
+        self.buckets: Tuple[float, ...] = tuple(sorted(buckets))
+        self.bucket_counts: List[int] = [0] * (len(self.buckets) + 1)  # 마지막 칸은 +Inf
+        self.samples: deque = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        with self._lock:
+            self.samples.append(value)
+            self.count += 1
+            self.total += value
+            if value > self.max:
+                self.max = value
+            for i, upper in enumerate(self.buckets):
+                if value <= upper:
+                    self.bucket_counts[i] += 1
+                    break
+            else:
+                self.bucket_counts[-1] += 1
+
+    def percentile(self, p: float) -> Optional[float]:
+        """
+        최근 window 샘플 기준 백분위수 (nearest-rank)
+        :param p: 0~100
+        :return: 값 또는 샘플이 없으면 None
+        """
+        with self._lock:
+            data = sorted(self.samples)
+        return _nearest_rank(data, p)
+
+    def cumulative_buckets(self) -> List[Tuple[float, int]]:
+        """
+        Prometheus 스타일 누적 버킷 [(상한, 누적 개수), ..., (inf, 전체)]
+        """
+        with self._lock:
+            counts = list(self.bucket_counts)
+        out = []
+        running = 0
+        for upper, c in zip(self.buckets + (float("inf"),), counts):
+            running += c
+            out.append((upper, running))
+        return out
+
+    def summary(self) -> Dict[str, Optional[float]]:
+        with self._lock:
+            data = sorted(self.samples)
+            count, total, peak = self.count, self.total, self.max
+        return {
+            "count": count,
+            "mean": round(total / count, 3) if count else None,
+            "p50": _nearest_rank(data, 50),
+            "p95": _nearest_rank(data, 95),
+            "p99": _nearest_rank(data, 99),
+            "max": peak if count else None,
+        }
+
+
+def _label_value(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(labels: Dict[str, object]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_label_value(v)}"' for k, v in labels.items()) + "}"
+
+
+def prometheus_histogram(name: str, labels: Dict[str, object], hist: RollingHistogram, scale: float = 1.0) -> List[str]:
+    """
+    Prometheus 텍스트 형식 히스토그램 줄 (_bucket / _sum / _count)
+    :param scale: 값 변환 배율 (ms → 초면 0.001)
+    """
+    lines = []
+    for upper, count in hist.cumulative_buckets():
+        le = "+Inf" if upper == float("inf") else repr(round(upper * scale, 6))
+        lines.append(f"{name}_bucket{format_labels({**labels, 'le': le})} {count}")
+    with hist._lock:
+        total, count = hist.total, hist.count
+    lines.append(f"{name}_sum{format_labels(labels)} {round(total * scale, 6)}")
+    lines.append(f"{name}_count{format_labels(labels)} {count}")
+    return lines
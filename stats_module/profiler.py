@@ -0,0 +1,150 @@
+import atexit
+import csv
+import json
+import os
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+from stats_module.histogram import RollingHistogram
+
+FRAME_BUDGET_MS = 1000 / 60  # 60fps 한 프레임 예산 (~16.7ms)
+
+# 프레임 단위 구간 버킷 (ms)
+FRAME_BUCKETS_MS = (0.5, 1, 2, 4, 8, 12, 16.7, 25, 33, 50, 100, 250)
+
+
+class FrameProfiler:
+    """
+    게임 루프 구간별 시간 측정기
+    - 구간 키 예: "update/GAME", "draw/RESULT/draw_overlay_result"
+    - 키마다 RollingHistogram, 예산 초과 프레임은 구간 내역과 함께 따로 보관
+    - dump()로 CSV(요약) / JSON(요약 + 느린 프레임) 저장
+    """
+
+    def __init__(
+        self,
+        out_dir: str = "profiles",
+        budget_ms: float = FRAME_BUDGET_MS,
+        window: int = 600,
+        keep_slow_frames: int = 200,
+    ):
+        self.out_dir = out_dir
+        self.budget_ms = budget_ms
+        self.window = window
+        self.hists: Dict[str, RollingHistogram] = {}
+        self.slow_frames: deque = deque(maxlen=keep_slow_frames)
+        self.frames = 0
+        self.over_budget = 0
+        self.overlay_visible = False
+
+        self._frame_start = 0.0
+        self._frame_state = ""
+        self._frame_sections: Dict[str, float] = {}
+        self._dumped = False
+        atexit.register(self.dump)
+
+    def hist(self, key: str) -> RollingHistogram:
+        h = self.hists.get(key)
+        if h is None:
+            h = self.hists[key] = RollingHistogram(window=self.window, buckets=FRAME_BUCKETS_MS)
+        return h
+
+    def record(self, key: str, ms: float) -> None:
+        self.hist(key).observe(ms)
+        self._frame_sections[key] = self._frame_sections.get(key, 0.0) + ms
+
+    def begin_frame(self, state: str, interval_ms: Optional[float] = None) -> None:
+        """
+        :param state: 프레임 시작 시점의 게임 상태
+        :param interval_ms: clock.tick이 돌려준 직전 프레임 간격 (실제 끊김 확인용)
+        """
+        self._frame_state = state
+        self._frame_sections = {}
+        self._frame_start = time.perf_counter()
+        if interval_ms is not None:
+            self.hist("interval").observe(interval_ms)
+
+    def end_frame(self) -> None:
+        total = (time.perf_counter() - self._frame_start) * 1000
+        self.frames += 1
+        self.hist("frame").observe(total)
+        self.hist(f"frame/{self._frame_state}").observe(total)
+        if total > self.budget_ms:
+            self.over_budget += 1
+            self.slow_frames.append({
+                "frame": self.frames,
+                "state": self._frame_state,
+                "total_ms": round(total, 3),
+                "sections_ms": {k: round(v, 3) for k, v in self._frame_sections.items()},
+            })
+
+    @contextmanager
+    def section(self, phase: str):
+        # phase/state 키로 기록 (state는 프레임 시작 시점 기준)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(f"{phase}/{self._frame_state}", (time.perf_counter() - start) * 1000)
+
+    def wrap(self, phase: str, fn: Callable) -> Callable:
+        """
+        fn 호출 시간을 "phase/state/fn이름" 키로 기록하는 래퍼 반환
+        """
+        name = getattr(fn, "__name__", "fn")
+
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.record(f"{phase}/{self._frame_state}/{name}", (time.perf_counter() - start) * 1000)
+
+        timed.__name__ = name
+        return timed
+
+    def top(self, n: int = 5, by: str = "p95") -> List[tuple]:
+        """
+        by 기준 상위 n개 구간 [(키, 요약 dict), ...] (frame/interval 제외)
+        """
+        rows = [(k, h.summary()) for k, h in self.hists.items() if not k.startswith(("frame", "interval"))]
+        rows.sort(key=lambda kv: kv[1][by] or 0, reverse=True)
+        return rows[:n]
+
+    def report(self) -> dict:
+        return {
+            "budget_ms": round(self.budget_ms, 3),
+            "frames": self.frames,
+            "over_budget": self.over_budget,
+            "sections": {k: h.summary() for k, h in sorted(self.hists.items())},
+            "slow_frames": list(self.slow_frames),
+        }
+
+    def dump(self) -> Optional[str]:
+        """
+        out_dir에 frame_profile_<시각>.csv / .json 저장 (한 번만)
+        :return: 저장한 파일 경로(확장자 제외) 또는 None
+        """
+        if self._dumped or not self.frames:
+            return None
+        self._dumped = True
+
+        os.makedirs(self.out_dir, exist_ok=True)
+        base = os.path.join(self.out_dir, time.strftime("frame_profile_%Y%m%d_%H%M%S"))
+        report = self.report()
+
+        with open(base + ".json", "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+        with open(base + ".csv", "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["section", "count", "mean", "p50", "p95", "p99", "max"])
+            for key, s in report["sections"].items():
+                writer.writerow([key, s["count"]] + [
+                    None if s[col] is None else round(s[col], 3) for col in ("mean", "p50", "p95", "p99", "max")
+                ])
+
+        print(f"[profile] {self.frames} frames, {self.over_budget} over {self.budget_ms:.1f}ms -> {base}.csv/.json")
+        return base
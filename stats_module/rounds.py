@@ -0,0 +1,71 @@
+"""
+라운드 결과 로그 (CSV, 한 판에 한 줄 append)
+- 게임이 end_game에서 기록 → stats_module.calibration이 문제별 실제 난이도 계산에 사용
+- 비어 있는 칸: 해당 쪽이 답을 내지 않은 판 (예: 사람이 답하기 전에 AI가 끝낸 판의 human_ms)
+"""
+import csv
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_ROUND_LOG = os.path.join(ROOT_DIR, "logs", "rounds.csv")
+
+ROUND_FIELDS = (
+    "ts", "quiz_id", "difficulty", "class_id", "winner", "reason",
+    "human_ms", "human_correct", "ai_ms", "ai_correct", "ai_model",
+)
+
+# end_game reason → (사람이 답함/정답, AI가 끝남/정답)
+_OUTCOMES = {
+    "CORRECT": ("human", 1),
+    "WRONG_ANSWER": ("human", 0),
+    "TOO_SLOW": ("ai", 1),
+    "AI_WRONG": ("ai", 0),
+}
+
+
+def round_record(quiz: Dict[str, Any], class_id: str, winner: str, reason: str, elapsed_ms: int,
+                 ai_model: str = "") -> Dict[str, Any]:
+    """
+    :param elapsed_ms: 게임 시작부터 라운드가 끝난 시점 (game_end_time)
+    """
+    side, correct = _OUTCOMES.get(reason, (None, None))
+    return {
+        "ts": round(time.time(), 3),
+        "quiz_id": quiz.get("id"),
+        "difficulty": quiz.get("difficulty"),
+        "class_id": class_id,
+        "winner": winner,
+        "reason": reason,
+        "human_ms": elapsed_ms if side == "human" else None,
+        "human_correct": correct if side == "human" else None,
+        "ai_ms": elapsed_ms if side == "ai" else None,
+        "ai_correct": correct if side == "ai" else None,
+        "ai_model": ai_model,
+    }
+
+
+class RoundLog:
+    def __init__(self, path: Optional[str] = DEFAULT_ROUND_LOG):
+        """
+        :param path: CSV 경로 (None이면 기록 안 함)
+        """
+        self.path = path
+        self._lock = threading.Lock()
+
+    def append(self, record: Dict[str, Any]) -> None:
+        if not self.path or record.get("quiz_id") is None:
+            return
+        with self._lock:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                new = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+                with open(self.path, "a", newline="", encoding="utf-8") as f:
+                    writer = csv.DictWriter(f, fieldnames=ROUND_FIELDS, extrasaction="ignore")
+                    if new:
+                        writer.writeheader()
+                    writer.writerow({k: "" if v is None else v for k, v in record.items()})
+            except OSError as e:
+                print(f"[rounds] failed to write {self.path}: {e}")
@@ -0,0 +1,207 @@
+"""
+Flask 요청 지표 + 요청 단위 프로파일러
+- 라우트(url_rule)별 지연 / 요청·응답 크기 RollingHistogram, (라우트, 상태 코드)별 횟수, 처리 중인 요청 수
+- prometheus_lines()로 Prometheus 텍스트 형식 출력 (app.py의 /metrics)
+- 프로파일: ?profile=1 + 관리자 토큰(X-Admin-Token 헤더, URL로는 받지 않음 — 접근 로그 / 브라우저 기록에 남음),
+  또는 N번째 요청마다 cProfile
+  → <profile_dir>/<시각>_<메서드>_<라우트>_<ms>.pstats  (python -m pstats 파일명 으로 확인)
+  한 번에 한 요청만 프로파일 (cProfile은 동시에 하나만 켤 수 있음)
+"""
+import cProfile
+import hmac
+import itertools
+import os
+import re
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from stats_module.histogram import RollingHistogram, format_labels, prometheus_histogram
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_PROFILE_DIR = os.path.join(ROOT_DIR, "logs", "profiles", "web")
+
+# 요청 / 응답 크기 버킷 (bytes)
+SIZE_BUCKETS = (0, 128, 512, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+RouteKey = Tuple[str, str]  # (method, route)
+
+
+class _RouteStats:
+    __slots__ = ("latency_ms", "request_bytes", "response_bytes")
+
+    def __init__(self, window: int):
+        self.latency_ms = RollingHistogram(window=window)
+        self.request_bytes = RollingHistogram(window=window, buckets=SIZE_BUCKETS)
+        self.response_bytes = RollingHistogram(window=window, buckets=SIZE_BUCKETS)
+
+
+class RequestMetrics:
+    def __init__(self, window: int = 1024, admin_token: str = "", profile_every: int = 0,
+                 profile_dir: str = DEFAULT_PROFILE_DIR, keep_profiles: int = 200):
+        """
+        :param admin_token: ?profile=1 / 지표 API에 필요한 토큰 (빈 값이면 요청별 프로파일 꺼짐)
+        :param profile_every: N번째 요청마다 프로파일 (0이면 꺼짐)
+        :param keep_profiles: 남길 pstats 파일 수
+        """
+        self.window = window
+        self.admin_token = admin_token
+        self.profile_every = profile_every
+        self.profile_dir = profile_dir
+        self.keep_profiles = keep_profiles
+        self.routes: Dict[RouteKey, _RouteStats] = {}
+        self.statuses: Counter = Counter()      # (method, route, status) → 횟수
+        self.in_flight = 0
+        self.in_flight_max = 0
+        self.profiles_written = 0
+        self._counter = itertools.count(1)
+        self._profile_lock = threading.Lock()
+        self._lock = threading.Lock()
+
+    def init_app(self, app) -> None:
+        from flask import g, request
+
+        @app.before_request
+        def _metrics_start():
+            g.metrics_started = time.perf_counter()
+            with self._lock:
+                self.in_flight += 1
+                self.in_flight_max = max(self.in_flight_max, self.in_flight)
+            g.metrics_profiler = self._maybe_profile(request)
+
+        @app.after_request
+        def _metrics_response(response):
+            g.metrics_status = response.status_code
+            if not response.is_streamed:
+                g.metrics_response_bytes = response.calculate_content_length() or 0
+            profile_path = g.pop("metrics_profile_path", None)
+            if profile_path:
+                response.headers["X-Profile"] = os.path.basename(profile_path)
+            return response
+
+        @app.teardown_request
+        def _metrics_finish(exc):
+            started = g.pop("metrics_started", None)
+            if started is None:
+                return
+            ms = (time.perf_counter() - started) * 1000
+            with self._lock:
+                self.in_flight -= 1
+            route = request.url_rule.rule if request.url_rule is not None else "<unmatched>"
+            status = g.pop("metrics_status", 500 if exc is not None else 200)
+            self.observe(request.method, route, status, ms,
+                         request.content_length or 0, g.pop("metrics_response_bytes", None))
+            profiler = g.pop("metrics_profiler", None)
+            if profiler is not None:
+                self._finish_profile(profiler, request.method, route, ms)
+
+        # after_request는 등록 역순으로 실행 → _metrics_response보다 먼저 프로파일을 저장하고 X-Profile에 파일명
+        @app.after_request
+        def _metrics_profile(response):
+            profiler = g.pop("metrics_profiler", None)
+            if profiler is not None:
+                route = request.url_rule.rule if request.url_rule is not None else "<unmatched>"
+                ms = (time.perf_counter() - g.metrics_started) * 1000
+                g.metrics_profile_path = self._finish_profile(profiler, request.method, route, ms)
+            return response
+
+    # --- 기록 ---
+
+    def observe(self, method: str, route: str, status: int, ms: float,
+                request_bytes: int = 0, response_bytes: Optional[int] = None) -> None:
+        key = (method, route)
+        stats = self.routes.get(key)
+        if stats is None:
+            with self._lock:
+                stats = self.routes.setdefault(key, _RouteStats(self.window))
+        stats.latency_ms.observe(ms)
+        stats.request_bytes.observe(request_bytes)
+        if response_bytes is not None:
+            stats.response_bytes.observe(response_bytes)
+        with self._lock:
+            self.statuses[(method, route, status)] += 1
+
+    # --- 프로파일 ---
+
+    def is_admin(self, request) -> bool:
+        """
+        X-Admin-Token 헤더 또는 Authorization: Bearer <토큰> (Prometheus scrape 설정용)이 admin_token과 같은지
+        """
+        if not self.admin_token:
+            return False
+        token = request.headers.get("X-Admin-Token", "")
+        auth = request.headers.get("Authorization", "")
+        if not token and auth.startswith("Bearer "):
+            token = auth[len("Bearer "):]
+        return hmac.compare_digest(token.encode(), self.admin_token.encode())
+
+    def _wants_profile(self, request) -> bool:
+        if request.args.get("profile") == "1" and self.is_admin(request):
+            return True
+        return bool(self.profile_every) and next(self._counter) % self.profile_every == 0
+
+    def _maybe_profile(self, request) -> Optional[cProfile.Profile]:
+        if not self._wants_profile(request) or not self._profile_lock.acquire(blocking=False):
+            return None
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:  # 다른 프로파일러가 켜져 있음
+            self._profile_lock.release()
+            return None
+        return profiler
+
+    def _finish_profile(self, profiler: cProfile.Profile, method: str, route: str, ms: float) -> Optional[str]:
+        try:
+            profiler.disable()
+            os.makedirs(self.profile_dir, exist_ok=True)
+            slug = re.sub(r"[^0-9A-Za-z_-]+", "_", route).strip("_") or "root"
+            path = os.path.join(self.profile_dir, f"{int(time.time() * 1000)}_{method}_{slug}_{int(ms)}ms.pstats")
+            profiler.dump_stats(path)
+            self.profiles_written += 1
+            self._prune_profiles()
+            return path
+        except OSError as e:
+            print(f"[web] failed to write profile: {e}")
+            return None
+        finally:
+            self._profile_lock.release()
+
+    def _prune_profiles(self) -> None:
+        files = sorted(f for f in os.listdir(self.profile_dir) if f.endswith(".pstats"))
+        for old in files[:-self.keep_profiles] if self.keep_profiles > 0 else []:
+            try:
+                os.remove(os.path.join(self.profile_dir, old))
+            except OSError:
+                pass
+
+    # --- 내보내기 ---
+
+    def prometheus_lines(self, prefix: str = "bcd") -> List[str]:
+        with self._lock:
+            routes = sorted(self.routes.items())
+            statuses = sorted(self.statuses.items())
+            in_flight = self.in_flight
+        lines = [
+            f"# HELP {prefix}_http_requests_total Requests by route and status code.",
+            f"# TYPE {prefix}_http_requests_total counter",
+        ]
+        for (method, route, status), count in statuses:
+            lines.append(f"{prefix}_http_requests_total"
+                         f"{format_labels({'method': method, 'route': route, 'status': status})} {count}")
+        lines += [
+            f"# HELP {prefix}_http_requests_in_flight Requests currently being handled.",
+            f"# TYPE {prefix}_http_requests_in_flight gauge",
+            f"{prefix}_http_requests_in_flight {in_flight}",
+        ]
+        for metric, attr, scale, help_text in (
+            ("http_request_duration_seconds", "latency_ms", 0.001, "Request latency by route."),
+            ("http_request_size_bytes", "request_bytes", 1, "Request body size by route."),
+            ("http_response_size_bytes", "response_bytes", 1, "Response body size by route."),
+        ):
+            name = f"{prefix}_{metric}"
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+            for (method, route), stats in routes:
+                lines += prometheus_histogram(name, {"method": method, "route": route}, getattr(stats, attr), scale)
+        return lines
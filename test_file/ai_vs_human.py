@@ -4,11 +4,9 @@ import random
 import threading
 import queue
 import requests
-import json
 import time
 import pygame
 import unicodedata
-import re
 
 # Add parent directory to path to allow importing db_module when running from test_file/
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -19,7 +17,17 @@ if parent_dir not in sys.path:
 from typing import List, Tuple, Optional
 from db_module.quiz import get_random_quiz_by_category, list_quiz_titles
 from db_module.db_connection import get_connection
-from db_module.score import insert_ai_data, exist, update_ai_score, get_ai_data
+from db_module.score import exist, update_ai_score, get_ai_data
+from db_module.journal import make_score_writer
+from ui_module.line_break import wrap_text
+from stats_module.profiler import FrameProfiler
+from stats_module.rounds import DEFAULT_ROUND_LOG, RoundLog, round_record
+from llm_module.answers import check_answer, extract_answer
+from llm_module.ollama import DoneEvent, OllamaError, TokenEvent
+from llm_module.hedge import hedged_generate
+from llm_module.profiles import GenerationProfile, profile_for
+from llm_module.router import ModelRouter
+from llm_module.transcripts import DEFAULT_TRANSCRIPT_DIR, Transcript, TranscriptRecorder, TranscriptStore, replay
 
 # --- Configuration ---
 WINDOW_WIDTH = 1000
@@ -34,7 +42,17 @@ BOX_BG = (255, 255, 255)
 BOX_BORDER = (229, 231, 235)
 
 TITLE = "AI vs Human Quiz Battle"
-AI_MODEL = "gemma3:4b" # Updated to match lamarun.py as requested
+
+# --- Profiling (GAME_PROFILE=1 in .env or environment) ---
+PROFILE_HOTKEY = pygame.K_F3  # toggles the on-screen frame-time overlay
+AI_MODEL = "gemma3:4b" # Fallback when no profile model is available (see llm_module.router)
+AI_TOKEN_DELAY = 0.1  # seconds between streamed tokens on screen
+
+# --- Transcript record / replay (llm_module.transcripts) ---
+# AI_REPLAY: off = always live, fallback = replay a recording when Ollama is unreachable,
+#            always = replay whenever the quiz has a recording (demo kiosk, no GPU)
+AI_REPLAY = os.getenv("AI_REPLAY", "fallback").lower()
+AI_RECORD = os.getenv("AI_RECORD", "1") == "1"
 
 # --- States ---
 STATE_LOGIN = "LOGIN"
@@ -44,6 +62,11 @@ STATE_COUNTDOWN = "COUNTDOWN"
 STATE_GAME = "GAME"
 STATE_RESULT = "RESULT"
 
+# --- Roulette ---
+ROULETTE_SPIN_MS = 2000    # reel spins and eases out onto the real title
+ROULETTE_REVEAL_MS = 3000  # real title flashes until this point, then countdown
+ROULETTE_REEL_STEPS = 24   # cells scrolled past during the spin
+
 # --- Utils (Reused/Adapted) ---
 def load_korean_font(size: int) -> pygame.font.Font:
     # Try generic or system fonts
@@ -66,28 +89,54 @@ def normalize_text(text: str) -> str:
     # Fix macOS specific Hangeul decomposition issue
     return unicodedata.normalize('NFC', text)
 
-def wrap_text(text: str, font: pygame.font.Font, max_width: int) -> List[str]:
-    text = normalize_text(text)
-    lines = []
-    if not text: return [""]
-    for para in text.split("\n"):
-        words = para.split(" ")
-        current = ""
-        for w in words:
-            test = (current + " " + w).strip() if current else w
-            if font.size(test)[0] <= max_width:
-                current = test
-            else:
-                if current: lines.append(current)
-                current = w
-        if current: lines.append(current)
-    return lines
-
 def draw_rect_with_border(screen, rect, bg_color, border_color=None, width=0, radius=8):
     pygame.draw.rect(screen, bg_color, rect, border_radius=radius)
     if border_color:
         pygame.draw.rect(screen, border_color, rect, 2, border_radius=radius)
 
+def ease_out_cubic(t: float) -> float:
+    t = min(max(t, 0.0), 1.0)
+    return 1 - (1 - t) ** 3
+
+def pick_title_font(fonts, text: str) -> pygame.font.Font:
+    # Long titles get smaller fonts so they still fit the roulette box
+    f = fonts['xl']
+    if len(text) > 20: f = fonts['lg']
+    if len(text) > 40: f = fonts['md']
+    return f
+
+def render_title_block(text: str, fonts, width: int, color, bg_color) -> pygame.Surface:
+    # Wrapped, horizontally centered title on an opaque background
+    f = pick_title_font(fonts, text)
+    lines = wrap_text(text, f, width)
+    line_h = f.get_height()
+    block = pygame.Surface((width, max(1, len(lines)) * line_h))
+    block.fill(bg_color)
+    for i, line in enumerate(lines):
+        s = f.render(line, True, color, bg_color)
+        block.blit(s, s.get_rect(midtop=(width // 2, i * line_h)))
+    return block
+
+class RouletteAtlas:
+    """
+    Roulette candidate titles rendered once into a single tall surface.
+    Each title occupies one row; draw_roulette only blits rows out of it.
+    """
+    def __init__(self, titles: List[str], fonts, width: int, color, bg_color):
+        blocks = [render_title_block(t, fonts, width, color, bg_color) for t in (titles or ["..."])]
+        self.surface = pygame.Surface((width, sum(b.get_height() for b in blocks)))
+        self.rects: List[pygame.Rect] = []
+        y = 0
+        for b in blocks:
+            self.surface.blit(b, (0, y))
+            self.rects.append(pygame.Rect(0, y, width, b.get_height()))
+            y += b.get_height()
+        if pygame.display.get_surface() is not None:
+            self.surface = self.surface.convert()
+
+    def __len__(self):
+        return len(self.rects)
+
 def format_time(ms: int) -> str:
     total_sec = ms // 1000
     mins = total_sec // 60
@@ -132,7 +181,10 @@ class Game:
             self.roulette_candidates = ["Loading...", "Quizzz...", "AI vs Human"]
 
         self.roulette_start_tick = 0
-        self.roulette_idx = 0
+        self.roulette_atlas = None
+        self.roulette_reel = []  # atlas indices scrolled past, final title comes last
+        self.roulette_final = None
+        self.build_roulette_atlas()
 
         # Gameplay
         self.user_input = ""
@@ -141,6 +193,16 @@ class Game:
 
         # AI
         self.ai_current_text = ""
+        self.ai_profile = profile_for(1)
+        self.ai_model = AI_MODEL
+        self.ai_run = None  # timings of the current AI stream, consumed by record_ai_run
+        self.model_router = ModelRouter(token_delay_ms=AI_TOKEN_DELAY * 1000)
+        self.round_log = RoundLog(os.getenv("ROUND_LOG", DEFAULT_ROUND_LOG) or None)
+        self.score_writer = make_score_writer()
+        self.transcripts = TranscriptStore(
+            root=os.getenv("AI_TRANSCRIPT_DIR", DEFAULT_TRANSCRIPT_DIR),
+            keep=int(os.getenv("AI_TRANSCRIPT_KEEP", "5")),
+        )
         self.ai_queue = queue.Queue()
         self.ai_stop_event = threading.Event()
         self.ai_finished = False
@@ -158,8 +220,22 @@ class Game:
         # game setting
         self.difficulty = "1"
         self.score = 0
+        self.base_score = None  # 로그인할 때 백그라운드에서 읽은 누적 점수 (화면 표시용)
+        self.round_score = 0
         self.game_over_detail = ""
 
+        # Frame profiler (off unless GAME_PROFILE=1)
+        self.profiler = None
+        if os.getenv("GAME_PROFILE") == "1":
+            self.enable_profiler(FrameProfiler(out_dir=os.getenv("GAME_PROFILE_DIR", "profiles")))
+
+    def enable_profiler(self, profiler: FrameProfiler):
+        # Time every draw_* call per state; the overlay itself is left out
+        self.profiler = profiler
+        for name in dir(self):
+            if name.startswith("draw_") and name != "draw_profiler_overlay":
+                setattr(self, name, profiler.wrap("draw", getattr(self, name)))
+
     def get_new_quiz(self):
         # Deck of Cards System: guarantees no repeats until all are shown
         if not hasattr(self, 'quiz_deck') or not self.quiz_deck:
@@ -176,6 +252,10 @@ class Game:
                 self.quiz_deck = rows
                 random.shuffle(self.quiz_deck)
                 print(f"[DEBUG] Loaded {len(self.quiz_deck)} questions into deck.")
+
+                # Roulette shows titles from the freshly loaded deck
+                self.roulette_candidates = [r['title'] for r in rows[:50] if r.get('title')] or self.roulette_candidates
+                self.build_roulette_atlas()
             except Exception as e:
                 print(f"[Error] Failed to load quiz deck: {e}")
                 return {
@@ -186,72 +266,105 @@ class Game:
 
         return self.quiz_deck.pop()
 
-    def run_ollama_worker(self, prompt: str):
-        # Logic from lamarun.py adapted for queue
-        url = "http://localhost:11434/api/generate"
-        model = AI_MODEL # Use a lighter model to be safe or "llama3" if user prefers. Going with gemma2:2b as it is fast.
-
-        # Construct a persona prompt
-        full_prompt = (
-            f"You are a quiz contestant. The question is: {prompt}\n"
-            f"First, describe your thinking process in detail. Do NOT give the answer immediately.\n"
-            f"At the very end, provide the final answer in this format: 'Answer: [Your Answer]'"
-        )
+    def roulette_box_rect(self) -> pygame.Rect:
+        box_rect = pygame.Rect(0, 0, 800, 200)
+        box_rect.center = (WINDOW_WIDTH//2, WINDOW_HEIGHT//2)
+        return box_rect
+
+    def build_roulette_atlas(self):
+        # Pre-render every candidate once; the reel only blits from this atlas
+        width = self.roulette_box_rect().width - 40
+        self.roulette_atlas = RouletteAtlas(self.roulette_candidates, self.fonts, width, TEXT_COLOR, BOX_BG)
+
+    def run_ollama_worker(self, prompt: str, profile: GenerationProfile, models: List[str]):
+        # Logic from lamarun.py adapted for queue (llm_module records TTFT / throughput per request)
+        # models: router's pick first, then fallbacks tried when Ollama answers 404
+
+        # Construct a persona prompt; thinking length / token budget come from the difficulty profile
+        full_prompt = profile.prompt(prompt)
+
+        quiz_id = self.current_quiz.get('id')
+        for i, model in enumerate(models):
+            self.ai_model = model
+            run = self.ai_run = {"model": model, "difficulty": self.difficulty, "ttft_ms": None, "tps": None, "tokens": None}
+            recorder = TranscriptRecorder(quiz_id, model, self.difficulty)
+            completed = False
+            started = time.perf_counter()
+            # Hedged across OLLAMA_URLS: a stalled endpoint gets a backup request after OLLAMA_HEDGE_AFTER_MS
+            events = hedged_generate(model, full_prompt, timeout=30, source="game", options=profile.options())
+            try:
+                for event in events:
+                    if self.ai_stop_event.is_set():
+                        break
+                    if isinstance(event, TokenEvent):
+                        if run["ttft_ms"] is None:
+                            run["ttft_ms"] = (time.perf_counter() - started) * 1000
+                        self.ai_queue.put(event.text)
+                        recorder.token(event.text)
+                        print(event.text, end="", flush=True) # DEBUG to Console
+
+                        # Requested delay
+                        time.sleep(AI_TOKEN_DELAY)
+                    elif isinstance(event, DoneEvent):
+                        run["tps"] = event.stats.decode_tokens_per_sec
+                        run["tokens"] = event.stats.eval_count
+                        completed = True
+
+            except OllamaError as e:
+                # Check if model exists, if not 404 -> next candidate
+                if e.status == 404:
+                    self.model_router.mark_missing(model)
+                    if i + 1 < len(models):
+                        print(f"[DEBUG] Model '{model}' not found, falling back to '{models[i + 1]}'")
+                        continue
+                    self.ai_queue.put(f"[System: Model '{model}' not found. Please pull it.]")
+                else:
+                    self.ai_queue.put(f"[System: {e}]")
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                recording = self.find_recording() if AI_REPLAY != "off" and not recorder.tokens else None
+                if recording is not None:
+                    print(f"\n[DEBUG] Ollama unavailable ({type(e).__name__}), replaying a recorded {recording.model} transcript")
+                    self.run_replay_worker(recording)
+                    return
+                if isinstance(e, requests.exceptions.Timeout):
+                    err = "\n[Error: Ollama request timed out.]"
+                else:
+                    err = "\n[Error: Could not connect to Ollama. Is it running?]"
+                print(err)
+                self.ai_queue.put(err)
+            except Exception as e:
+                err = f"\n[Error: {e}]"
+                print(err)
+                self.ai_queue.put(err)
+            finally:
+                events.close()
+                if AI_RECORD and recorder.tokens:
+                    try:
+                        self.transcripts.save(recorder.finish(completed))
+                    except OSError as e:
+                        print(f"[DEBUG] Failed to save transcript: {e}")
+            break
 
-        payload = {
-            "model": model,
-            "prompt": full_prompt,
-            "stream": True
-        }
+        self.ai_finished = True
 
-        try:
-            response = requests.post(url, json=payload, stream=True, timeout=30) # Increased timeout
-            # Check if model exists, if not 404
-            if response.status_code == 404:
-                 self.ai_queue.put(f"[System: Model '{model}' not found. Please pull it.]")
-                 self.ai_finished = True
-                 return
-            elif response.status_code != 200:
-                 self.ai_queue.put(f"[System: Ollama API Error: {response.status_code} - {response.text}]")
-                 self.ai_finished = True
-                 return
-
-            # Use iter_lines for safer line-by-line reading
-            for line in response.iter_lines():
-                if self.ai_stop_event.is_set():
-                    break
-                if line:
-                    try:
-                        decoded_line = line.decode('utf-8')
-                        data = json.loads(decoded_line)
-                        if "response" in data:
-                            token = data["response"]
-                            self.ai_queue.put(token)
-                            print(token, end="", flush=True) # DEBUG to Console
-
-                            # Requested delay
-                            time.sleep(0.1)
-
-                        if data.get("done"):
-                            break
-                    except Exception as e:
-                        print(f"[DEBUG] Error parsing line: {e}")
-
-        except requests.exceptions.ConnectionError:
-            err = "\n[Error: Could not connect to Ollama. Is it running?]"
-            print(err)
-            self.ai_queue.put(err)
-        except requests.exceptions.Timeout:
-            err = "\n[Error: Ollama request timed out.]"
-            print(err)
-            self.ai_queue.put(err)
-        except Exception as e:
-            err = f"\n[Error: {e}]"
-            print(err)
-            self.ai_queue.put(err)
+    def find_recording(self) -> Optional[Transcript]:
+        # Any completed recording of the current quiz (any model)
+        return self.transcripts.pick(self.current_quiz.get('id'))
 
+    def run_replay_worker(self, recording: Transcript):
+        # Feed a recorded stream with its original timing (no Ollama, nothing recorded / routed)
+        self.ai_model = f"{recording.model} (replay)"
+        self.ai_run = None
+        for text in replay(recording, stop_event=self.ai_stop_event):
+            self.ai_queue.put(text)
         self.ai_finished = True
 
+    def record_ai_run(self, correct: Optional[bool]):
+        # Feed this round's TTFT / tokens/s / correctness to the model router (once per round)
+        run, self.ai_run = self.ai_run, None
+        if run is not None:
+            self.model_router.observe(run["model"], run["difficulty"], run["ttft_ms"], run["tps"], run["tokens"], correct)
+
     def start_round(self):
         # self.current_quiz is already set in start_roulette_logic
         title = self.current_quiz.get('title', '')
@@ -263,7 +376,7 @@ class Game:
         self.user_input = ""
         self.state = STATE_COUNTDOWN
         self.countdown_val = 3
-        self.last_count_tick = pygame.time.get_ticks()
+        self.last_count_tick = self.ticks()
         self.game_end_time = 0
 
         # Reset AI
@@ -289,36 +402,69 @@ class Game:
     def start_ai_worker(self):
         # Use title + description for prompt
         q_text = self.current_quiz.get('title', '') + " " + self.current_quiz.get('description', '')
-        self.ai_thread = threading.Thread(target=self.run_ollama_worker, args=(q_text,))
+        self.ai_profile = profile_for(self.difficulty)
+        models = self.model_router.candidates(self.difficulty, self.ai_profile) or [AI_MODEL]
+        self.ai_model = models[0]
+        self.ai_run = None
+        recording = self.find_recording() if AI_REPLAY == "always" else None
+        if recording is not None:
+            self.ai_model = f"{recording.model} (replay)"
+            self.ai_thread = threading.Thread(target=self.run_replay_worker, args=(recording,))
+        else:
+            self.ai_thread = threading.Thread(target=self.run_ollama_worker, args=(q_text, self.ai_profile, models))
         self.ai_thread.daemon = True # Allow main program to exit even if thread is running
         self.ai_thread.start()
 
     def start_game_timers(self):
-        self.start_ticks = pygame.time.get_ticks()
+        self.start_ticks = self.ticks()
+
+    def ticks(self) -> int:
+        # Game clock in ms (headless_sim.py swaps this for a virtual clock)
+        return pygame.time.get_ticks()
 
     def check_answer(self, user_ans, real_ans):
-        def norm(s): return str(s).strip().lower().replace(" ", "")
-        return norm(user_ans) == norm(real_ans)
+        # Shared with llm_module.evaluate (strip / lower / drop spaces)
+        return check_answer(user_ans, real_ans)
 
     def run(self):
         while True:
             dt = self.clock.tick(60)
-            self.handle_input()
-            self.update(dt)
-            self.draw()
+            if self.profiler is None:
+                self.handle_input()
+                self.update(dt)
+                self.draw()
+                continue
+
+            prof = self.profiler
+            prof.begin_frame(self.state, interval_ms=dt)
+            with prof.section("handle_input"):
+                self.handle_input()
+            with prof.section("update"):
+                self.update(dt)
+            with prof.section("draw"):
+                self.draw()
+            prof.end_frame()
 
     def handle_input(self):
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 self.ai_stop_event.set() # Signal AI thread to stop
+                if self.profiler:
+                    self.profiler.dump()
+                self.score_writer.close()  # try to drain the score journal before exiting
                 pygame.quit(); sys.exit()
 
+            if event.type == pygame.KEYDOWN and self.profiler and event.key == PROFILE_HOTKEY:
+                self.profiler.overlay_visible = not self.profiler.overlay_visible
+                continue
+
             if event.type == pygame.KEYDOWN:
                 if self.state == STATE_LOGIN:
                     if event.key == pygame.K_BACKSPACE:
                         self.student_id = self.student_id[:-1]
                     elif event.key == pygame.K_RETURN and self.student_id.strip():
                         self.state = STATE_MENU
+                        self.load_base_score(self.student_id)
                     else:
                         if event.unicode.isnumeric() or event.unicode.isalnum():
                             self.student_id += event.unicode
@@ -346,6 +492,21 @@ class Game:
                         self.student_id = ""
                         self.state = STATE_LOGIN
 
+    def load_base_score(self, student_id):
+        # 누적 점수 읽기는 메인 스레드(프레임 루프)를 막지 않도록 백그라운드에서
+        self.base_score = None
+
+        def worker():
+            try:
+                user_data = get_ai_data(student_id)
+            except Exception as e:
+                print(f"Error while loading score: {e}")
+                return
+            if self.student_id == student_id:
+                self.base_score = int(user_data['score']) if user_data else 0
+
+        threading.Thread(target=worker, name="load-score", daemon=True).start()
+
     def start_roulette(self):
         self.state = STATE_ROULETTE
         self.start_roulette_logic()
@@ -353,24 +514,23 @@ class Game:
     def start_roulette_logic(self):
         self.current_quiz = self.get_new_quiz()
         self.difficulty = str(self.current_quiz.get('difficulty', '1'))
-        self.roulette_start_tick = pygame.time.get_ticks()
-        # Shuffle candidates for visual variety
-        random.shuffle(self.roulette_candidates)
+        self.roulette_start_tick = self.ticks()
+
+        # Build the reel: random atlas rows for variety, then the real title
+        count = len(self.roulette_atlas)
+        self.roulette_reel = [random.randrange(count) for _ in range(ROULETTE_REEL_STEPS)]
+        width = self.roulette_box_rect().width - 40
+        self.roulette_final = render_title_block(self.current_quiz.get('title', ''), self.fonts, width, ACCENT_COLOR, BOX_BG)
 
     def human_submit(self):
         # 1. Check Correctness
         correct_ans = self.current_quiz.get('correct', '') or ""
-        self.game_end_time = pygame.time.get_ticks() - self.start_ticks
+        self.game_end_time = self.ticks() - self.start_ticks
 
         # 1번 방식: 60,000ms(1분)에서 걸린 시간을 차감 (최소 0점)
         round_score = max(0, 60000 - self.game_end_time)
+        self.round_score = round_score
 
-        # 기존 점수 가져오기 (누적 방식)
-        user_data = get_ai_data(self.student_id)
-        if user_data:
-            self.score = int(user_data['score']) + round_score
-        else:
-            self.score = round_score
 
         if self.check_answer(self.user_input, correct_ans):
             self.end_game('HUMAN', 'CORRECT')
@@ -385,6 +545,7 @@ class Game:
         self.fail_reason = reason
         self.state = STATE_RESULT
         self.ai_stop_event.set()
+        self.record_ai_run(None)  # no-op if the AI answer was already graded
 
         # Detail message logic
         if winner == 'HUMAN':
@@ -402,12 +563,29 @@ class Game:
                 self.game_over_detail = "AI가 먼저 정답을 제출했습니다."
                 add = False
 
+        record = round_record(
+            self.current_quiz, self.student_id, winner, reason, self.game_end_time, self.ai_model,
+        )
+
+        # 누적 점수 (표시용): 로그인 때 읽은 값 + 이번 판 (DB에는 아래 add_score로 증분만 보냄)
+        self.score = (self.base_score or 0) + (self.round_score if add else 0)
+
+        # Lands in the local score journal first (SCORE_JOURNAL), replayed to MySQL in the background
+        # so the frame loop never waits on the DB and results survive outages
         try:
-            if add :
-                insert_ai_data(self.difficulty, self.student_id, self.score, winner)
+            # Append-only round history + per-player rollup (leaderboards read the rollup);
+            # add_score adds round_score to BCD2025_AI in the same transaction, exactly once per round op_id
+            self.score_writer.submit_round(
+                self.student_id, record["quiz_id"], self.difficulty, winner, reason, self.game_end_time,
+                self.round_score, record["human_correct"], record["ai_correct"], self.ai_model, winner if add else None,
+                add_score=add,
+            )
         except Exception as e:
             print(f"Error while saving score: {e}")
 
+        # Round log for difficulty calibration (python -m stats_module.calibration)
+        self.round_log.append(record)
+
     def update(self, dt):
         self.cursor_timer += dt
         if self.cursor_timer > 500:
@@ -415,29 +593,17 @@ class Game:
             self.cursor_timer = 0
 
         if self.state == STATE_ROULETTE:
-            now = pygame.time.get_ticks()
+            now = self.ticks()
             elapsed = now - self.roulette_start_tick
 
-            # Animation duration: 2.5s total
-            # 0-2.0s: Spinning
-            # 2.0-2.5s: Show Final Title
-            # 2.5s: Go to Countdown
-
-            if elapsed < 2000:
-                # Cycle rapidly: Change every 50ms increasing to 200ms
-                # Simple math for slowing down
-                factor = (elapsed / 2000) # 0 to 1
-                delay = 50 + int(200 * factor)
-                if now % delay < dt + 10: # Rough trigger
-                    self.roulette_idx = (self.roulette_idx + 1) % len(self.roulette_candidates)
-            elif elapsed < 3000:
-                # Show Real Title
-                pass
-            else:
+            # 0-2.0s: Reel spins (drawn from elapsed time, see draw_roulette)
+            # 2.0-3.0s: Show Final Title
+            # 3.0s: Go to Countdown
+            if elapsed >= ROULETTE_REVEAL_MS:
                 self.start_round()
 
         elif self.state == STATE_COUNTDOWN:
-            now = pygame.time.get_ticks()
+            now = self.ticks()
             if now - self.last_count_tick >= 1000:
                 self.countdown_val -= 1
                 self.last_count_tick = now
@@ -453,33 +619,27 @@ class Game:
                     self.ai_current_text += token
             except queue.Empty:
                 pass
+            # Keep only the tail (the answer is at the end, the box shows the last lines)
+            limit = self.ai_profile.max_transcript_chars
+            if len(self.ai_current_text) > limit:
+                self.ai_current_text = self.ai_current_text[-limit:]
 
             # Check if AI finished and human hasn't submitted
             if self.ai_finished and self.winner is None:
-                self.game_end_time = pygame.time.get_ticks() - self.start_ticks
+                self.game_end_time = self.ticks() - self.start_ticks
 
                 # 1번 방식 점수 계산
                 round_score = max(0, 60000 - self.game_end_time)
-
-                # 기존 점수와 합산
-                user_data = get_ai_data(self.student_id)
-                if user_data:
-                    self.score = int(user_data['score']) + round_score
-                else:
-                    self.score = round_score
+                self.round_score = round_score
 
                 # Validate AI Answer
-                # Parse "Answer: [XYZ]" from the end
-                # Regex look for "Answer:" then capture until end or newline
-                match = re.search(r"Answer:\s*(.*)", self.ai_current_text, re.IGNORECASE)
+                # Parse "Answer: [XYZ]" (see llm_module.answers)
+                ai_ans = extract_answer(self.ai_current_text)
                 ai_correct = False
 
                 correct_val = self.current_quiz.get('correct', '')
 
-                if match:
-                    ai_ans = match.group(1).strip()
-                    # Remove trailing punctuation often added by LLM
-                    ai_ans = ai_ans.rstrip(".'\"")
+                if ai_ans is not None:
                     if self.check_answer(ai_ans, correct_val):
                         ai_correct = True
                     else:
@@ -487,6 +647,8 @@ class Game:
                 else:
                     print(f"[DEBUG] AI format mismatch. Text: {self.ai_current_text[-50:]}")
 
+                self.record_ai_run(ai_correct)
+
                 if ai_correct:
                     self.end_game('AI', 'TOO_SLOW')
                 else:
@@ -510,6 +672,9 @@ class Game:
             self.draw_game_interface() # Keep game visible
             self.draw_overlay_result()
 
+        if self.profiler and self.profiler.overlay_visible:
+            self.draw_profiler_overlay()
+
         pygame.display.flip()
 
     def draw_roulette(self):
@@ -521,43 +686,38 @@ class Game:
         self.screen.blit(h, h.get_rect(center=(WINDOW_WIDTH//2, 200)))
 
         # Box
-        box_rect = pygame.Rect(0, 0, 800, 200)
-        box_rect.center = (WINDOW_WIDTH//2, WINDOW_HEIGHT//2)
+        box_rect = self.roulette_box_rect()
         draw_rect_with_border(self.screen, box_rect, BOX_BG, ACCENT_COLOR, radius=15)
 
         # Text
-        now = pygame.time.get_ticks()
+        now = self.ticks()
         elapsed = now - self.roulette_start_tick
 
-        text_to_show = ""
-        color = TEXT_COLOR
-
-        if elapsed < 2000:
-            if self.roulette_candidates:
-                text_to_show = self.roulette_candidates[self.roulette_idx]
-            else:
-                text_to_show = "..."
-        else:
-            # Show Real Title
-            text_to_show = self.current_quiz.get('title', '')
-            color = ACCENT_COLOR
-            # Flash effect?
+        if elapsed >= ROULETTE_SPIN_MS:
+            # Flash effect on the real title
             if (elapsed // 100) % 2 == 0:
                 draw_rect_with_border(self.screen, box_rect, BOX_BG, (255, 215, 0), width=4, radius=15) # Gold border
 
-        # Render centered
-        # might need wrapping if title is long, but for roulette just truncate or small font
-        f = self.fonts['xl']
-        if len(text_to_show) > 20: f = self.fonts['lg']
-        if len(text_to_show) > 40: f = self.fonts['md']
-
-        lines = wrap_text(text_to_show, f, box_rect.width - 40)
-        # Just show first line for punchiness in roulette, or center all
-        y = box_rect.centery - (len(lines) * f.get_height()) // 2
-        for line in lines:
-            s = f.render(line, True, color)
-            self.screen.blit(s, s.get_rect(center=(box_rect.centerx, y + f.get_height()//2)))
-            y += f.get_height()
+        # Reel position eases out and lands exactly on the final cell at ROULETTE_SPIN_MS
+        last = len(self.roulette_reel)
+        pos = ease_out_cubic(elapsed / ROULETTE_SPIN_MS) * last
+        idx = min(int(pos), last)
+        frac = pos - idx
+
+        clip_prev = self.screen.get_clip()
+        self.screen.set_clip(box_rect.inflate(-8, -8))
+        pitch = box_rect.height
+        for k in (idx, idx + 1):
+            if k > last:
+                break
+            y = box_rect.centery + int((k - idx - frac) * pitch)
+            if k == last:
+                surf, area = self.roulette_final, None
+            else:
+                surf, area = self.roulette_atlas.surface, self.roulette_atlas.rects[self.roulette_reel[k]]
+            size = area.size if area else surf.get_size()
+            self.screen.blit(surf, pygame.Rect((0, 0), size).move(box_rect.centerx - size[0]//2, y - size[1]//2), area)
+        self.screen.set_clip(clip_prev)
 
     def draw_login(self):
         title = self.fonts['lg'].render(normalize_text("학번을 입력해주세요"), True, TEXT_COLOR)
@@ -587,7 +747,7 @@ class Game:
         # Timer (Center Top)
         elapsed = 0
         if self.state == STATE_GAME:
-            elapsed = pygame.time.get_ticks() - self.start_ticks
+            elapsed = self.ticks() - self.start_ticks
         elif self.state == STATE_RESULT:
             elapsed = self.game_end_time
 
@@ -598,7 +758,7 @@ class Game:
         p1 = self.fonts['md'].render(normalize_text("HUMAN (YOU)"), True, HUMAN_COLOR)
         self.screen.blit(p1, (50, 25))
 
-        p2 = self.fonts['md'].render(normalize_text(f"AI ({AI_MODEL})"), True, AI_COLOR)
+        p2 = self.fonts['md'].render(normalize_text(f"AI ({self.ai_model})"), True, AI_COLOR)
         p2_rect = p2.get_rect(topright=(WINDOW_WIDTH-50, 25))
         self.screen.blit(p2, p2_rect)
 
@@ -652,6 +812,27 @@ class Game:
                 self.screen.blit(lsurf, (ai_box_rect.x + 10, ay))
                 ay += 25
 
+    def draw_profiler_overlay(self):
+        prof = self.profiler
+        frame = prof.hist("frame").summary()
+        fps = self.clock.get_fps()
+
+        def fmt(v): return "-" if v is None else f"{v:.2f}"
+        lines = [
+            f"FPS {fps:.0f}  frame p50 {fmt(frame['p50'])} p95 {fmt(frame['p95'])} max {fmt(frame['max'])} ms",
+            f"over {prof.budget_ms:.1f}ms: {prof.over_budget}/{prof.frames}",
+        ]
+        for key, s in prof.top(6):
+            lines.append(f"{key}  p95 {fmt(s['p95'])}  max {fmt(s['max'])}")
+
+        f = self.fonts['sm']
+        panel = pygame.Surface((WINDOW_WIDTH - 20, len(lines) * 22 + 12), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 170))
+        for i, line in enumerate(lines):
+            color = (255, 120, 120) if i == 0 and (frame['p95'] or 0) > prof.budget_ms else (255, 255, 255)
+            panel.blit(f.render(line, True, color), (8, 6 + i * 22))
+        self.screen.blit(panel, (10, WINDOW_HEIGHT - panel.get_height() - 10))
+
     def draw_overlay_countdown(self):
         overlay = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT), pygame.SRCALPHA)
         overlay.fill((0,0,0,100))
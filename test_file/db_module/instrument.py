@@ -0,0 +1,246 @@
+"""
+db_module 쿼리 계측
+- get_connection이 만드는 커서(InstrumentedCursor)가 모든 execute / executemany를 잼
+- 호출한 db_module 함수(예: quiz.list_quiz_titles, score.fetch_ranking_by_difficulty)별로
+  쿼리 지연 / 반환·변경 행 수 / 연결 획득 시간을 RollingHistogram에 기록
+- SQL 모양(공백 정리, 값 → ?, IN (%s, %s, ...) → IN (%s, ...))별 횟수 / 누적 시간
+- DB_SLOW_MS 이상 걸린 쿼리는 슬로 쿼리 로그(JSONL)에 기록, DB_EXPLAIN_SLOW=1이면 EXPLAIN 결과도 같이
+- 프로세스별 집계 (웹은 /api/metrics/db), 슬로 쿼리 로그는 게임 / 봇 / 웹 공용 파일
+"""
+import functools
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+from pymysql.cursors import DictCursor
+
+from stats_module.histogram import RollingHistogram, format_labels, prometheus_histogram
+
+# test_file/db_module 사본(게임이 import)도 저장소 루트의 logs/를 써서 슬로 쿼리 로그 하나를 공유
+_PACKAGE_PARENT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ROOT_DIR = (os.path.dirname(_PACKAGE_PARENT) if os.path.basename(_PACKAGE_PARENT) == "test_file"
+            else _PACKAGE_PARENT)
+DEFAULT_SLOW_LOG = os.path.join(ROOT_DIR, "logs", "db_slow.jsonl")
+
+DB_SLOW_MS = float(os.getenv("DB_SLOW_MS", "200"))
+DB_EXPLAIN_SLOW = os.getenv("DB_EXPLAIN_SLOW", "0") == "1"
+
+_ROW_BUCKETS = (0, 1, 10, 100, 1000, 10000)
+MAX_SHAPES = 200
+
+_DB_DIR = os.path.dirname(os.path.abspath(__file__))
+_SKIP_FILES = {"db_connection.py", "instrument.py", "breaker.py"}
+
+
+def caller_name(depth: int = 1) -> str:
+    """
+    호출 스택에서 가장 가까운 db_module 함수 이름 (예: quiz.list_quiz_titles)
+    """
+    frame = sys._getframe(depth)
+    while frame is not None:
+        path = frame.f_code.co_filename
+        if os.path.dirname(os.path.abspath(path)) == _DB_DIR:
+            base = os.path.basename(path)
+            if base not in _SKIP_FILES:
+                return f"{base[:-3]}.{frame.f_code.co_name}"
+        frame = frame.f_back
+    return "other"
+
+
+_WS_RE = re.compile(r"\s+")
+_STR_RE = re.compile(r"'(?:[^'\\]|\\.)*'")
+_NUM_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PARAMS_RE = re.compile(r"%s(?:\s*,\s*%s)+")
+
+
+@functools.lru_cache(maxsize=1024)
+def sql_shape(query) -> str:
+    if isinstance(query, (bytes, bytearray)):
+        query = bytes(query[:2000]).decode("utf-8", "replace")
+    shape = _WS_RE.sub(" ", query).strip()
+    shape = _STR_RE.sub("?", shape)
+    shape = _NUM_RE.sub("?", shape)
+    return _PARAMS_RE.sub("%s, ...", shape)[:500]
+
+
+class _FunctionStats:
+    __slots__ = ("queries", "errors", "acquires", "acquire_errors", "query_ms", "rows", "acquire_ms")
+
+    def __init__(self, window: int):
+        self.queries = 0
+        self.errors = 0
+        self.acquires = 0
+        self.acquire_errors = 0
+        self.query_ms = RollingHistogram(window=window)
+        self.rows = RollingHistogram(window=window, buckets=_ROW_BUCKETS)
+        self.acquire_ms = RollingHistogram(window=window)
+
+
+class DBMetrics:
+    def __init__(self, slow_ms: float = DB_SLOW_MS, slow_log: Optional[str] = DEFAULT_SLOW_LOG,
+                 explain: bool = DB_EXPLAIN_SLOW, window: int = 512):
+        """
+        :param slow_ms: 이 이상 걸린 쿼리를 슬로 쿼리로 기록
+        :param slow_log: 슬로 쿼리 JSONL 경로 (None이면 파일 기록 안 함)
+        :param explain: 슬로 쿼리(SELECT / UPDATE / DELETE)에 EXPLAIN 실행
+        """
+        self.slow_ms = slow_ms
+        self.slow_log = slow_log
+        self.explain = explain
+        self.window = window
+        self._functions: Dict[str, _FunctionStats] = {}
+        self._shapes: Dict[str, Dict[str, Any]] = {}
+        self.recent_slow: deque = deque(maxlen=50)
+        self._lock = threading.Lock()
+
+    def _function(self, name: str) -> _FunctionStats:
+        stats = self._functions.get(name)
+        if stats is None:
+            with self._lock:
+                stats = self._functions.setdefault(name, _FunctionStats(self.window))
+        return stats
+
+    # 횟수와 히스토그램을 같은 잠금 안에서 → 스레드가 여러 개여도 queries == query_ms.count
+    def observe_acquire(self, function: str, ms: float, error: bool = False) -> None:
+        stats = self._function(function)
+        with self._lock:
+            stats.acquires += 1
+            stats.acquire_errors += int(error)
+            stats.acquire_ms.observe(ms)
+
+    def observe_query(self, function: str, shape: str, ms: float, rows: Optional[int], error: bool = False) -> None:
+        stats = self._function(function)
+        with self._lock:
+            stats.queries += 1
+            stats.errors += int(error)
+            stats.query_ms.observe(ms)
+            if rows is not None and rows >= 0:
+                stats.rows.observe(rows)
+            entry = self._shapes.get(shape)
+            if entry is None:
+                if len(self._shapes) >= MAX_SHAPES:
+                    return
+                entry = self._shapes[shape] = {"function": function, "count": 0, "errors": 0,
+                                               "total_ms": 0.0, "max_ms": 0.0, "rows": 0}
+            entry["count"] += 1
+            entry["errors"] += int(error)
+            entry["total_ms"] += ms
+            entry["max_ms"] = max(entry["max_ms"], ms)
+            entry["rows"] += max(rows or 0, 0)
+
+    def record_slow(self, record: Dict[str, Any]) -> None:
+        self.recent_slow.append(record)
+        if not self.slow_log:
+            return
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.slow_log)), exist_ok=True)
+            with self._lock, open(self.slow_log, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        except OSError as e:
+            print(f"[db] failed to write slow query log: {e}")
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            functions = {
+                name: {
+                    "queries": s.queries,
+                    "errors": s.errors,
+                    "query_ms": s.query_ms.summary(),
+                    "rows": s.rows.summary(),
+                    "acquires": s.acquires,
+                    "acquire_errors": s.acquire_errors,
+                    "acquire_ms": s.acquire_ms.summary(),
+                }
+                for name, s in sorted(self._functions.items())
+            }
+            shapes = {k: dict(v) for k, v in self._shapes.items()}
+        return {
+            "slow_ms": self.slow_ms,
+            "functions": functions,
+            "shapes": sorted(
+                ({"sql": k, **v, "total_ms": round(v["total_ms"], 3), "max_ms": round(v["max_ms"], 3),
+                  "mean_ms": round(v["total_ms"] / v["count"], 3)} for k, v in shapes.items()),
+                key=lambda r: r["total_ms"], reverse=True,
+            ),
+            "recent_slow": list(self.recent_slow),
+        }
+
+    def prometheus_lines(self, prefix: str = "bcd") -> List[str]:
+        with self._lock:
+            functions = sorted(self._functions.items())
+        lines = []
+        for metric, attr, help_text in (
+            ("db_query_duration_seconds", "query_ms", "Query latency by db_module function."),
+            ("db_acquire_duration_seconds", "acquire_ms", "Connection acquire time by db_module function."),
+        ):
+            name = f"{prefix}_{metric}"
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+            for function, stats in functions:
+                lines += prometheus_histogram(name, {"function": function}, getattr(stats, attr), 0.001)
+        name = f"{prefix}_db_query_errors_total"
+        lines += [f"# HELP {name} Failed queries by db_module function.", f"# TYPE {name} counter"]
+        lines += [f"{name}{format_labels({'function': function})} {stats.errors}" for function, stats in functions]
+        return lines
+
+
+db_metrics = DBMetrics(slow_log=os.getenv("DB_SLOW_LOG", DEFAULT_SLOW_LOG) or None)
+
+
+class InstrumentedCursor(DictCursor):
+    _in_many = False
+
+    def execute(self, query, args=None):
+        if self._in_many:
+            return super().execute(query, args)
+        return self._timed(super().execute, query, args)
+
+    def executemany(self, query, args):
+        # 내부에서 execute를 여러 번 부르므로 묶어서 한 번으로 기록
+        self._in_many = True
+        try:
+            return self._timed(super().executemany, query, args, many=True)
+        finally:
+            self._in_many = False
+
+    def _timed(self, fn, query, args, many=False):
+        started = time.perf_counter()
+        error = False
+        try:
+            return fn(query, args)
+        except Exception:
+            error = True
+            raise
+        finally:
+            ms = (time.perf_counter() - started) * 1000
+            function = caller_name(1)
+            shape = sql_shape(query)
+            db_metrics.observe_query(function, shape, ms, None if error else self.rowcount, error)
+            if ms >= db_metrics.slow_ms:
+                self._slow(function, shape, ms, error, many)
+
+    def _slow(self, function, shape, ms, error, many):
+        record = {
+            "ts": round(time.time(), 3),
+            "pid": os.getpid(),
+            "function": function,
+            "sql": shape,
+            "ms": round(ms, 2),
+            "rows": None if error else self.rowcount,
+            "error": error,
+        }
+        executed = self._executed
+        if db_metrics.explain and not error and not many and executed:
+            text = executed.decode("utf-8", "replace") if isinstance(executed, (bytes, bytearray)) else executed
+            if text.lstrip()[:6].upper() in ("SELECT", "UPDATE", "DELETE"):
+                try:
+                    with self.connection.cursor(DictCursor) as cursor:
+                        cursor.execute("EXPLAIN " + text)
+                        record["explain"] = cursor.fetchall()
+                except Exception as e:
+                    record["explain_error"] = f"{type(e).__name__}: {e}"
+        db_metrics.record_slow(record)
@@ -0,0 +1,319 @@
+"""
+AI vs Human 헤드리스 시뮬레이터 (부하 테스트용)
+
+창 없이(SDL dummy 드라이버) Game을 가상 시계로 돌리면서
+학번 입력 → 메뉴 → 룰렛 → 카운트다운 → 답안 제출 → 결과 를 스크립트 KEYDOWN 이벤트로 반복합니다.
+LLM은 가상 시계에 맞춰 토큰을 흘려보내는 MockLLM, DB는 메모리 기반 LocalDB로 대체합니다.
+
+실행 예:
+    python test_file/headless_sim.py --rounds 500 --no-draw
+    python test_file/headless_sim.py --rounds 50 --json report.json
+    python test_file/headless_sim.py --rounds 50 --replay logs/transcripts   # 녹화된 실제 AI 스트림으로
+"""
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+os.environ.setdefault("SCORE_JOURNAL", "")  # no local score journal for simulated rounds
+
+import argparse
+import contextlib
+import io
+import json
+import random
+import time
+from collections import Counter, deque
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional
+
+import pygame
+
+import ai_vs_human
+from ai_vs_human import Game, STATE_LOGIN, STATE_MENU, STATE_GAME, STATE_RESULT
+from stats_module.histogram import RollingHistogram
+from llm_module.transcripts import TranscriptStore, schedule
+
+
+class LocalDB:
+    """
+    db_module.quiz / db_module.score 중 게임이 쓰는 함수만 메모리로 흉내 내고 호출 수를 셉니다.
+    """
+
+    def __init__(self, quiz_count: int = 100, seed: Optional[int] = None):
+        rnd = random.Random(seed)
+        self.quizzes = [
+            {
+                "id": i,
+                "title": f"시뮬레이션 문제 {i}",
+                "description": f"{i} 더하기 {i}는 얼마일까요?",
+                "category": "sim",
+                "difficulty": rnd.randint(1, 3),
+                "correct": str(i + i),
+            }
+            for i in range(1, quiz_count + 1)
+        ]
+        self.scores: Dict[str, Dict[str, Any]] = {}
+        self.rounds: List[Dict[str, Any]] = []
+        self.calls: Counter = Counter()
+
+    def list_quiz_titles(self, limit: Optional[int] = 100, offset: int = 0, **_filters) -> List[Dict[str, Any]]:
+        self.calls["list_quiz_titles"] += 1
+        rows = self.quizzes[offset:]
+        return [dict(r) for r in (rows[:limit] if limit is not None else rows)]
+
+    def get_ai_data(self, class_id):
+        self.calls["get_ai_data"] += 1
+        row = self.scores.get(str(class_id))
+        return dict(row) if row else None
+
+    def insert_ai_data(self, difficulty, class_id, score, client=None):
+        self.calls["insert_ai_data"] += 1
+        self.scores[str(class_id)] = {"difficulty": difficulty, "class_id": class_id, "score": score, "client": client}
+
+    def record_round(self, class_id, quiz_id, difficulty, winner, reason, elapsed_ms, round_score,
+                     human_correct=None, ai_correct=None, ai_model=None, client=None, add_score=False):
+        self.calls["record_round"] += 1
+        if add_score:
+            row = self.scores.setdefault(str(class_id), {"difficulty": difficulty, "class_id": class_id, "score": 0})
+            row.update(difficulty=difficulty, score=row["score"] + round_score, client=client)
+        self.rounds.append({"class_id": class_id, "quiz_id": quiz_id, "difficulty": difficulty,
+                            "winner": winner, "reason": reason, "elapsed_ms": elapsed_ms, "round_score": round_score})
+
+    def submit_ai_data(self, *args, **kwargs) -> Future:
+        return self._done(self.insert_ai_data, *args, **kwargs)
+
+    def submit_round(self, *args, **kwargs) -> Future:
+        return self._done(self.record_round, *args, **kwargs)
+
+    @staticmethod
+    def _done(fn, *args, **kwargs) -> Future:
+        fut = Future()
+        fut.set_result(fn(*args, **kwargs))
+        return fut
+
+    def install(self, module) -> None:
+        # ai_vs_human은 DB 함수를 이름으로 import 하므로 모듈 전역을 교체
+        module.list_quiz_titles = self.list_quiz_titles
+        module.get_ai_data = self.get_ai_data
+
+
+class MockLLM:
+    """
+    Ollama 대신 '생각 → Answer: X' 형태의 토큰을 일정 속도로 내보내는 스크립트 생성기
+    """
+
+    def __init__(self, tokens_per_sec: float = 10.0, think_tokens: int = 80, accuracy: float = 0.7, seed: Optional[int] = None):
+        self.interval_ms = 1000.0 / tokens_per_sec
+        self.think_tokens = think_tokens
+        self.accuracy = accuracy
+        self.rnd = random.Random(seed)
+
+    def script(self, quiz: Dict[str, Any], start_ms: int, num_predict: Optional[int] = None) -> deque:
+        """
+        :param num_predict: 난이도 프로필의 토큰 상한 (Ollama처럼 넘으면 답 앞에서 잘림)
+        """
+        answer = quiz.get("correct", "") if self.rnd.random() < self.accuracy else "모르겠습니다"
+        tokens = [f"step{i} " for i in range(self.think_tokens)] + ["\nAnswer: ", str(answer)]
+        if num_predict is not None:
+            tokens = tokens[:num_predict]
+        return deque((start_ms + int((i + 1) * self.interval_ms), tok) for i, tok in enumerate(tokens))
+
+
+class ReplayLLM:
+    """
+    녹화된 AI 스트림(llm_module.transcripts)을 가상 시계에 맞춰 재생 — 렌더/파싱 경로의 결정적 벤치마크용
+    - 같은 quiz id 녹화가 있으면 그것을, 없으면 녹화들을 순서대로 돌려 씀
+    """
+
+    def __init__(self, root: str, speed: float = 1.0):
+        store = TranscriptStore(root)
+        self.transcripts = [store.load(p) for p in store.paths()]
+        if not self.transcripts:
+            raise ValueError(f"no recorded transcripts under {root}")
+        self.by_quiz = {str(t.quiz_id): t for t in self.transcripts}
+        self.speed = speed
+        self.turn = 0
+
+    def script(self, quiz: Dict[str, Any], start_ms: int, num_predict: Optional[int] = None) -> deque:
+        transcript = self.by_quiz.get(str(quiz.get("id")))
+        if transcript is None:
+            transcript = self.transcripts[self.turn % len(self.transcripts)]
+            self.turn += 1
+        return deque(schedule(transcript, start_ms, self.speed))
+
+
+class HeadlessGame(Game):
+    """
+    가상 시계 + MockLLM(또는 ReplayLLM)으로 도는 Game
+    - ticks()는 드라이버가 올리는 self.virtual_ms를 반환
+    - AI 스레드 대신 예약된 토큰을 update()에서 큐에 넣음
+    """
+
+    def __init__(self, llm):
+        self.virtual_ms = 0
+        self.llm = llm
+        self.ai_script: deque = deque()
+        super().__init__()
+        self.model_router = ai_vs_human.ModelRouter(state_path=None)  # keep sim runs out of logs/model_router.json
+        self.round_log = ai_vs_human.RoundLog(None)                   # ... and out of logs/rounds.csv
+
+    def ticks(self) -> int:
+        return self.virtual_ms
+
+    def start_ai_worker(self):
+        self.ai_profile = ai_vs_human.profile_for(self.difficulty)
+        self.ai_script = self.llm.script(self.current_quiz, self.ticks(), self.ai_profile.num_predict)
+
+    def update(self, dt):
+        now = self.ticks()
+        while self.ai_script and self.ai_script[0][0] <= now:
+            self.ai_queue.put(self.ai_script.popleft()[1])
+            if not self.ai_script:
+                self.ai_finished = True
+        super().update(dt)
+
+
+def key_event(key: int, unicode: str = "") -> pygame.event.Event:
+    return pygame.event.Event(pygame.KEYDOWN, key=key, unicode=unicode, mod=0, scancode=0)
+
+
+def type_text(text: str) -> None:
+    for ch in text:
+        pygame.event.post(key_event(0, ch))
+
+
+def simulate(
+    rounds: int = 100,
+    frame_ms: int = 16,
+    draw: bool = True,
+    human_think_ms: tuple = (1500, 6000),
+    human_accuracy: float = 0.8,
+    llm: Optional[MockLLM] = None,
+    db: Optional[LocalDB] = None,
+    seed: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    rounds판을 끝까지 진행하고 프레임 시간 / 라운드 지연 / DB 호출 수를 보고서(dict)로 반환
+    :param frame_ms: 한 프레임에 가상 시계를 몇 ms 진행할지 (60fps ≈ 16)
+    :param draw: False면 draw()를 건너뛰어 로직만 측정
+    """
+    rnd = random.Random(seed)
+    db = db or LocalDB(seed=seed)
+    db.install(ai_vs_human)
+    game = HeadlessGame(llm or MockLLM(seed=seed))
+    game.score_writer = db  # LocalDB has the same submit_round / submit_ai_data
+
+    frame_hist = RollingHistogram(window=100_000)
+    phase_hist = {name: RollingHistogram(window=100_000) for name in ("handle_input", "update", "draw")}
+    round_wall_hist = RollingHistogram(window=10_000, buckets=(1, 2, 5, 10, 20, 50, 100, 250, 500, 1000))
+    round_virtual_hist = RollingHistogram(window=10_000, buckets=(6000, 7000, 8000, 10000, 15000, 30000, 60000))
+    winners: Counter = Counter()
+
+    done = 0
+    round_wall_start = round_virtual_start = 0.0
+    answer_at: Optional[int] = None
+    result_seen = False
+    sim_start = time.perf_counter()
+
+    while done < rounds:
+        # --- 스크립트 입력 ---
+        if game.state == STATE_LOGIN:
+            sid = str(10101 + done % 1000)
+            type_text(sid)
+            pygame.event.post(key_event(pygame.K_RETURN))
+        elif game.state == STATE_MENU:
+            round_wall_start = time.perf_counter()
+            round_virtual_start = game.virtual_ms
+            pygame.event.post(key_event(pygame.K_RETURN))
+        elif game.state == STATE_GAME:
+            if answer_at is None:
+                answer_at = game.virtual_ms + rnd.randint(*human_think_ms)
+            elif game.virtual_ms >= answer_at:
+                correct = game.current_quiz.get("correct", "")
+                type_text(correct if rnd.random() < human_accuracy else "오답")
+                pygame.event.post(key_event(pygame.K_RETURN))
+                answer_at = float("inf")
+        elif game.state == STATE_RESULT:
+            if not result_seen:
+                result_seen = True
+                round_wall_hist.observe((time.perf_counter() - round_wall_start) * 1000)
+                round_virtual_hist.observe(game.virtual_ms - round_virtual_start)
+                winners[game.winner] += 1
+            else:
+                pygame.event.post(key_event(pygame.K_RETURN))
+                result_seen = False
+                answer_at = None
+                done += 1
+
+        # --- 한 프레임 ---
+        t0 = time.perf_counter()
+        game.handle_input()
+        t1 = time.perf_counter()
+        game.update(frame_ms)
+        t2 = time.perf_counter()
+        if draw:
+            game.draw()
+        t3 = time.perf_counter()
+
+        phase_hist["handle_input"].observe((t1 - t0) * 1000)
+        phase_hist["update"].observe((t2 - t1) * 1000)
+        if draw:
+            phase_hist["draw"].observe((t3 - t2) * 1000)
+        frame_hist.observe((t3 - t0) * 1000)
+        game.virtual_ms += frame_ms
+
+    wall = time.perf_counter() - sim_start
+    return {
+        "rounds": done,
+        "wall_sec": round(wall, 3),
+        "rounds_per_sec": round(done / wall, 1) if wall else None,
+        "frames": frame_hist.count,
+        "frame_ms": frame_hist.summary(),
+        "phase_ms": {name: h.summary() for name, h in phase_hist.items() if h.count},
+        "round_wall_ms": round_wall_hist.summary(),
+        "round_virtual_ms": round_virtual_hist.summary(),
+        "winners": {str(k): v for k, v in winners.items()},
+        "db_calls": dict(db.calls),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AI vs Human headless load simulation")
+    parser.add_argument("--rounds", type=int, default=100)
+    parser.add_argument("--frame-ms", type=int, default=16, help="virtual ms advanced per frame")
+    parser.add_argument("--no-draw", action="store_true", help="skip Game.draw (logic only)")
+    parser.add_argument("--tokens-per-sec", type=float, default=10.0, help="run_ollama_worker sleeps 0.1s per token")
+    parser.add_argument("--ai-accuracy", type=float, default=0.7)
+    parser.add_argument("--human-accuracy", type=float, default=0.8)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--replay", metavar="DIR", help="replay recorded AI transcripts from DIR instead of the mock LLM")
+    parser.add_argument("--replay-speed", type=float, default=1.0)
+    parser.add_argument("--json", help="write the report to this file")
+    parser.add_argument("--verbose", action="store_true", help="keep the game's own console output")
+    args = parser.parse_args()
+
+    if args.replay:
+        llm = ReplayLLM(args.replay, speed=args.replay_speed)
+    else:
+        llm = MockLLM(tokens_per_sec=args.tokens_per_sec, accuracy=args.ai_accuracy, seed=args.seed)
+    sink = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+    with sink:
+        report = simulate(
+            rounds=args.rounds,
+            frame_ms=args.frame_ms,
+            draw=not args.no_draw,
+            human_accuracy=args.human_accuracy,
+            llm=llm,
+            seed=args.seed,
+        )
+    pygame.quit()
+
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+"""
+헤지 요청(llm_module.hedge) 자체 테스트 — Ollama 대신 로컬 모의 서버 2개
+
+- stall: 원래 요청 서버가 첫 토큰 전에 멈춤 → 백업(빠른 서버)이 이기고,
+         진 요청 스레드가 유예 시간 뒤 바로 끝나며 멈춘 서버도 연결 끊김을 봐야 함
+- cancel: 원래 요청이 이긴 뒤 호출자가 중간에 그만 읽음 → 본문을 읽던 요청도 바로 끝나고 서버가 생성을 멈춰야 함
+- 두 경우 모두 llm_metrics의 hedge 카운터 변화 확인
+
+실행 예:
+    python test_file/hedge_sim.py
+    python test_file/hedge_sim.py --stall 10 --grace-ms 300
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("LLM_METRICS_LOG", "")  # no metrics log for simulated requests
+
+import argparse
+import itertools
+import json
+import select
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List
+
+import llm_module.hedge as hedge
+from llm_module.metrics import llm_metrics
+from llm_module.ollama import DoneEvent, TokenEvent
+
+
+class MockOllama:
+    """
+    /api/generate만 흉내 내는 NDJSON 스트리밍 서버
+    :param name: 토큰 텍스트 앞에 붙일 이름 (누가 이겼는지 확인용)
+    :param first_token_s: 헤더 / 첫 토큰 전에 멈춰 있는 시간
+    :param token_interval_s: 토큰 사이 간격
+    :param tokens: 보낼 토큰 수
+    """
+
+    def __init__(self, name: str, first_token_s: float = 0.0, token_interval_s: float = 0.01, tokens: int = 20):
+        self.name = name
+        self.first_token_s = first_token_s
+        self.token_interval_s = token_interval_s
+        self.tokens = tokens
+        self.requests: List[Dict[str, Any]] = []
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def handle(self):
+                try:
+                    super().handle()
+                except ConnectionError:
+                    pass  # 클라이언트가 keep-alive 연결을 끊음 (취소)
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                mock.serve(self)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, name=f"mock-{name}", daemon=True).start()
+
+    @staticmethod
+    def _client_gone(conn: socket.socket) -> bool:
+        # Ollama도 생성 중에 클라이언트 연결이 끊기면 멈춤 → 읽을 게 있는데 EOF면 끊긴 것
+        readable, _, _ = select.select([conn], [], [], 0)
+        if not readable:
+            return False
+        try:
+            return conn.recv(1, socket.MSG_PEEK) == b""
+        except OSError:
+            return True
+
+    def serve(self, handler: BaseHTTPRequestHandler) -> None:
+        req = {"sent": 0, "disconnected_at": None, "finished": False}
+        self.requests.append(req)
+        conn = handler.connection
+        deadline = time.monotonic() + self.first_token_s
+        while time.monotonic() < deadline:
+            if self._client_gone(conn):
+                req["disconnected_at"] = time.perf_counter()
+                return
+            time.sleep(0.01)
+        try:
+            handler.send_response(200)
+            handler.send_header("Content-Type", "application/x-ndjson")
+            handler.send_header("Transfer-Encoding", "chunked")
+            handler.end_headers()
+            for i in range(self.tokens):
+                if self._client_gone(conn):
+                    req["disconnected_at"] = time.perf_counter()
+                    return
+                self._chunk(handler, {"response": f"{self.name}{i} ", "done": False})
+                req["sent"] += 1
+                time.sleep(self.token_interval_s)
+            self._chunk(handler, {"response": "", "done": True, "eval_count": self.tokens})
+            handler.wfile.write(b"0\r\n\r\n")
+            req["finished"] = True
+        except OSError:
+            req["disconnected_at"] = time.perf_counter()
+
+    @staticmethod
+    def _chunk(handler: BaseHTTPRequestHandler, frame: Dict[str, Any]) -> None:
+        data = json.dumps(frame).encode() + b"\n"
+        handler.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        handler.wfile.flush()
+
+    def close(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def _attempt_threads() -> List[threading.Thread]:
+    return [t for t in threading.enumerate() if isinstance(t, hedge._Attempt) and t.is_alive()]
+
+
+def _wait_until(cond, timeout: float) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if cond():
+            return True
+        time.sleep(0.01)
+    return cond()
+
+
+def _hedge_counters() -> Dict[str, int]:
+    h = llm_metrics.snapshot()["hedge"]
+    return {k: h[k] for k in ("requests", "fired", "backup_wins", "censored")}
+
+
+def _delta(before: Dict[str, int], after: Dict[str, int]) -> Dict[str, int]:
+    return {k: after[k] - before[k] for k in before}
+
+
+def check_stall(stall_s: float, hedge_after_ms: float, grace_ms: float, bound_s: float) -> Dict[str, Any]:
+    """
+    원래 요청(slow)이 첫 토큰 전에 멈춤 → 백업(fast)이 이기고 slow 요청은 유예 시간 뒤 끊김
+    """
+    slow = MockOllama("slow", first_token_s=stall_s)
+    fast = MockOllama("fast")
+    hedge._primary_cycle = itertools.count()  # urls[0]이 원래 요청
+    before = _hedge_counters()
+    started = time.perf_counter()
+    try:
+        text = "".join(e.text for e in hedge.hedged_generate(
+            "mock", "hi", urls=[slow.url, fast.url], hedge_after_ms=hedge_after_ms, loser_grace_ms=grace_ms)
+            if isinstance(e, TokenEvent))
+        consumed_at = time.perf_counter()
+        threads_done = _wait_until(lambda: not _attempt_threads(), bound_s)
+        loser_exit_s = time.perf_counter() - started
+        server_saw = _wait_until(lambda: slow.requests and slow.requests[0]["disconnected_at"], 1.0)
+        result = {
+            "winner": "fast" if text.startswith("fast0") else "slow",
+            "consumed_s": round(consumed_at - started, 3),
+            "loser_exit_s": round(loser_exit_s, 3),
+            "slow_server_disconnect_s": round(slow.requests[0]["disconnected_at"] - started, 3) if server_saw else None,
+            "hedge": _delta(before, _hedge_counters()),
+        }
+        assert result["winner"] == "fast", f"backup (fast) endpoint should win: {text[:40]!r}"
+        assert threads_done, f"loser thread still alive after {bound_s}s"
+        assert server_saw, "stalled server never saw the disconnect"
+        assert result["slow_server_disconnect_s"] < stall_s, "stalled server saw the disconnect only after its stall"
+        assert result["hedge"] == {"requests": 1, "fired": 1, "backup_wins": 1, "censored": 1}, result["hedge"]
+        return result
+    finally:
+        slow.close()
+        fast.close()
+
+
+def check_cancel(tokens_read: int, bound_s: float) -> Dict[str, Any]:
+    """
+    원래 요청이 이긴 뒤 호출자가 토큰 몇 개만 읽고 그만둠 → 본문 읽기 중인 요청이 끊기고 서버가 생성을 멈춤
+    """
+    primary = MockOllama("primary", token_interval_s=0.05, tokens=200)
+    backup = MockOllama("backup")
+    hedge._primary_cycle = itertools.count()
+    before = _hedge_counters()
+    try:
+        stream = hedge.hedged_generate("mock", "hi", urls=[primary.url, backup.url], hedge_after_ms=2000)
+        seen = []
+        for event in stream:
+            if isinstance(event, DoneEvent):
+                break
+            seen.append(event.text)
+            if len(seen) >= tokens_read:
+                break
+        stream.close()
+        stopped_at = time.perf_counter()
+        threads_done = _wait_until(lambda: not _attempt_threads(), bound_s)
+        server_saw = _wait_until(lambda: primary.requests[0]["disconnected_at"], 1.0)
+        req = primary.requests[0]
+        result = {
+            "tokens_read": len(seen),
+            "server_sent": req["sent"],
+            "server_disconnect_s": round(req["disconnected_at"] - stopped_at, 3) if server_saw else None,
+            "backup_requests": len(backup.requests),
+            "hedge": _delta(before, _hedge_counters()),
+        }
+        assert seen and seen[0].startswith("primary0"), seen[:3]
+        assert threads_done, f"attempt thread still alive after {bound_s}s"
+        assert server_saw and not req["finished"], "server kept generating after the caller stopped"
+        assert result["backup_requests"] == 0, "hedge fired although the first token was on time"
+        assert result["hedge"] == {"requests": 1, "fired": 0, "backup_wins": 0, "censored": 0}, result["hedge"]
+        return result
+    finally:
+        primary.close()
+        backup.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="hedged_generate self-test with two local mock servers")
+    parser.add_argument("--stall", type=float, default=10.0, help="seconds the slow server waits before its first token")
+    parser.add_argument("--hedge-after-ms", type=float, default=100.0)
+    parser.add_argument("--grace-ms", type=float, default=300.0)
+    parser.add_argument("--bound", type=float, default=1.0, help="max seconds for attempt threads to exit")
+    args = parser.parse_args()
+
+    report = {
+        "stall": check_stall(args.stall, args.hedge_after_ms, args.grace_ms, args.grace_ms / 1000 + args.bound),
+        "cancel": check_cancel(3, args.bound),
+    }
+    print(json.dumps(report, indent=2))
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,8 @@ import sys
 import os
 from typing import List, Tuple
 
+from ui_module.text_view import TextView
+
 # Window and style
 WINDOW_WIDTH = 900
 WINDOW_HEIGHT = 900
@@ -85,82 +87,23 @@ def draw_button(screen, rect, text, font, hover=False, enabled=True):
     screen.blit(label, label_rect)
 
 
-def wrap_text(text: str, font: pygame.font.Font, max_width: int) -> List[str]:
-    # Simple word wrap (supports Korean due to spaces; long words will be split by character)
-    lines: List[str] = []
-    if not text:
-        return [""]
-    paragraphs = text.split("\n")
-    for para in paragraphs:
-        words = list(para)
-        # Try to split by words first (spaces). If spaces exist, use word-based wrap; else char-based
-        if " " in para:
-            words = para.split(" ")
-            current = ""
-            for w in words:
-                test = (current + (" " if current else "") + w) if current else w
-                if font.size(test)[0] <= max_width:
-                    current = test
-                else:
-                    if current:
-                        lines.append(current)
-                    # If single word is too wide, hard-wrap by characters
-                    if font.size(w)[0] > max_width:
-                        fragment = ""
-                        for ch in w:
-                            if font.size(fragment + ch)[0] <= max_width:
-                                fragment += ch
-                            else:
-                                if fragment:
-                                    lines.append(fragment)
-                                fragment = ch
-                        if fragment:
-                            current = fragment
-                        else:
-                            current = ""
-                    else:
-                        current = w
-            if current:
-                lines.append(current)
-        else:
-            current = ""
-            for ch in para:
-                if font.size(current + ch)[0] <= max_width:
-                    current += ch
-                else:
-                    lines.append(current)
-                    current = ch
-            if current:
-                lines.append(current)
-    return lines
-
-
 def render_text_box(
     screen: pygame.Surface,
     rect: pygame.Rect,
-    text_lines: List[str],
-    font: pygame.font.Font,
-    color: Tuple[int, int, int] = TEXT_COLOR,
+    view: TextView,
     scroll: int = 0,
-    line_spacing: int = 6,
 ):
     # Draw box
     pygame.draw.rect(screen, BOX_BG, rect, border_radius=8)
     pygame.draw.rect(screen, BOX_BORDER, rect, 2, border_radius=8)
 
-    # Clip to rect for scrolling
-    clip_prev = screen.get_clip()
-    screen.set_clip(rect.inflate(-16, -16))
+    # Text is pre-rendered in the view; only the visible window is blitted
+    view.draw(screen, text_viewport(rect), scroll)
 
-    x = rect.x + 12
-    y_start = rect.y + 12 - scroll
-    y = y_start
-    for line in text_lines:
-        surf = font.render(line, True, color)
-        screen.blit(surf, (x, y))
-        y += surf.get_height() + line_spacing
 
-    screen.set_clip(clip_prev)
+def text_viewport(rect: pygame.Rect) -> pygame.Rect:
+    # Inner area of a text box (TextView.layout should use this width)
+    return rect.inflate(-16, -16)
 
 
 def draw_input_box(screen, rect, text, font, placeholder="", focus=False, cursor_visible=True):
@@ -240,9 +183,9 @@ def main():
         "- 파이썬 버전에 상관없이 동일하게 동작합니다.\n"
     )
 
-    # Pre-wrapped text
-    q_lines = []
-    e_lines = []
+    # Pre-rendered text (laid out again only when text or width changes)
+    q_view = TextView(font, TEXT_COLOR, BOX_BG)
+    e_view = TextView(font_small, TEXT_COLOR, BOX_BG)
 
     # State data
     state = STATE_MENU
@@ -278,7 +221,8 @@ def main():
 
             # Mouse wheel for scrolling explanation
             if state == STATE_RESULT and event.type == pygame.MOUSEWHEEL:
-                explain_scroll = max(0, explain_scroll - event.y * 30)
+                max_scroll = e_view.max_scroll(text_viewport(explain_rect).height)
+                explain_scroll = min(max_scroll, max(0, explain_scroll - event.y * 30))
 
             if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
                 mx, my = event.pos
@@ -287,8 +231,8 @@ def main():
                         state = STATE_COUNTDOWN
                         countdown_value = 3
                         countdown_last_tick = pygame.time.get_ticks()
-                        # Prepare question wrapping
-                        q_lines = wrap_text(quiz_question, font, question_rect.width - 24)
+                        # Lay out question text once
+                        q_view.layout(quiz_question, text_viewport(question_rect).width)
                         answer_text = ""
                         is_correct = False
                         elapsed_ms = 0
@@ -321,8 +265,8 @@ def main():
                         def norm(s: str) -> str:
                             return " ".join(s.strip().lower().split())
                         is_correct = norm(answer_text) == norm(quiz_answer)
-                        # Prepare explanation lines and go to result
-                        e_lines = wrap_text(quiz_explain, font_small, explain_rect.width - 24)
+                        # Lay out explanation once and go to result
+                        e_view.layout(quiz_explain, text_viewport(explain_rect).width)
                         explain_scroll = 0
                         state = STATE_RESULT
                     elif event.key == pygame.K_BACKSPACE:
@@ -396,7 +340,7 @@ def main():
 
         elif state == STATE_QUIZ:
             # Question box
-            render_text_box(screen, question_rect, q_lines, font)
+            render_text_box(screen, question_rect, q_view)
             # Answer input
             draw_input_box(
                 screen,
@@ -429,7 +373,7 @@ def main():
             hint = font_small.render("스크롤로 해설을 내려보세요", True, SUBTEXT_COLOR)
             screen.blit(hint, hint.get_rect(center=(WINDOW_WIDTH // 2, 155)))
 
-            render_text_box(screen, explain_rect, e_lines, font_small, scroll=explain_scroll)
+            render_text_box(screen, explain_rect, e_view, scroll=explain_scroll)
 
             # Continue prompt
             cont = font.render("엔터: 학번 입력으로", True, SUBTEXT_COLOR)
@@ -0,0 +1,82 @@
+import unicodedata
+from bisect import bisect_right
+from itertools import accumulate
+from typing import List, Tuple
+
+import pygame
+
+
+def glyph_advances(font: pygame.font.Font, text: str) -> List[int]:
+    """
+    문자별 가로 이동량(advance)을 font.metrics 한 번으로 가져오기
+    - 폰트에 없는 글자(None)는 font.size로 개별 측정
+    :param font: pygame 폰트
+    :param text: 측정할 문자열
+    :return: 글자 수와 같은 길이의 advance 리스트
+    """
+    metrics = font.metrics(text) if text else []
+    return [m[4] if m else font.size(ch)[0] for ch, m in zip(text, metrics)]
+
+
+def _next_line(para: str, prefix: List[int], start: int, budget: int) -> Tuple[str, int]:
+    """
+    start부터 budget 픽셀 안에 들어가는 한 줄과 다음 줄 시작 위치
+    - prefix[end] - prefix[start] <= budget 인 가장 큰 end를 이분 탐색으로 찾음
+    - 공백이 있으면 공백에서, 없으면(한글 붙여쓰기 등) 글자 단위로 자름
+    """
+    n = len(para)
+    end = bisect_right(prefix, prefix[start] + budget, start) - 1
+    if end >= n:
+        return para[start:].rstrip(" "), n
+
+    cut = para.rfind(" ", start + 1, end + 1)
+    if cut > start:
+        return para[start:cut].rstrip(" "), cut
+    # 공백이 없거나 한 단어가 너무 긴 경우: 최소 한 글자는 소비
+    end = max(end, start + 1)
+    return para[start:end], end
+
+
+def break_paragraph(para: str, font: pygame.font.Font, max_width: int) -> List[str]:
+    """
+    한 문단(줄바꿈 없음)을 max_width 안에 들어가도록 자르기
+    - advance는 정수 반올림 값이라 커닝 등으로 실제 폭과 조금 다를 수 있어
+      줄마다 font.size로 한 번 확인하고, 넘치면 예산을 줄여 다시 찾음
+    """
+    prefix = [0, *accumulate(glyph_advances(font, para))]
+    n = len(para)
+    lines: List[str] = []
+    start = 0
+    while start < n:
+        budget = max_width
+        while True:
+            line, nxt = _next_line(para, prefix, start, budget)
+            width = font.size(line)[0]
+            if width <= max_width or nxt - start <= 1:
+                break
+            budget = min(budget - 1, budget * max_width // width)
+        lines.append(line)
+        start = nxt
+
+        # 다음 줄은 공백으로 시작하지 않도록
+        while start < n and para[start] == " ":
+            start += 1
+    return lines
+
+
+def wrap_text(text: str, font: pygame.font.Font, max_width: int) -> List[str]:
+    """
+    여러 줄 텍스트를 폭에 맞춰 줄바꿈 (test_ui, ai_vs_human 공용)
+    :param text: 원본 텍스트 ('\\n'으로 문단 구분)
+    :param font: pygame 폰트
+    :param max_width: 한 줄 최대 픽셀 폭
+    :return: 줄 리스트 (빈 텍스트는 [""])
+    """
+    # macOS 한글 자소 분리(NFD) 방지
+    text = unicodedata.normalize("NFC", text)
+    if not text:
+        return [""]
+    lines: List[str] = []
+    for para in text.split("\n"):
+        lines.extend(line for line in break_paragraph(para, font, max_width) if line)
+    return lines
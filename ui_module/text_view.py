@@ -0,0 +1,70 @@
+from typing import Optional, Tuple
+
+import pygame
+
+from ui_module.line_break import wrap_text
+
+
+class TextView:
+    """
+    긴 텍스트를 세로로 긴 surface 하나에 미리 그려 두고,
+    매 프레임에는 보이는 영역(area rect)만 blit 하는 스크롤 뷰
+    - 텍스트나 폭이 바뀔 때만 다시 줄바꿈/렌더링
+    """
+
+    def __init__(
+        self,
+        font: pygame.font.Font,
+        color: Tuple[int, int, int],
+        bg_color: Tuple[int, int, int],
+        line_spacing: int = 6,
+        padding: int = 4,
+    ):
+        self.font = font
+        self.color = color
+        self.bg_color = bg_color
+        self.line_spacing = line_spacing
+        self.padding = padding
+        self.surface: Optional[pygame.Surface] = None
+        self._key: Optional[Tuple[str, int]] = None
+
+    def layout(self, text: str, width: int) -> None:
+        """
+        text를 width 폭으로 배치해 캐시 surface 생성 (같은 text/width면 아무것도 안 함)
+        :param text: 표시할 원본 텍스트
+        :param width: 뷰포트 폭 (padding 포함)
+        """
+        if self._key == (text, width):
+            return
+        self._key = (text, width)
+
+        lines = wrap_text(text, self.font, width - self.padding * 2)
+        line_h = self.font.get_height() + self.line_spacing
+        height = self.padding * 2 + len(lines) * line_h
+
+        surf = pygame.Surface((width, height))
+        surf.fill(self.bg_color)
+        y = self.padding
+        for line in lines:
+            surf.blit(self.font.render(line, True, self.color, self.bg_color), (self.padding, y))
+            y += line_h
+        self.surface = surf.convert() if pygame.display.get_surface() is not None else surf
+
+    @property
+    def content_height(self) -> int:
+        return self.surface.get_height() if self.surface else 0
+
+    def max_scroll(self, view_height: int) -> int:
+        return max(0, self.content_height - view_height)
+
+    def draw(self, screen: pygame.Surface, viewport: pygame.Rect, scroll: int = 0) -> None:
+        """
+        캐시 surface에서 viewport 크기만큼 잘라 한 번에 blit
+        :param viewport: 화면상 표시 영역
+        :param scroll: 위에서부터 스크롤된 픽셀 수 (범위 밖이면 잘라냄)
+        """
+        if self.surface is None:
+            return
+        scroll = min(max(0, scroll), self.max_scroll(viewport.height))
+        area = pygame.Rect(0, scroll, viewport.width, viewport.height)
+        screen.blit(self.surface, viewport.topleft, area)